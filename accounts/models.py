@@ -19,6 +19,15 @@ class Category(BaseModel):
     def __str__(self):
         return self.name
 
+class QuestionQuerySet(models.QuerySet):
+    def with_answers(self):
+        # One extra query loads the answers of every question in the set
+        return self.prefetch_related('question_answers')
+
+    def answer_lists(self):
+        """Map each question's uid to its shuffled answers, in two queries"""
+        return {question.uid: question.get_answers() for question in self.with_answers()}
+
 class Question(BaseModel):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='category')
     question = models.CharField(max_length=255)
@@ -28,12 +37,14 @@ class Question(BaseModel):
         choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')]
     )
 
+    objects = QuestionQuerySet.as_manager()
+
     def __str__(self):
         return self.question
 
     def get_answers(self):
-        # Get all answer objects related to this question
-        answers_objs = list(Answer.objects.filter(question=self))
+        # Uses the prefetched answers when the question came from with_answers()
+        answers_objs = list(self.question_answers.all())
         random.shuffle(answers_objs)  # Shuffle the answers for randomness
         
         data = []
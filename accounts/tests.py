@@ -1,3 +1,28 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Answer, Category, Question
+
+
+class QuestionAnswersTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Biology', description='Cells')
+        for i in range(5):
+            question = Question.objects.create(category=category, question=f'Question {i}', difficulty='easy')
+            for letter in 'ABCD':
+                Answer.objects.create(question=question, answer=f'{letter}{i}', is_correct=letter == 'A')
+
+    def test_answer_lists_use_two_queries(self):
+        with self.assertNumQueries(2):
+            answers = Question.objects.all().answer_lists()
+
+        self.assertEqual(len(answers), 5)
+        for question in Question.objects.all():
+            data = answers[question.uid]
+            self.assertEqual(sorted(a['answer'] for a in data), [f'{letter}{question.question[-1]}' for letter in 'ABCD'])
+            self.assertEqual([a['answer'][0] for a in data if a['is_correct']], ['A'])
+
+    def test_prefetched_questions_need_no_query_per_question(self):
+        questions = list(Question.objects.with_answers())
+        with self.assertNumQueries(0):
+            for question in questions:
+                self.assertEqual(len(question.get_answers()), 4)
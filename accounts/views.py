@@ -2,14 +2,16 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
 from django.contrib import messages
+from home.caching import cache_anonymous_page
 
 
 # Landing Page
+@cache_anonymous_page
 def landing_page(request):
     return render(request, 'accounts/home.html')
 
 
-# Login View
+# Login View (not cached: its form carries each visitor's own CSRF token)
 def login_view(request):
     if request.method == 'POST':
         username = request.POST.get('username')
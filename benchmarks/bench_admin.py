@@ -0,0 +1,96 @@
+"""
+QuizAttempt admin changelist at scale: the stock ModelAdmin settings versus
+the tuned QuizAttemptAdmin.
+
+Usage: python -m benchmarks.bench_admin [attempts] [users]
+
+The baseline counts the whole table twice per page (paginator and "show
+all" link), searches with LIKE across the user and category joins and
+cannot sort by percentage. Run against Postgres (DATABASE_URL) to see the
+estimated count at work; on SQLite both sides count exactly.
+"""
+
+import sys
+
+from benchmarks.common import benchmark_database, make_attempts, make_fixtures, print_table, timer
+
+SCENARIOS = [
+    ('first page', {}),
+    ('page 50', {'p': '50'}),
+    ('search user', {'q': 'bench_user_42@'}),
+    ('search category', {'q': 'Category 3'}),
+    ('filter category', {'category__id__exact': None}),
+    ('sort by percentage', {'o': '-4'}),
+]
+
+
+def legacy_admin():
+    from django.contrib import admin
+    from django.core.paginator import Paginator
+    from home.admin import QuizAttemptAdmin
+    from home.models import QuizAttempt
+
+    class LegacyQuizAttemptAdmin(QuizAttemptAdmin):
+        list_select_related = False
+        paginator = Paginator
+        show_full_result_count = True
+        get_search_results = admin.ModelAdmin.get_search_results
+
+        def get_queryset(self, request):
+            return admin.ModelAdmin.get_queryset(self, request)
+
+        def percentage(self, obj):
+            return f'{obj.score / obj.total * 100:.1f}%' if obj.total else '0%'
+
+    return LegacyQuizAttemptAdmin(QuizAttempt, admin.site)
+
+
+def main(attempt_count, user_count):
+    with benchmark_database() as connection:
+        from django.contrib import admin
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory, override_settings
+        from django.test.utils import CaptureQueriesContext
+        from home.models import QuizAttempt
+
+        users, categories = make_fixtures(users=user_count)
+        make_attempts(attempt_count, users, categories)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        staff = User.objects.create_superuser(username='bench_admin', password='unused')
+        factory = RequestFactory()
+        admins = [('stock', legacy_admin()), ('tuned', admin.site._registry[QuizAttempt])]
+
+        def view(model_admin, params):
+            request = factory.get('/admin/home/quizattempt/', params)
+            request.user = staff
+            with CaptureQueriesContext(connection) as queries, timer() as t:
+                response = model_admin.changelist_view(request)
+                response.render()
+            return t['seconds'], len(queries)
+
+        rows = []
+        # Template rendering needs no collected static files
+        with override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'):
+            for name, params in SCENARIOS:
+                if 'category__id__exact' in params:
+                    params = {'category__id__exact': str(categories[0].id)}
+                row = [name]
+                for label, model_admin in admins:
+                    if label == 'stock' and 'o' in params:
+                        row += ['-', '-']  # not sortable without the annotation
+                        continue
+                    view(model_admin, params)  # warm up
+                    seconds, queries = view(model_admin, params)
+                    row += [f'{seconds * 1000:.0f}', queries]
+                rows.append(row)
+
+        print(f'{QuizAttempt.objects.count():,} attempts, {user_count:,} users, {connection.vendor}')
+        print_table(['changelist', 'stock ms', 'stock queries', 'tuned ms', 'tuned queries'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [1_000_000, 10_000][len(args):]))
@@ -0,0 +1,68 @@
+"""
+Exam-start burst: the WSGI path against the ASGI path with async views.
+
+Usage: DATABASE_URL=postgresql://... python -m benchmarks.bench_asgi [students] [seconds] [wsgi threads] [pool size]
+
+Creates a throwaway test database with one exam and as many logged-in
+students as concurrent clients. Every student loops over their dashboard
+and the quiz page (which records the served quiz), first against the
+WSGI app on a fixed pool of worker threads, then against quiz_app.asgi
+under uvicorn with ASYNC_VIEWS=True. Both run as one process sharing an
+in-process pool of connections (DEPLOYMENT_MODE=server, DB_POOL_MAX_SIZE)
+so neither exceeds Postgres' connection limit.
+"""
+
+import sys
+
+from benchmarks.common import benchmark_database, database_url, login_cookie, make_attempts, make_fixtures, print_table
+from benchmarks.loadgen import format_statuses, run_load, server
+
+
+def main(students, seconds, threads, pool_size):
+    with benchmark_database() as connection:
+        if connection.vendor != 'postgresql':
+            sys.exit('Set DATABASE_URL (or the DB_* variables) to a Postgres database first.')
+
+        from home.models import Question
+        from home.stats import rebuild_rollups
+
+        users, categories = make_fixtures(users=students, categories=1)
+        Question.objects.bulk_create([
+            Question(category=categories[0], question_text=f'Question {i}', correct_option='ABCD'[i % 4])
+            for i in range(30)
+        ])
+        make_attempts(students * 5, users, categories)
+        rebuild_rollups()
+        headers = [{'Cookie': login_cookie(user)} for user in users]
+
+        # Child servers use the test database just created
+        env = {
+            'DATABASE_URL': database_url(connection),
+            'DEPLOYMENT_MODE': 'server',
+            'DB_POOL_MAX_SIZE': str(pool_size),
+            'DB_POOL_TIMEOUT': '60',
+        }
+        paths = ['/subjects/dashboard/', f'/subjects/quiz/{categories[0].id}/']
+
+        rows = []
+        for name, asgi, extra in [
+            (f'wsgi ({threads} threads)', False, {}),
+            ('asgi (uvicorn)', True, {'ASYNC_VIEWS': 'True'}),
+        ]:
+            with server({**env, **extra}, threads=threads, asgi=asgi) as base_url:
+                urls = [base_url + path for path in paths]
+                run_load(urls, min(students, 20), 2, headers)  # warm up
+                result = run_load(urls, students, seconds, headers)
+            rows.append((
+                name, result['requests'], f"{result['rps']:.0f}", f"{result['p50_ms']:.0f}",
+                f"{result['p95_ms']:.0f}", f"{result['p99_ms']:.0f}", format_statuses(result['statuses']),
+            ))
+
+    print(f'{students} students each loading their dashboard and the quiz page, {seconds}s per server, '
+          f'{pool_size} pooled connections')
+    print_table(['server', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'statuses'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [500, 20, 16, 20][len(args):]))
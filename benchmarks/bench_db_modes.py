@@ -0,0 +1,63 @@
+"""
+Requests/s in each database connection mode against the configured Postgres.
+
+Usage: DATABASE_URL=postgresql://... python -m benchmarks.bench_db_modes [concurrency] [seconds]
+
+Creates a throwaway test database with one student and some attempts, then
+serves the app with as many worker threads as client threads, once per
+mode, and loads that student's dashboard (session, user, rollup and
+attempt queries):
+
+    serverless   DEPLOYMENT_MODE=serverless: connect and disconnect every request
+    persistent   DEPLOYMENT_MODE=server: one kept-alive connection per thread
+    pooled       DEPLOYMENT_MODE=server with DB_POOL_MAX_SIZE=concurrency
+"""
+
+import sys
+
+from benchmarks.common import benchmark_database, database_url, login_cookie, make_attempts, make_fixtures, print_table
+from benchmarks.loadgen import format_statuses, run_load, server
+
+
+def modes(concurrency):
+    return {
+        'serverless': {'DEPLOYMENT_MODE': 'serverless'},
+        'persistent': {'DEPLOYMENT_MODE': 'server'},
+        'pooled': {'DEPLOYMENT_MODE': 'server', 'DB_POOL_MAX_SIZE': str(concurrency)},
+    }
+
+
+def main(concurrency, seconds):
+    with benchmark_database() as connection:
+        if connection.vendor != 'postgresql':
+            sys.exit('Set DATABASE_URL (or the DB_* variables) to a Postgres database first.')
+
+        from home.stats import rebuild_rollups
+
+        users, categories = make_fixtures(users=1, categories=5)
+        make_attempts(200, users, categories)
+        rebuild_rollups()
+        headers = {'Cookie': login_cookie(users[0])}
+
+        # Child servers use the test database just created
+        child_database = database_url(connection)
+
+        rows = []
+        for name, env in modes(concurrency).items():
+            with server({**env, 'DATABASE_URL': child_database}, threads=concurrency) as base_url:
+                url = f'{base_url}/subjects/dashboard/'
+                run_load(url, concurrency, 1, headers)  # warm up
+                result = run_load(url, concurrency, seconds, headers)
+            rows.append((
+                name, result['requests'], f"{result['rps']:.0f}",
+                f"{result['p50_ms']:.1f}", f"{result['p95_ms']:.1f}",
+                format_statuses(result['statuses']),
+            ))
+
+    print(f'GET /subjects/dashboard/ as a logged-in student, {concurrency} client threads, {seconds}s per mode')
+    print_table(['mode', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'statuses'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [8, 10][len(args):]))
@@ -0,0 +1,62 @@
+"""
+Peak memory and throughput of the streaming results export.
+
+Usage: python -m benchmarks.bench_export [rows ...]
+
+Peak traced memory should stay flat as the number of exported rows grows;
+only the time should scale.
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.common import benchmark_database, make_attempts, make_fixtures, print_table, timer
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000]
+
+
+def consume(response):
+    size = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+    return size
+
+
+def main(sizes):
+    with benchmark_database():
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+        from home.models import QuizAttempt
+        from home.views import export_results_csv
+
+        staff = User.objects.create_user(username='bench_staff', is_staff=True, is_superuser=True)
+        users, categories = make_fixtures()
+        factory = RequestFactory()
+        rows = []
+        created = 0
+        for size in sorted(sizes):
+            make_attempts(size - created, users, categories, seed=size)
+            created = size
+            for export_format in ('csv', 'ndjson'):
+                request = factory.get('/subjects/results/export/', {'format': export_format})
+                request.user = staff
+                tracemalloc.start()
+                with timer() as t:
+                    response = export_results_csv(request)
+                    nbytes = consume(response)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                rows.append((
+                    f'{QuizAttempt.objects.count():,}',
+                    export_format,
+                    f'{nbytes / 1024 / 1024:.1f}',
+                    f'{peak / 1024:.0f}',
+                    f'{t["seconds"]:.2f}',
+                    f'{size / t["seconds"]:,.0f}',
+                ))
+
+        print_table(['rows', 'format', 'output MB', 'peak KiB', 'seconds', 'rows/s'], rows)
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or DEFAULT_SIZES)
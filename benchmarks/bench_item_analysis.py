@@ -0,0 +1,77 @@
+"""
+Item analysis latency over a large answer table.
+
+Usage: python -m benchmarks.bench_item_analysis [answers] [questions]
+
+Seeds one category with the given number of stored answers, then times a
+cold compute_item_analysis (the grouped SQL aggregate) and a warm cached
+get_item_analysis.
+"""
+
+import random
+import sys
+
+from benchmarks.common import benchmark_database, make_fixtures, print_table, timer
+
+
+def seed_answers(category, users, answer_count, question_count, batch_size=50000, seed=42):
+    from home.models import AttemptAnswer, Question, QuizAttempt
+
+    rng = random.Random(seed)
+    questions = Question.objects.bulk_create([
+        Question(category=category, question_text=f'Question {i}', correct_option='ABCD'[i % 4])
+        for i in range(question_count)
+    ])
+    # Each question gets a difficulty; each student an ability
+    difficulty = [rng.uniform(0.2, 0.95) for _ in questions]
+
+    batch = []
+    for _ in range(answer_count // question_count):
+        ability = rng.uniform(-0.3, 0.3)
+        picks = []
+        for q, p in zip(questions, difficulty):
+            key = 'ABCD'.index(q.correct_option)
+            selected = key if rng.random() < p + ability else rng.choice([None, 0, 1, 2, 3])
+            picks.append((q, selected, selected == key))
+        score = sum(correct for _, _, correct in picks)
+        attempt = QuizAttempt.objects.create(
+            user=rng.choice(users), category=category, score=score, total=question_count
+        )
+        batch.extend(
+            AttemptAnswer(attempt=attempt, question=q, selected=selected, is_correct=correct)
+            for q, selected, correct in picks
+        )
+        if len(batch) >= batch_size:
+            AttemptAnswer.objects.bulk_create(batch)
+            batch = []
+    AttemptAnswer.objects.bulk_create(batch)
+
+
+def main(answer_count, question_count):
+    with benchmark_database():
+        from django.db import transaction
+        from home.analytics import compute_item_analysis, get_item_analysis
+
+        users, (category,) = make_fixtures(users=200, categories=1)
+        with transaction.atomic(), timer() as seeding:
+            seed_answers(category, users, answer_count, question_count)
+        print(f'Seeded {answer_count} answers in {seeding["seconds"]:.1f}s')
+
+        rows = []
+        for run in range(3):
+            with timer() as cold:
+                items = compute_item_analysis(category.id)
+            rows.append((f'cold #{run + 1}', f'{cold["seconds"] * 1000:.0f}'))
+        get_item_analysis(category.id)
+        with timer() as warm:
+            get_item_analysis(category.id)
+        rows.append(('cached', f'{warm["seconds"] * 1000:.2f}'))
+
+        print(f'{question_count} questions, {sum(i["responses"] for i in items)} answers analysed, '
+              f'{sum(1 for i in items if i["flags"])} flagged')
+        print_table(['run', 'ms'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [1000000, 50][len(args):]))
@@ -0,0 +1,55 @@
+"""
+Requests/s of the category picker with and without its fragment cache.
+
+Usage: DATABASE_URL=postgresql://... python -m benchmarks.bench_page_cache [concurrency] [seconds] [categories]
+
+Creates a throwaway test database with one student and the given number
+of categories, then serves the app (DEPLOYMENT_MODE=server, so connection
+setup does not drown the difference) and loads /subjects/start-assessment/
+as that student:
+
+    uncached   CATALOGUE_CACHE_TIMEOUT=0: query and render the cards every time
+    cached     the cards come from the cache until the catalogue changes
+"""
+
+import sys
+
+from benchmarks.common import benchmark_database, database_url, login_cookie, make_fixtures, print_table
+from benchmarks.loadgen import format_statuses, run_load, server
+
+MODES = {
+    'uncached': {'CATALOGUE_CACHE_TIMEOUT': '0'},
+    'cached': {},
+}
+
+
+def main(concurrency, seconds, category_count):
+    with benchmark_database() as connection:
+        if connection.vendor != 'postgresql':
+            sys.exit('Set DATABASE_URL (or the DB_* variables) to a Postgres database first.')
+
+        users, _ = make_fixtures(users=1, categories=category_count)
+        headers = {'Cookie': login_cookie(users[0])}
+        child_database = database_url(connection)
+
+        rows = []
+        for name, env in MODES.items():
+            env = {**env, 'DEPLOYMENT_MODE': 'server', 'DATABASE_URL': child_database}
+            with server(env, threads=concurrency) as base_url:
+                url = f'{base_url}/subjects/start-assessment/'
+                run_load(url, concurrency, 1, headers)  # warm up
+                result = run_load(url, concurrency, seconds, headers)
+            rows.append((
+                name, result['requests'], f"{result['rps']:.0f}",
+                f"{result['p50_ms']:.1f}", f"{result['p95_ms']:.1f}",
+                format_statuses(result['statuses']),
+            ))
+
+    print(f'GET /subjects/start-assessment/ with {category_count} categories, '
+          f'{concurrency} client threads, {seconds}s per mode')
+    print_table(['mode', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'statuses'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [8, 10, 50][len(args):]))
@@ -0,0 +1,56 @@
+"""
+Results search latency: OR-of-icontains across the user join versus the
+user-id subquery used by home.filters.
+
+Usage: python -m benchmarks.bench_search [attempts] [users]
+
+On Postgres the subquery side is additionally served by the pg_trgm
+indexes from migration 0011.
+"""
+
+import sys
+
+from benchmarks.common import benchmark_database, make_attempts, make_fixtures, print_table, timer
+
+TERMS = ['bench_user_1', 'user_42@', 'nobody']
+
+
+def legacy_search(attempts, term):
+    from django.db.models import Q
+
+    return attempts.filter(
+        Q(user__username__icontains=term) |
+        Q(user__first_name__icontains=term) |
+        Q(user__last_name__icontains=term) |
+        Q(user__email__icontains=term)
+    )
+
+
+def main(attempt_count, user_count):
+    with benchmark_database():
+        from home.filters import ResultsFilter
+        from home.models import QuizAttempt
+
+        users, categories = make_fixtures(users=user_count)
+        make_attempts(attempt_count, users, categories)
+
+        base = QuizAttempt.objects.order_by('-timestamp', '-id')
+        rows = []
+        for term in TERMS:
+            timings = []
+            for build in (lambda: legacy_search(base, term),
+                          lambda: ResultsFilter({'search': term}).apply(base)):
+                queryset = build()
+                with timer() as t:
+                    count = queryset.count()
+                    list(queryset[:50])
+                timings.append(t['seconds'])
+            rows.append((term, f'{count:,}', f'{timings[0] * 1000:.1f}', f'{timings[1] * 1000:.1f}'))
+
+        print(f'{attempt_count:,} attempts, {user_count:,} users')
+        print_table(['term', 'matches', 'legacy ms', 'subquery ms'], rows)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [200_000, 2_000][len(args):]))
@@ -0,0 +1,76 @@
+"""
+Quiz submission throughput with per-question answer storage.
+
+Usage: python -m benchmarks.bench_submission [questions] [submissions]
+
+Times the full start_quiz POST (grading, attempt, answers, rollup) and,
+separately, writing the answers with one bulk INSERT versus one INSERT
+per question.
+"""
+
+import statistics
+import sys
+
+from benchmarks.common import benchmark_database, print_table, timer
+
+
+def main(question_count, submissions):
+    with benchmark_database() as connection:
+        from django.contrib.auth.models import User
+        from django.db import transaction
+        from django.test import Client
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from home.grading import record_answers
+        from home.models import AttemptAnswer, Category, Question, QuizAttempt
+        from home.question_bank import invalidate_category
+
+        category = Category.objects.create(name='Bench Exam')
+        Question.objects.bulk_create([
+            Question(category=category, question_text=f'Question {i}', correct_option='ABCD'[i % 4])
+            for i in range(question_count)
+        ])
+        invalidate_category(category.id)
+        url = reverse('start_quiz', args=[category.id])
+
+        latencies, query_counts = [], []
+        for i in range(submissions):
+            client = Client()
+            client.force_login(User.objects.create_user(username=f'bench_student_{i}'))
+            response = client.get(url, secure=True)
+            data = {'session_id': response.context['session_id']}
+            data.update({f'q{q.id}': 'ABCD'[(q.id + i) % 4] for q in response.context['questions']})
+            with CaptureQueriesContext(connection) as queries, timer() as t:
+                client.post(url, data, secure=True)
+            latencies.append(t['seconds'])
+            query_counts.append(len(queries))
+
+        # Answer storage alone: bulk versus row-by-row
+        attempt = QuizAttempt.objects.first()
+        questions = list(Question.objects.filter(category=category))
+        answers = {q.id: 'A' for q in questions}
+        with transaction.atomic(), timer() as bulk:
+            for _ in range(20):
+                record_answers(attempt, questions, answers)
+        with transaction.atomic(), timer() as single:
+            for _ in range(20):
+                for q in questions:
+                    AttemptAnswer.objects.create(
+                        attempt=attempt, question=q, selected=0, is_correct=q.correct_option == 'A'
+                    )
+
+        latencies.sort()
+        print(f'{question_count} questions per exam, {submissions} submissions')
+        print_table(['metric', 'value'], [
+            ('submissions/s', f'{submissions / sum(latencies):.1f}'),
+            ('p50 ms', f'{statistics.median(latencies) * 1000:.1f}'),
+            ('p95 ms', f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}'),
+            ('queries per POST', f'{max(query_counts)}'),
+            ('answers bulk ms/exam', f'{bulk["seconds"] / 20 * 1000:.1f}'),
+            ('answers per-row ms/exam', f'{single["seconds"] / 20 * 1000:.1f}'),
+        ])
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [200, 100][len(args):]))
@@ -0,0 +1,129 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created the same way the
+test runner does it, so they never touch the configured development or
+production data. Run them from the project root, e.g.:
+
+    python -m benchmarks.bench_export
+"""
+
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_app.settings')
+
+# Where scripts that keep their results (profile_coldstart, exam_window) save them
+RESULTS_DIR = BASE_DIR / 'benchmarks' / 'results'
+
+
+@contextmanager
+def benchmark_database():
+    """Set up Django and yield with a freshly migrated, disposable database"""
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def database_url(connection):
+    """URL of a Postgres connection's database, for child processes (e.g. benchmark servers)"""
+    db = connection.settings_dict
+    return f"postgresql://{quote(db['USER'])}:{quote(db['PASSWORD'])}@{db['HOST']}:{db['PORT']}/{db['NAME']}"
+
+
+@contextmanager
+def timer():
+    """Yield a dict whose 'seconds' key is filled in when the block exits"""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+
+
+def make_fixtures(users=50, categories=5):
+    """Bulk-insert synthetic users and categories; returns both lists"""
+    from django.contrib.auth.models import User
+    from home.models import Category
+
+    user_objs = User.objects.bulk_create(
+        [User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com') for i in range(users)]
+    )
+    category_objs = Category.objects.bulk_create(
+        [Category(name=f'Bench Category {i}') for i in range(categories)]
+    )
+    return user_objs, category_objs
+
+
+def make_attempts(count, users, categories, batch_size=5000, seed=42):
+    """Bulk-insert synthetic quiz attempts spread over the given users and categories"""
+    import random
+
+    from home.counters import reconcile_counts
+    from home.models import QuizAttempt
+
+    rng = random.Random(seed)
+    batch = []
+    for _ in range(count):
+        total = 20
+        batch.append(QuizAttempt(
+            user=rng.choice(users),
+            category=rng.choice(categories),
+            score=rng.randint(0, total),
+            total=total,
+            tab_switches=rng.choice([0, 0, 0, 1, 5]),
+        ))
+        if len(batch) >= batch_size:
+            QuizAttempt.objects.bulk_create(batch)
+            batch = []
+    QuizAttempt.objects.bulk_create(batch)
+    reconcile_counts()  # bulk_create skipped the counter signals
+
+
+def login_cookie(user):
+    """Session cookie for a user, created directly in the session store"""
+    from django.conf import settings
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.sessions.backends.db import SessionStore
+
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+    line = '  '.join(f'{{:>{w}}}' for w in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,255 @@
+"""
+Exam-window load test: a whole class logs in, opens the same quiz at once
+and submits within the same minute.
+
+Usage: DATABASE_URL=postgresql://... python -m benchmarks.exam_window
+           [--students N] [--questions M] [--arrival-window S] [--submit-window S]
+           [--threads T] [--asgi] [--seed N] [--output FILE] [--compare BASELINE.json]
+
+Seeds N students and an M-question exam (seed_data.seed_cohort) into a
+throwaway test database and serves the app from a child process: the WSGI
+app on T worker threads, or quiz_app.asgi under uvicorn with --asgi. Any
+other server setting (DEPLOYMENT_MODE, DB_POOL_MAX_SIZE, ASYNC_VIEWS,
+SESSION_MODE, ...) is taken from the environment. Every student then:
+
+    GET  /login/                 arriving at a random time within --arrival-window
+    POST /login/
+    GET  /subjects/start-assessment/
+    GET  /subjects/quiz/<id>/    all students at the same moment, once everyone is in
+    POST /subjects/quiz/<id>/    after a random think time within --submit-window,
+                                 with random answers and tab-switch/fullscreen counters
+
+For every endpoint it reports throughput, latency percentiles, the error
+rate (unexpected status, unparsable page or connection failure) and the
+mean number of SQL queries, read from the X-DB-Query-Count header that
+QUERY_COUNT_HEADER turns on. The student plans come from --seed, so runs
+are repeatable. Results are saved as JSON, by default to
+benchmarks/results/exam-<commit>.json; pass an earlier file to --compare
+to see what a change did.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.common import RESULTS_DIR, benchmark_database, database_url, git_commit, print_table
+from benchmarks.loadgen import request, server
+
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+SESSION_ID = re.compile(r'name="session_id" value="(\d+)"')
+QUESTION_IDS = re.compile(r'name="q(\d+)"')
+
+
+class Recorder:
+    """Latency, status and query count of every request, per endpoint"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, endpoint, started, finished, ok, queries):
+        self.samples.setdefault(endpoint, []).append((started, finished, ok, queries))
+
+    def summary(self):
+        def percentile(latencies, fraction):
+            return round(latencies[max(int(len(latencies) * fraction) - 1, 0)] * 1000, 1)
+
+        endpoints = {}
+        for endpoint, samples in self.samples.items():
+            latencies = sorted(finished - started for started, finished, _, _ in samples)
+            span = max(s[1] for s in samples) - min(s[0] for s in samples)
+            errors = sum(1 for s in samples if not s[2])
+            queries = [s[3] for s in samples if s[3] is not None]
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4),
+                'rps': round(len(samples) / span, 1) if span else None,
+                'p50_ms': round(statistics.median(latencies) * 1000, 1),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'max_ms': round(latencies[-1] * 1000, 1),
+                'queries': round(statistics.mean(queries), 1) if queries else None,
+            }
+        return endpoints
+
+
+class Student:
+    """One simulated student with their own cookies"""
+
+    def __init__(self, base_url, username, password, recorder):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.recorder = recorder
+        self.cookies = {}
+        self.csrf_token = None
+
+    async def call(self, endpoint, path, expected, data=None):
+        """Make a request and record it; returns the body, or None when it failed"""
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = b''
+        if data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            # The CSRF check compares the origin with the (HTTPS) host
+            headers['Origin'] = 'https://' + self.base_url.removeprefix('http://')
+
+        started = time.perf_counter()
+        try:
+            status, response_headers, content = await asyncio.wait_for(
+                request(self.base_url + path, 'POST' if data is not None else 'GET', headers, body), 120,
+            )
+        except (OSError, asyncio.TimeoutError, IndexError):
+            self.recorder.add(endpoint, started, time.perf_counter(), False, None)
+            return None
+        finished = time.perf_counter()
+
+        queries = None
+        for name, value in response_headers:
+            if name == 'set-cookie':
+                cookie_name, _, cookie_value = value.split(';')[0].partition('=')
+                self.cookies[cookie_name] = cookie_value
+            elif name == 'x-db-query-count':
+                queries = int(value)
+        content = content.decode('utf-8', 'replace')
+        token = CSRF_TOKEN.search(content)
+        if token:
+            self.csrf_token = token.group(1)
+
+        ok = status == expected
+        self.recorder.add(endpoint, started, finished, ok, queries)
+        return content if ok else None
+
+    async def log_in(self, arrival):
+        await asyncio.sleep(arrival)
+        if await self.call('GET /login/', '/login/', '200') is None:
+            return False
+        data = {'csrfmiddlewaretoken': self.csrf_token, 'username': self.username, 'password': self.password}
+        if await self.call('POST /login/', '/login/', '302', data) is None:
+            return False
+        return await self.call('GET /subjects/start-assessment/', '/subjects/start-assessment/', '200') is not None
+
+    async def take_quiz(self, category_id, think_time, rng):
+        path = f'/subjects/quiz/{category_id}/'
+        page = await self.call('GET /subjects/quiz/<id>/', path, '200')
+        session_id = SESSION_ID.search(page) if page else None
+        if session_id is None:
+            return
+
+        await asyncio.sleep(think_time)
+        data = {
+            'csrfmiddlewaretoken': self.csrf_token,
+            'session_id': session_id.group(1),
+            'tab_switches': rng.choice([0, 0, 0, 1, 2, 5]),
+            'fullscreen_exits': rng.choice([0, 0, 0, 0, 1, 3]),
+        }
+        for question_id in dict.fromkeys(QUESTION_IDS.findall(page)):
+            data[f'q{question_id}'] = rng.choice('ABCD')
+        await self.call('POST /subjects/quiz/<id>/', path, '200', data)
+
+
+async def exam(base_url, usernames, password, category_id, args):
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    students = [Student(base_url, username, password, recorder) for username in usernames]
+    plans = [
+        (rng.uniform(0, args.arrival_window), rng.uniform(0, args.submit_window), random.Random(rng.random()))
+        for _ in students
+    ]
+
+    logged_in = await asyncio.gather(*(s.log_in(plan[0]) for s, plan in zip(students, plans)))
+    # The exam starts: everyone who got in opens the quiz at once
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        s.take_quiz(category_id, plan[1], plan[2])
+        for s, plan, ok in zip(students, plans, logged_in) if ok
+    ))
+    return recorder.summary(), sum(logged_in), time.perf_counter() - started
+
+
+def compare(current, baseline):
+    rows = []
+    for endpoint, new in current['endpoints'].items():
+        old = baseline['endpoints'].get(endpoint, {})
+        rows.append((
+            endpoint,
+            old.get('p50_ms', '-'), new['p50_ms'],
+            old.get('p99_ms', '-'), new['p99_ms'],
+            old.get('queries', '-'), new['queries'],
+            old.get('errors', '-'), new['errors'],
+        ))
+    print(f"\nAgainst {baseline.get('commit', 'baseline')}:")
+    print_table(['endpoint', 'p50 before', 'p50 after', 'p99 before', 'p99 after',
+                 'queries before', 'queries after', 'errors before', 'errors after'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a class taking a quiz at the same time')
+    parser.add_argument('--students', type=int, default=100)
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--arrival-window', type=float, default=10, help='seconds over which students log in')
+    parser.add_argument('--submit-window', type=float, default=60, help='seconds over which they submit')
+    parser.add_argument('--threads', type=int, default=16, help='WSGI worker threads')
+    parser.add_argument('--asgi', action='store_true', help='serve quiz_app.asgi under uvicorn instead')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=Path, help='JSON file to write (default: benchmarks/results/)')
+    parser.add_argument('--compare', type=Path, help='earlier JSON result to compare against')
+    args = parser.parse_args()
+
+    with benchmark_database() as connection:
+        if connection.vendor != 'postgresql':
+            sys.exit('Set DATABASE_URL (or the DB_* variables) to a Postgres database first.')
+
+        from seed_data import COHORT_PASSWORD, seed_cohort
+
+        usernames, category = seed_cohort(args.students, args.questions)
+        env = {'DATABASE_URL': database_url(connection), 'QUERY_COUNT_HEADER': 'True'}
+        with server(env, threads=args.threads, asgi=args.asgi) as base_url:
+            endpoints, logged_in, exam_seconds = asyncio.run(
+                exam(base_url, usernames, COHORT_PASSWORD, category.id, args)
+            )
+
+    commit = git_commit()
+    result = {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'server': 'asgi' if args.asgi else f'wsgi ({args.threads} threads)',
+        'students': args.students,
+        'questions': args.questions,
+        'arrival_window': args.arrival_window,
+        'submit_window': args.submit_window,
+        'seed': args.seed,
+        'logged_in': logged_in,
+        'exam_seconds': round(exam_seconds, 1),
+        'endpoints': endpoints,
+    }
+
+    print(f"\n{args.students} students ({logged_in} logged in), {args.questions} questions, "
+          f"{result['server']}; exam phase took {result['exam_seconds']}s")
+    print_table(
+        ['endpoint', 'requests', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'queries'],
+        [(name, e['requests'], f"{e['errors']} ({e['error_rate']:.1%})", e['rps'], e['p50_ms'],
+          e['p95_ms'], e['p99_ms'], e['max_ms'], e['queries'] if e['queries'] is not None else '-')
+         for name, e in endpoints.items()],
+    )
+
+    output = args.output or RESULTS_DIR / f'exam-{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + '\n')
+    print(f'\nSaved {output}')
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Minimal HTTP load generator for the benchmark scripts.
+
+server() starts the app in a child process with whatever environment a
+scenario needs (deployment mode, pool size, ...): the WSGI app on a stdlib
+server with a fixed pool of worker threads, like gunicorn's gthread
+worker, or the ASGI app under uvicorn. run_load() drives it from any
+number of concurrent clients on one asyncio event loop for a fixed time.
+Requests are made as if a TLS-terminating proxy sat in front, so
+SECURE_SSL_REDIRECT does not turn them into redirects.
+
+The WSGI child server is started with:
+
+    python -m benchmarks.loadgen serve PORT [THREADS]
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from benchmarks.common import BASE_DIR
+
+
+class _ThreadPoolWSGIServer(WSGIServer):
+    """WSGIServer that hands each connection to one of a fixed set of threads"""
+    request_queue_size = 1024
+
+    def __init__(self, address, handler, threads):
+        super().__init__(address, handler)
+        self._executor = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, threads=8):
+    """Run quiz_app.wsgi on 127.0.0.1:port with a pool of worker threads, until killed"""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_app.settings')
+    from quiz_app.wsgi import application
+
+    def behind_tls_proxy(environ, start_response):
+        environ['wsgi.url_scheme'] = 'https'
+        return application(environ, start_response)
+
+    httpd = _ThreadPoolWSGIServer(('127.0.0.1', port), _QuietHandler, threads)
+    httpd.set_app(behind_tls_proxy)
+    httpd.serve_forever()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def server(env=None, threads=8, timeout=30, asgi=False):
+    """Start the app in a child process with extra environment; yields its base URL"""
+    port = free_port()
+    if asgi:
+        # uvicorn trusts X-Forwarded-Proto from 127.0.0.1, so requests count as HTTPS
+        command = ['-m', 'uvicorn', 'quiz_app.asgi:application', '--port', str(port),
+                   '--log-level', 'warning', '--no-access-log', '--backlog', '1024']
+    else:
+        command = ['-m', 'benchmarks.loadgen', 'serve', str(port), str(threads)]
+    # stdout carries the views' debug prints; errors still reach stderr
+    process = subprocess.Popen(
+        [sys.executable, *command], cwd=BASE_DIR, env={**os.environ, **(env or {})}, stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('benchmark server did not start')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def request(url, method='GET', headers=None, body=b''):
+    """
+    One request over a fresh connection.
+
+    Returns the status code as a string, the response headers as a list of
+    (lowercased name, value) pairs and the body.
+    """
+    host, _, rest = url.removeprefix('http://').partition('/')
+    hostname, port = host.split(':')
+    reader, writer = await asyncio.open_connection(hostname, int(port))
+    try:
+        lines = [f'{method} /{rest} HTTP/1.1', f'Host: {host}', 'Connection: close', 'X-Forwarded-Proto: https']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        if body:
+            lines.append(f'Content-Length: {len(body)}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        # Read until the server closes the connection
+        head, _, content = (await reader.read()).partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        response_headers = [
+            (name.strip().lower(), value.strip())
+            for name, _, value in (line.partition(':') for line in header_lines)
+        ]
+        return status_line.split()[1], response_headers, content
+    finally:
+        writer.close()
+
+
+async def _run_load(urls, headers, concurrency, duration):
+    latencies, statuses = [], {}
+    stop_at = time.monotonic() + duration
+
+    async def client(number):
+        client_headers = headers[number % len(headers)]
+        sent = 0
+        while time.monotonic() < stop_at:
+            url = urls[sent % len(urls)]
+            sent += 1
+            start = time.perf_counter()
+            try:
+                status, _, _ = await asyncio.wait_for(request(url, headers=client_headers), 60)
+            except (OSError, asyncio.TimeoutError, IndexError):
+                status = 'error'
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies, statuses, time.monotonic() - start
+
+
+def _percentile(latencies, fraction):
+    return latencies[max(int(len(latencies) * fraction) - 1, 0)] * 1000 if latencies else 0
+
+
+def run_load(urls, concurrency, duration, headers=None):
+    """
+    Request urls from concurrency clients for duration seconds.
+
+    Each client requests the urls (one or a list) in turn. headers is one
+    dict for every client or a list, client n using headers[n % len]; a
+    list of session cookies simulates that many different users. Returns
+    requests/s, latency percentiles in ms and the status counts.
+    """
+    urls = [urls] if isinstance(urls, str) else urls
+    headers = headers if isinstance(headers, list) else [headers or {}]
+    latencies, statuses, elapsed = asyncio.run(_run_load(urls, headers, concurrency, duration))
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95_ms': _percentile(latencies, 0.95),
+        'p99_ms': _percentile(latencies, 0.99),
+        'statuses': statuses,
+    }
+
+
+def format_statuses(statuses):
+    """Status counts as e.g. '200x950 502x3'"""
+    return ' '.join(f'{status}x{count}' for status, count in sorted(statuses.items()))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['serve']:
+        serve(*(int(n) for n in sys.argv[2:4]))
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,240 @@
+"""
+Cold-start profile of the WSGI entry point.
+
+Usage: python -m benchmarks.profile_coldstart [--runs N] [--output FILE]
+                                              [--compare BASELINE.json] [--path URL]
+
+Each run starts a fresh interpreter under ``python -X importtime`` and
+times, in order, the phases a new Vercel instance goes through before it
+can answer:
+
+    settings        import and evaluate quiz_app.settings
+    setup           django.setup(): logging, app configs, models, ready()
+    wsgi_handler    get_wsgi_application(): middleware chain
+    urlconf         resolve the root URLconf (imports every urls/views module)
+    templates       compile the templates of the main pages
+    first_request   the first request through the handler (--path, default /)
+    second_request  the same request again, for comparison
+
+The import log is folded into the time spent importing each installed
+app's own modules and a list of the slowest individual imports. Results
+are saved as JSON, by default to benchmarks/results/coldstart-<commit>.json;
+--compare prints the change against an earlier file so regressions show
+up between commits.
+
+Runs use the configured settings and environment but never write to the
+database. The first request should be a page that needs no tables (the
+landing page does not), and pages using {% static %} need
+`python manage.py collectstatic` to have been run, as the Vercel build does.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import BASE_DIR, RESULTS_DIR, git_commit, print_table
+
+PHASES = ['settings', 'setup', 'wsgi_handler', 'urlconf', 'templates', 'first_request', 'second_request']
+WARM_TEMPLATES = [
+    'accounts/home.html',
+    'home/dashboard.html',
+    'home/select_category.html',
+    'home/start_quiz_secure.html',
+]
+SLOWEST_IMPORTS = 15
+
+
+def _request(handler, path):
+    """Call the WSGI handler directly and return the status line"""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '443',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'https',
+        'wsgi.input': sys.stdin.buffer,
+        'wsgi.errors': sys.stderr,
+    }
+    status = []
+    body = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+    for _ in body:
+        pass
+    if hasattr(body, 'close'):
+        body.close()
+    return status[0]
+
+
+def child(path):
+    """Run the phases in this (fresh) interpreter and print their timings as JSON"""
+    timings = {}
+
+    def phase(name, func):
+        start = time.perf_counter()
+        result = func()
+        timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_app.settings')
+    from django.conf import settings
+    phase('settings', lambda: settings.INSTALLED_APPS)
+
+    import django
+    phase('setup', django.setup)
+
+    from django.core.wsgi import get_wsgi_application
+    handler = phase('wsgi_handler', get_wsgi_application)
+
+    from django.urls import get_resolver
+    phase('urlconf', lambda: get_resolver().url_patterns)
+
+    from django.template.loader import get_template
+    phase('templates', lambda: [get_template(name) for name in WARM_TEMPLATES])
+
+    status = phase('first_request', lambda: _request(handler, path))
+    phase('second_request', lambda: _request(handler, path))
+
+    print(json.dumps({'phases': timings, 'status': status, 'installed_apps': list(settings.INSTALLED_APPS)}))
+
+
+def parse_importtime(log):
+    """Map module name to (self µs, cumulative µs) from -X importtime output"""
+    modules = {}
+    for line in log.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name.split('.')[0] == 'benchmarks':
+            continue  # the harness itself
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def app_import_times(modules, installed_apps):
+    """
+    Import ms spent in each installed app's own modules.
+
+    Self times are summed over the package and everything below it, so
+    nested imports are neither missed nor counted twice; time spent
+    importing other packages on the app's behalf is not included.
+    """
+    apps = {}
+    for app in installed_apps:
+        package = app.split('.apps.')[0]
+        apps[package] = round(sum(
+            self_us for name, (self_us, _) in modules.items()
+            if name == package or name.startswith(package + '.')
+        ) / 1000, 1)
+    return apps
+
+
+def run_once(path):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.profile_coldstart', '--child', '--path', path],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f'Cold-start run failed:\n{result.stderr[-2000:]}')
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data['imports'] = parse_importtime(result.stderr)
+    return data
+
+
+def summarize(runs):
+    def spread(values):
+        return {
+            'median_ms': round(statistics.median(values), 1),
+            'min_ms': round(min(values), 1),
+            'max_ms': round(max(values), 1),
+        }
+
+    phases = {name: spread([r['phases'][name] for r in runs]) for name in PHASES}
+    phases['total'] = spread([sum(r['phases'][name] for name in PHASES[:-1]) for r in runs])
+
+    apps = {}
+    for run in runs:
+        for app, ms in app_import_times(run['imports'], run['installed_apps']).items():
+            apps.setdefault(app, []).append(ms)
+
+    self_times = {}
+    for run in runs:
+        for name, (self_us, _) in run['imports'].items():
+            self_times.setdefault(name, []).append(self_us / 1000)
+    slowest = sorted(
+        ((name, statistics.median(ms)) for name, ms in self_times.items()), key=lambda x: -x[1]
+    )[:SLOWEST_IMPORTS]
+
+    return {
+        'phases': phases,
+        'app_imports_ms': {app: round(statistics.median(ms), 1) for app, ms in apps.items()},
+        'slowest_imports_ms': {name: round(ms, 1) for name, ms in slowest},
+        'modules_imported': round(statistics.median(len(r['imports']) for r in runs)),
+        'first_request_status': runs[0]['status'],
+    }
+
+
+def compare(current, baseline):
+    rows = []
+    for name in PHASES + ['total']:
+        old = baseline['phases'].get(name, {}).get('median_ms')
+        new = current['phases'][name]['median_ms']
+        change = f'{(new - old) / old * 100:+.0f}%' if old else '-'
+        rows.append((name, old if old is not None else '-', new, change))
+    print(f"\nAgainst {baseline.get('commit', 'baseline')}:")
+    print_table(['phase', 'before ms', 'after ms', 'change'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile WSGI cold start')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/', help='URL for the first request')
+    parser.add_argument('--output', type=Path, help='JSON file to write (default: benchmarks/results/)')
+    parser.add_argument('--compare', type=Path, help='earlier JSON result to compare against')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path)
+        return
+
+    commit = git_commit()
+    result = {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'path': args.path,
+    }
+    result.update(summarize([run_once(args.path) for _ in range(args.runs)]))
+
+    print(f"Cold start of quiz_app.wsgi, {args.runs} runs, first request GET {args.path} "
+          f"-> {result['first_request_status']}")
+    if not result['first_request_status'].startswith(('2', '3')):
+        print('Warning: the first request failed, so its timing is not representative '
+              '(has collectstatic been run?)')
+    print_table(['phase', 'median ms', 'min ms', 'max ms'], [
+        (name, p['median_ms'], p['min_ms'], p['max_ms']) for name, p in result['phases'].items()
+    ])
+    print("\nImport time of each app's own modules")
+    print_table(['app', 'ms'], list(result['app_imports_ms'].items()))
+    print(f"\nSlowest imports (self time, {result['modules_imported']} modules imported)")
+    print_table(['module', 'ms'], list(result['slowest_imports_ms'].items()))
+
+    output = args.output or RESULTS_DIR / f'coldstart-{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + '\n')
+    print(f'\nSaved {output}')
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == '__main__':
+    main()
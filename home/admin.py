@@ -1,12 +1,17 @@
 # home/admin.py - UPDATED VERSION
 from django.contrib import admin
 from django.utils.html import format_html
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, When
+from .filters import matching_users
 from .models import Category, Question, QuizAttempt
+from .pagination import EstimatedCountPaginator
+from .stats import refresh_rollup, refresh_rollups_for, rollup_pairs
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name')
+    list_display = ('id', 'name', 'question_count', 'attempt_count')
     search_fields = ('name',)
 
 
@@ -34,6 +39,12 @@ class QuizAttemptAdmin(admin.ModelAdmin):
     list_filter = ('is_flagged', 'category', 'timestamp')
     search_fields = ('user__username', 'user__email', 'category__name')
     readonly_fields = ('timestamp', 'security_summary')
+    # Tuned for millions of attempts: one query for the page, no exact
+    # COUNT(*) of the whole table, and no <select> listing every user
+    list_select_related = ('user', 'category')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('user', 'category')
     
     fieldsets = (
         ('Quiz Information', {
@@ -45,20 +56,42 @@ class QuizAttemptAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # The percentage is computed in SQL so the column can be sorted
+        return super().get_queryset(request).annotate(
+            score_percentage=Case(
+                When(total__gt=0, then=F('score') * 100.0 / F('total')),
+                default=0.0,
+                output_field=FloatField(),
+            )
+        )
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Match users and categories in their own (small, indexed) tables
+        # first, then filter attempts by id, instead of LIKE across joins
+        for term in search_term.split():
+            queryset = queryset.filter(
+                Q(user_id__in=matching_users(term)) |
+                Q(category_id__in=Category.objects.filter(name__icontains=term).values('id'))
+            )
+        return queryset, False
+    
     def score_display(self, obj):
         return f"{obj.score}/{obj.total}"
     score_display.short_description = 'Score'
+    score_display.admin_order_field = 'score'
     
     def percentage(self, obj):
         if obj.total > 0:
-            percent = round((obj.score / obj.total) * 100, 1)
+            percent = round(obj.score_percentage, 1)
             color = 'green' if percent >= 70 else 'orange' if percent >= 50 else 'red'
             return format_html(
-                '<span style="color: {}; font-weight: bold;">{:.1f}%</span>',
-                color, percent
+                '<span style="color: {}; font-weight: bold;">{}%</span>',
+                color, f'{percent:.1f}'
             )
         return '0%'
     percentage.short_description = 'Score %'
+    percentage.admin_order_field = 'score_percentage'
     
     def security_status(self, obj):
         if obj.is_flagged:
@@ -73,6 +106,7 @@ class QuizAttemptAdmin(admin.ModelAdmin):
             '<span style="background-color: #dfe; color: #0a0; padding: 3px 8px; border-radius: 3px;">✓ CLEAN</span>'
         )
     security_status.short_description = 'Status'
+    security_status.admin_order_field = 'is_flagged'
     
     def security_summary(self, obj):
         violations = []
@@ -96,11 +130,40 @@ class QuizAttemptAdmin(admin.ModelAdmin):
     actions = ['flag_attempts', 'unflag_attempts']
     
     def flag_attempts(self, request, queryset):
-        updated = queryset.update(is_flagged=True)
+        with transaction.atomic():
+            pairs = rollup_pairs(queryset)
+            updated = queryset.update(is_flagged=True)
+            refresh_rollups_for(pairs)
         self.message_user(request, f'{updated} attempt(s) flagged successfully.')
     flag_attempts.short_description = "🚩 Flag selected attempts"
     
     def unflag_attempts(self, request, queryset):
-        updated = queryset.update(is_flagged=False)
+        with transaction.atomic():
+            pairs = rollup_pairs(queryset)
+            updated = queryset.update(is_flagged=False)
+            refresh_rollups_for(pairs)
         self.message_user(request, f'{updated} attempt(s) unflagged successfully.')
-    unflag_attempts.short_description = "✓ Unflag selected attempts"
\ No newline at end of file
+    unflag_attempts.short_description = "✓ Unflag selected attempts"
+    
+    # Keep the per-user/category rollup in step with admin edits
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = None
+            if change:
+                previous = QuizAttempt.objects.filter(pk=obj.pk).values_list('user_id', 'category_id').first()
+            super().save_model(request, obj, form, change)
+            if previous and previous != (obj.user_id, obj.category_id):
+                refresh_rollup(*previous)
+            refresh_rollup(obj.user_id, obj.category_id)
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            refresh_rollup(obj.user_id, obj.category_id)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            pairs = set(queryset.order_by().values_list('user_id', 'category_id'))
+            super().delete_queryset(request, queryset)
+            for user_id, category_id in pairs:
+                refresh_rollup(user_id, category_id)
\ No newline at end of file
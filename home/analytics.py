@@ -0,0 +1,178 @@
+"""
+Item analysis for a category's questions.
+
+For every question this reports the p-value (share of correct answers),
+the point-biserial discrimination (how well getting it right tracks the
+attempt's overall percentage) and how often each option was chosen. All of
+it comes from a single GROUP BY over AttemptAnswer joined to its attempt,
+returning a handful of rows per question however many answers are stored.
+
+Results are cached per category. A new, changed or deleted attempt bumps
+the category's version once its transaction commits (see home.signals), as
+does any change to the category's questions.
+"""
+
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Sum
+
+from .caching import bump_version, versioned_key
+from .models import AttemptAnswer, Question
+from .singleflight import get_or_compute
+
+OPTION_LETTERS = AttemptAnswer.OPTION_LETTERS
+
+# Thresholds used to flag questions worth a second look
+MIN_RESPONSES = 10
+EASY_P_VALUE = 0.9
+HARD_P_VALUE = 0.2
+WEAK_DISCRIMINATION = 0.2
+
+
+def _namespace(category_id):
+    return f'item_analysis:{category_id}'
+
+
+def invalidate_item_analysis(category_id):
+    """Drop the cached analysis for a category"""
+    bump_version(_namespace(category_id))
+
+
+def _answer_groups(category_id):
+    """
+    Count and percentage moments per (question, selected option, correct).
+
+    Grouping on exactly the columns of the AttemptAnswer analytics index
+    keeps the scan narrow; everything else is derived from these groups.
+    Attempts with answers always have total > 0, so the percentage needs no
+    NULL guard.
+    """
+    percentage = ExpressionWrapper(
+        F('attempt__score') * 100.0 / F('attempt__total'), output_field=FloatField()
+    )
+    return (
+        AttemptAnswer.objects
+        .filter(question_id__in=Question.objects.filter(category_id=category_id).values('id'),
+                attempt__total__gt=0)
+        .order_by()
+        .values('question_id', 'selected', 'is_correct')
+        .annotate(
+            count=Count('id'),
+            percentage_sum=Sum(percentage),
+            percentage_square_sum=Sum(percentage * percentage),
+        )
+    )
+
+
+def _combine(groups):
+    """Fold the answer groups into per-question totals"""
+    totals = defaultdict(lambda: {
+        'responses': 0, 'correct': 0, 'blank': 0, 'chosen': [0] * len(OPTION_LETTERS),
+        'sum': 0.0, 'square_sum': 0.0, 'correct_sum': 0.0,
+    })
+    for group in groups:
+        question = totals[group['question_id']]
+        question['responses'] += group['count']
+        question['sum'] += group['percentage_sum']
+        question['square_sum'] += group['percentage_square_sum']
+        if group['is_correct']:
+            question['correct'] += group['count']
+            question['correct_sum'] += group['percentage_sum']
+        if group['selected'] is None:
+            question['blank'] += group['count']
+        elif group['selected'] < len(OPTION_LETTERS):
+            question['chosen'][group['selected']] += group['count']
+    return totals
+
+
+def point_biserial(totals):
+    """
+    Correlation between answering correctly and the attempt percentage.
+
+    Uses the population standard deviation of the percentages of everyone
+    who answered the question; None when nobody or everybody got it right,
+    or every attempt scored the same.
+    """
+    responses, correct = totals['responses'], totals['correct']
+    if not 0 < correct < responses:
+        return None
+    mean = totals['sum'] / responses
+    variance = totals['square_sum'] / responses - mean * mean
+    if variance <= 1e-9:
+        return None
+    mean_correct = totals['correct_sum'] / correct
+    mean_incorrect = (totals['sum'] - totals['correct_sum']) / (responses - correct)
+    p_value = correct / responses
+    return (mean_correct - mean_incorrect) / math.sqrt(variance) * math.sqrt(p_value * (1 - p_value))
+
+
+def _flags(item):
+    if item['responses'] < MIN_RESPONSES:
+        return []
+
+    flags = []
+    if item['p_value'] >= EASY_P_VALUE:
+        flags.append('Too easy')
+    elif item['p_value'] <= HARD_P_VALUE:
+        flags.append('Too hard')
+
+    discrimination = item['discrimination']
+    if discrimination is not None and discrimination < 0:
+        flags.append('Negative discrimination - check the answer key')
+    elif discrimination is not None and discrimination < WEAK_DISCRIMINATION:
+        flags.append('Weak discrimination')
+
+    key_count = next((o['count'] for o in item['options'] if o['is_key']), 0)
+    if any(o['count'] > key_count for o in item['options'] if not o['is_key']):
+        flags.append('A distractor is chosen more often than the key')
+    return flags
+
+
+def compute_item_analysis(category_id):
+    """Per-question statistics for a category, straight from the database"""
+    questions = (
+        Question.objects.filter(category_id=category_id)
+        .order_by('id')
+        .values_list('id', 'question_text', 'correct_option')
+    )
+    totals = _combine(_answer_groups(category_id))
+
+    items = []
+    for question_id, text, correct_option in questions:
+        question = totals[question_id]
+        responses = question['responses']
+
+        options = []
+        for letter, count in zip(OPTION_LETTERS, question['chosen']):
+            options.append({
+                'letter': letter,
+                'count': count,
+                'share': round(count / responses * 100, 1) if responses else 0,
+                'is_key': letter == correct_option,
+            })
+
+        discrimination = point_biserial(question)
+        item = {
+            'id': question_id,
+            'question_text': text,
+            'correct_option': correct_option,
+            'responses': responses,
+            'blank': question['blank'],
+            'p_value': round(question['correct'] / responses, 3) if responses else None,
+            'discrimination': round(discrimination, 3) if discrimination is not None else None,
+            'options': options,
+        }
+        item['flags'] = _flags(item)
+        items.append(item)
+    return items
+
+
+def get_item_analysis(category_id):
+    """Cached compute_item_analysis; recomputed after attempts or questions change"""
+    return get_or_compute(
+        versioned_key(_namespace(category_id)),
+        lambda: compute_item_analysis(category_id),
+        settings.ITEM_ANALYSIS_CACHE_TIMEOUT,
+    )
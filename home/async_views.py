@@ -0,0 +1,87 @@
+"""
+Async versions of the pages every student hits during an exam.
+
+home.urls routes dashboard, start_quiz and quiz_result here instead of to
+home.views when ASYNC_VIEWS is on, which is meant for the ASGI deployment
+(uvicorn quiz_app.asgi:application). Reads go through the async ORM and
+cache API. Grading a submission still runs in a worker thread, because
+transaction.atomic() has no async form in Django 4.2.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import redirect, render, resolve_url
+
+from .grading import aserve_quiz, submit_attempt
+from .models import Category, QuizAttempt
+from .stats import aget_cached_dashboard_stats
+from .views import evaluation_context
+
+
+def login_required(view):
+    """login_required for async views; Django 4.2's decorator only wraps sync ones"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # request.user lazily loads the session and the user, which is sync-only
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path(), resolve_url('login'))
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@login_required
+async def dashboard(request):
+    """Display personalized user dashboard with quiz statistics and security notifications"""
+    user = request.user
+    context = {
+        'user': user,
+        'display_name': user.first_name if user.first_name else user.username,
+    }
+    context.update(await aget_cached_dashboard_stats(user))
+    return render(request, 'home/dashboard.html', context)
+
+
+@login_required
+async def start_quiz(request, category_id):
+    """Serve a shuffled quiz, or grade and save a submitted one"""
+    try:
+        category = await Category.objects.aget(id=category_id)
+    except Category.DoesNotExist:
+        raise Http404('No Category matches the given query.')
+
+    if request.method == 'POST':
+        attempt, results = await sync_to_async(submit_attempt)(request.user, category, request.POST)
+        if attempt is None:
+            messages.error(request, 'This quiz has expired or was already submitted. Please start it again.')
+            return redirect('select_category')
+        return render(request, 'home/evaluation.html', evaluation_context(category, attempt, results))
+
+    session, questions = await aserve_quiz(request.user, category)
+    if not questions:
+        messages.error(request, f'No questions available for {category.name} yet.')
+        return redirect('select_category')
+
+    return render(request, 'home/start_quiz_secure.html', {
+        'category': category,
+        'questions': questions,
+        'session_id': session.id,
+    })
+
+
+@login_required
+async def quiz_result(request, attempt_id):
+    """Display specific quiz result"""
+    try:
+        attempt = await QuizAttempt.objects.select_related('category').aget(id=attempt_id, user=request.user)
+    except QuizAttempt.DoesNotExist:
+        raise Http404('No QuizAttempt matches the given query.')
+    percentage = round((attempt.score / attempt.total) * 100, 1) if attempt.total > 0 else 0
+    return render(request, 'home/quiz_result.html', {
+        'attempt': attempt,
+        'percentage': percentage
+    })
@@ -0,0 +1,233 @@
+"""
+Versioned cache keys and hit/miss counters.
+
+Cached values are stored under ``<prefix>:v<version>``. Invalidating a
+namespace bumps its version instead of deleting keys, so every worker that
+shares the cache backend moves to fresh keys at once and stale entries
+simply age out.
+
+Versions live in the cache itself when CACHE_VERSION_STORE is 'cache',
+which only reaches every worker when the backend is shared (Redis,
+Memcached). With 'database' they are rows of the CacheVersion table
+instead: each worker keeps its values in its own local cache but reads the
+versions from the database, so a change made through one worker
+invalidates the others too. CacheVersionMiddleware has a request read
+each version at most once.
+
+Either way, the bumps a write triggers run after it commits
+(on_commit_once), not inside its transaction: bumped earlier, a concurrent
+reader could still see the old rows and cache them under the new version,
+where no later bump would clear them.
+
+cache_anonymous_page is the full-page counterpart for views that look
+the same to every visitor without a session.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.views.decorators.cache import cache_page
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.vary import vary_on_cookie
+
+from .models import CacheVersion
+
+# Cookies that make a visitor's pages their own
+VISITOR_COOKIES = {settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name}
+
+# Database versions already read by the current request
+_request_versions = ContextVar('request_versions', default=None)
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def _use_database():
+    return settings.CACHE_VERSION_STORE == 'database'
+
+
+def get_version(namespace):
+    """Current version of a namespace, initialising it on first use"""
+    if _use_database():
+        return _database_version(namespace)
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(namespace):
+    """get_version through the async cache API"""
+    if _use_database():
+        return await _adatabase_version(namespace)
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(namespace):
+    """Move a namespace to a new version, orphaning everything cached under the old one"""
+    if _use_database():
+        _bump_database_version(namespace)
+        return
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def _database_version(namespace):
+    versions = _request_versions.get()
+    if versions is not None and namespace in versions:
+        return versions[namespace]
+    version = CacheVersion.objects.filter(namespace=namespace).values_list('version', flat=True).first()
+    if version is None:
+        # Seeded from the clock, like the cache counter: a worker's local
+        # cache may outlive the table's rows (a restored or recreated database)
+        version = CacheVersion.objects.get_or_create(namespace=namespace, defaults={'version': time.time_ns()})[0].version
+    if versions is not None:
+        versions[namespace] = version
+    return version
+
+
+async def _adatabase_version(namespace):
+    versions = _request_versions.get()
+    if versions is not None and namespace in versions:
+        return versions[namespace]
+    version = await CacheVersion.objects.filter(namespace=namespace).values_list('version', flat=True).afirst()
+    if version is None:
+        version = (await CacheVersion.objects.aget_or_create(
+            namespace=namespace, defaults={'version': time.time_ns()}
+        ))[0].version
+    if versions is not None:
+        versions[namespace] = version
+    return version
+
+
+def _bump_database_version(namespace):
+    bumped = CacheVersion.objects.filter(namespace=namespace).update(version=F('version') + 1)
+    if not bumped:
+        _, created = CacheVersion.objects.get_or_create(namespace=namespace, defaults={'version': time.time_ns()})
+        if not created:
+            # Another worker created it first
+            CacheVersion.objects.filter(namespace=namespace).update(version=F('version') + 1)
+    versions = _request_versions.get()
+    if versions is not None:
+        # The rest of this request reads the new version
+        versions.pop(namespace, None)
+
+
+@contextmanager
+def request_versions():
+    """Read each database version at most once inside the block (one request)"""
+    token = _request_versions.set({})
+    try:
+        yield
+    finally:
+        _request_versions.reset(token)
+
+
+def on_commit_once(invalidate, *args):
+    """
+    Run invalidate(*args) once the current transaction commits.
+
+    Repeat requests for the same call before the commit are dropped, so a
+    write that touches many rows (a cascade, a bulk action) bumps each
+    namespace once. Outside a transaction it runs at once.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        invalidate(*args)
+        return
+
+    # Django replaces run_on_commit after every commit and rollback, which
+    # drops the calls this set remembers along with their callbacks
+    hooks, pending = getattr(connection, '_pending_invalidations', (None, None))
+    if hooks is not connection.run_on_commit:
+        pending = set()
+        connection._pending_invalidations = (connection.run_on_commit, pending)
+    call = (invalidate, args)
+    if call in pending:
+        return
+    pending.add(call)
+
+    def run():
+        pending.discard(call)
+        invalidate(*args)
+    transaction.on_commit(run)
+
+
+def versioned_key(namespace, *parts):
+    return ':'.join([namespace, *map(str, parts), f'v{get_version(namespace)}'])
+
+
+async def aversioned_key(namespace, *parts):
+    return ':'.join([namespace, *map(str, parts), f'v{await aget_version(namespace)}'])
+
+
+class CacheCounters:
+    """Thread-safe, per-process hit/miss counters for one cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            }
+
+
+def cache_anonymous_page(view):
+    """
+    Cache a page that every anonymous visitor sees the same way.
+
+    Requests carrying a session or flash messages always get a fresh page.
+    Pages with a form should not use it, since each visitor needs their own
+    CSRF token. As a safeguard, csrf_protect sets the CSRF cookie before the
+    page reaches the cache, which then refuses to store a page that hands a
+    new token to a visitor without cookies; pages vary on Cookie, so a token
+    is only ever served back to the visitor it belongs to.
+    """
+    varied = vary_on_cookie(csrf_protect(view))
+    cached = cache_page(settings.ANONYMOUS_PAGE_CACHE_SECONDS, key_prefix='anonymous')(varied)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and not VISITOR_COOKIES.intersection(request.COOKIES):
+            return cached(request, *args, **kwargs)
+        return varied(request, *args, **kwargs)
+    return wrapper
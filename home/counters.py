@@ -0,0 +1,68 @@
+"""
+Question and attempt counters stored on Category.
+
+The counts are kept in step by the signal handlers in home.signals, one
+``UPDATE ... SET n = n + 1`` per created, moved or deleted row, so listing
+categories reads only the category table. Bulk writes that bypass signals
+(bulk_create, QuerySet.update) call adjust_counts themselves, and
+reconcile_counts recomputes every counter from the rows should they drift.
+Deletes of many rows at once (a user and their attempts, a bulk admin
+delete) update each category once, and defer_count lets a transaction
+count its new row last (see home.grading.submit_attempt).
+"""
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Category, Question, QuizAttempt
+from .question_bank import invalidate_catalogue
+
+COUNTED = {'question_count': Question, 'attempt_count': QuizAttempt}
+
+
+def adjust_counts(category_id, questions=0, attempts=0):
+    """Add to (or, with negative numbers, subtract from) a category's counters"""
+    changes = {}
+    for field, delta in (('question_count', questions), ('attempt_count', attempts)):
+        if delta:
+            # Never below zero: a drifted counter is fixed by reconcile_counts
+            changes[field] = Greatest(F(field) + delta, Value(0))
+    if changes:
+        Category.objects.filter(pk=category_id).update(**changes)
+
+
+def defer_count(instance):
+    """
+    Leave a new row uncounted by the post_save handler; the caller adjusts.
+
+    The counter UPDATE locks the category row until the commit, so a
+    transaction that does more work after the insert should count last.
+    """
+    instance._count_deferred = True
+    return instance
+
+
+def _actual_count(model):
+    rows = model.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(n=Count('id'))
+    return Coalesce(Subquery(rows.values('n')), Value(0))
+
+
+def reconcile_counts():
+    """Recount every category whose counters are off; returns {name: (old, new) pairs}"""
+    actual = {f'actual_{field}': _actual_count(model) for field, model in COUNTED.items()}
+    stale = Category.objects.annotate(**actual).filter(
+        ~Q(question_count=F('actual_question_count')) | ~Q(attempt_count=F('actual_attempt_count'))
+    )
+
+    fixed = {}
+    for category in stale:
+        fixed[category.name] = tuple(
+            (getattr(category, field), getattr(category, f'actual_{field}')) for field in COUNTED
+        )
+    if fixed:
+        # Recounted inside the UPDATE so rows written meanwhile are not lost
+        Category.objects.filter(name__in=fixed).update(
+            **{field: _actual_count(model) for field, model in COUNTED.items()}
+        )
+        invalidate_catalogue()
+    return fixed
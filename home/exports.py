@@ -0,0 +1,132 @@
+"""
+Streaming export of quiz attempts as CSV or NDJSON.
+
+Rows are read as value tuples in fixed-size chunks and written to the
+response as they are produced, so peak memory depends on the chunk size
+rather than on how many attempts match the filters.
+"""
+
+import csv
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def _full_name(row):
+    return f"{row.user__first_name} {row.user__last_name}".strip() or row.user__username
+
+
+def _percentage(row):
+    return round((row.score / row.total * 100) if row.total > 0 else 0, 1)
+
+
+def _status(row):
+    if row.is_flagged:
+        return 'FLAGGED'
+    elif row.tab_switches > 0 or row.fullscreen_exits > 0:
+        return 'WARNING'
+    return 'CLEAN'
+
+
+# key: (CSV header, fields read from the database, value, CSV formatting)
+EXPORT_COLUMNS = {
+    'id': ('Attempt ID', ['id'], lambda r: r.id, None),
+    'username': ('Username', ['user__username'], lambda r: r.user__username, None),
+    'full_name': ('Full Name', ['user__first_name', 'user__last_name', 'user__username'], _full_name, None),
+    'email': ('Email', ['user__email'], lambda r: r.user__email, None),
+    'category': ('Category', ['category__name'], lambda r: r.category__name, None),
+    'score': ('Score', ['score'], lambda r: r.score, None),
+    'total': ('Total Questions', ['total'], lambda r: r.total, None),
+    'percentage': ('Percentage', ['score', 'total'], _percentage, lambda v: f"{v}%"),
+    'timestamp': ('Date & Time', ['timestamp'], lambda r: r.timestamp,
+                  lambda v: v.strftime('%Y-%m-%d %H:%M:%S')),
+    'flagged': ('Flagged', ['is_flagged'], lambda r: r.is_flagged, lambda v: 'Yes' if v else 'No'),
+    'tab_switches': ('Tab Switches', ['tab_switches'], lambda r: r.tab_switches, None),
+    'fullscreen_exits': ('Fullscreen Exits', ['fullscreen_exits'], lambda r: r.fullscreen_exits, None),
+    'status': ('Status', ['is_flagged', 'tab_switches', 'fullscreen_exits'], _status, None),
+}
+
+
+def parse_columns(value):
+    """
+    Column keys from a comma-separated ?columns= value, in the order given.
+
+    An empty value selects every column; unknown keys raise ValueError.
+    """
+    if not value:
+        return list(EXPORT_COLUMNS)
+    columns = [c.strip() for c in value.split(',') if c.strip()]
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export column(s): {', '.join(unknown)}")
+    return columns
+
+
+def iter_attempt_rows(attempts, columns, chunk_size=None):
+    """Yield named value tuples for the selected columns, newest first, chunk by chunk"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    fields = ['id', 'timestamp']
+    for column in columns:
+        fields.extend(f for f in EXPORT_COLUMNS[column][1] if f not in fields)
+
+    rows = attempts.order_by('-timestamp', '-id').values_list(*fields, named=True)
+
+    if not connections[rows.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from rows.iterator(chunk_size=chunk_size)
+        return
+
+    # Transaction-pooled Postgres cannot hold a server-side cursor and would
+    # buffer the whole result client-side, so walk the (timestamp, id) index
+    # one chunk per query instead.
+    last = None
+    while True:
+        batch = rows
+        if last is not None:
+            batch = rows.filter(Q(timestamp__lt=last.timestamp) | Q(timestamp=last.timestamp, id__lt=last.id))
+        batch = list(batch[:chunk_size])
+        yield from batch
+        if len(batch) < chunk_size:
+            return
+        last = batch[-1]
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([EXPORT_COLUMNS[c][0] for c in columns])
+    for row in rows:
+        line = []
+        for c in columns:
+            _, _, value, formatter = EXPORT_COLUMNS[c]
+            v = value(row)
+            line.append(formatter(v) if formatter else v)
+        yield writer.writerow(line)
+
+
+def stream_ndjson(rows, columns):
+    for row in rows:
+        record = {c: EXPORT_COLUMNS[c][2](row) for c in columns}
+        if 'timestamp' in record:
+            record['timestamp'] = record['timestamp'].isoformat()
+        yield json.dumps(record) + '\n'
+
+
+def stream_attempts(attempts, columns, export_format='csv'):
+    """Iterator of encoded output chunks for a StreamingHttpResponse"""
+    rows = iter_attempt_rows(attempts, columns)
+    if export_format == 'ndjson':
+        return stream_ndjson(rows, columns)
+    return stream_csv(rows, columns)
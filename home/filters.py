@@ -0,0 +1,114 @@
+"""
+Filters for the results browser and export.
+
+ResultsFilter parses and validates the GET parameters once and applies
+them to any QuizAttempt queryset, so view_all_results and
+export_results_csv always agree on what matches.
+
+Name/email search is resolved against auth_user first and applied to
+attempts as ``user_id IN (...)``, which uses the attempt user index rather
+than OR-ing four LIKE '%term%' predicates across a join. On Postgres the
+user lookup itself is served by the pg_trgm indexes added in migration
+0011; other backends scan the (much smaller) user table.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import timezone
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name', 'email')
+FLAGGED_CHOICES = ('', 'yes', 'no')
+
+
+def matching_users(term):
+    """Ids of users whose name, username or email contains the term"""
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': term})
+    return User.objects.filter(condition).values('id')
+
+
+class ResultsFilter:
+    """Validated results filters built from a GET QueryDict"""
+
+    def __init__(self, data):
+        self.errors = []
+        self.category_id = self._parse_id(data.get('category', ''), 'category')
+        self.user_id = self._parse_id(data.get('user', ''), 'user')
+        self.flagged = data.get('flagged', '')
+        if self.flagged not in FLAGGED_CHOICES:
+            self.errors.append(f'Invalid flagged filter "{self.flagged}"')
+            self.flagged = ''
+        self.date_from = self._parse_date(data.get('date_from', ''), 'start date')
+        self.date_to = self._parse_date(data.get('date_to', ''), 'end date')
+        self.search = data.get('search', '').strip()
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(request.GET)
+
+    def _parse_id(self, value, label):
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            self.errors.append(f'Invalid {label} filter "{value}"')
+            return None
+
+    def _parse_date(self, value, label):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            self.errors.append(f'Invalid {label} "{value}", expected YYYY-MM-DD')
+            return None
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def only_category_or_user(self):
+        """True when the rollup table alone can answer the summary figures"""
+        return not (self.flagged or self.date_from or self.date_to or self.search)
+
+    def as_dict(self):
+        """Cleaned values as strings, for re-populating the filter form"""
+        return {
+            'category': str(self.category_id or ''),
+            'user': str(self.user_id or ''),
+            'flagged': self.flagged,
+            'date_from': self.date_from.isoformat() if self.date_from else '',
+            'date_to': self.date_to.isoformat() if self.date_to else '',
+            'search': self.search,
+        }
+
+    def apply(self, attempts):
+        if self.category_id:
+            attempts = attempts.filter(category_id=self.category_id)
+
+        if self.user_id:
+            attempts = attempts.filter(user_id=self.user_id)
+
+        if self.flagged == 'yes':
+            attempts = attempts.filter(is_flagged=True)
+        elif self.flagged == 'no':
+            attempts = attempts.filter(is_flagged=False)
+
+        if self.date_from:
+            start = timezone.make_aware(datetime.combine(self.date_from, time.min))
+            attempts = attempts.filter(timestamp__gte=start)
+
+        if self.date_to:
+            # Add one day to include the entire end date
+            end = timezone.make_aware(datetime.combine(self.date_to + timedelta(days=1), time.min))
+            attempts = attempts.filter(timestamp__lt=end)
+
+        if self.search:
+            attempts = attempts.filter(user_id__in=matching_users(self.search))
+
+        return attempts
@@ -0,0 +1,148 @@
+"""
+Serving and grading quizzes against a persisted AttemptSession.
+
+When a quiz is rendered the served question ids and their order are
+stored server-side. Grading then looks up the answer key for exactly those
+ids (from the question cache, with a single in_bulk for anything it no
+longer holds) and ignores answers for questions that were never served. Each graded answer
+is then stored as an AttemptAnswer row with a single bulk insert.
+"""
+
+import random
+
+from django.db import transaction
+
+from .counters import adjust_counts, defer_count
+from .models import AttemptAnswer, AttemptSession, Question, QuizAttempt
+from .question_bank import aget_category_questions, get_category_questions
+from .stats import record_attempt
+
+OPTION_FIELDS = {'A': 'option_a', 'B': 'option_b', 'C': 'option_c', 'D': 'option_d'}
+
+
+def serve_quiz(user, category):
+    """Shuffle the category's questions and record them as the user's open session"""
+    questions = get_category_questions(category.id)
+    if not questions:
+        return None, questions
+    random.shuffle(questions)
+
+    # Only the most recently served quiz for a category can be submitted
+    AttemptSession.objects.filter(user=user, category=category).delete()
+    session = AttemptSession.objects.create(
+        user=user, category=category, question_ids=[q.id for q in questions]
+    )
+    return session, questions
+
+
+async def aserve_quiz(user, category):
+    """serve_quiz through the async cache API and ORM"""
+    questions = await aget_category_questions(category.id)
+    if not questions:
+        return None, questions
+    random.shuffle(questions)
+
+    await AttemptSession.objects.filter(user=user, category=category).adelete()
+    session = await AttemptSession.objects.acreate(
+        user=user, category=category, question_ids=[q.id for q in questions]
+    )
+    return session, questions
+
+
+def claim_session(user, category, session_id):
+    """
+    Take the user's open session for a submission, or None if there is none.
+
+    The session row is deleted as it is claimed, so a quiz can only be
+    graded once. Call inside the transaction that saves the attempt.
+    """
+    try:
+        session = AttemptSession.objects.get(id=session_id, user=user, category=category)
+    except (AttemptSession.DoesNotExist, ValueError, TypeError):
+        return None
+    deleted, _ = AttemptSession.objects.filter(pk=session.pk).delete()
+    return session if deleted else None
+
+
+def answer_key(category_id, question_ids):
+    """Served questions in order; ids missing from the category cache come from one in_bulk"""
+    cached = {q.id: q for q in get_category_questions(category_id)}
+    missing = [qid for qid in question_ids if qid not in cached]
+    if missing:
+        cached.update(Question.objects.in_bulk(missing))
+    # Questions deleted since they were served are dropped
+    return [cached[qid] for qid in question_ids if qid in cached]
+
+
+def grade(questions, answers):
+    """Score answers ({question id: option letter}) against the served questions in one pass"""
+    score = 0
+    results = []
+    for q in questions:
+        selected_option = answers.get(q.id)
+        is_correct = selected_option == q.correct_option
+        if is_correct:
+            score += 1
+
+        selected_field = OPTION_FIELDS.get(selected_option)
+        results.append({
+            'question': q.question_text,
+            'selected': getattr(q, selected_field) if selected_field else 'Not answered',
+            'correct': getattr(q, OPTION_FIELDS.get(q.correct_option, ''), 'N/A'),
+            'is_correct': is_correct
+        })
+    return score, results
+
+
+def record_answers(attempt, questions, answers):
+    """Store every graded answer of an attempt with one bulk INSERT"""
+    rows = []
+    for q in questions:
+        selected_option = answers.get(q.id)
+        rows.append(AttemptAnswer(
+            attempt=attempt,
+            question_id=q.id,
+            selected=AttemptAnswer.OPTION_LETTERS.index(selected_option)
+            if selected_option in OPTION_FIELDS else None,
+            is_correct=selected_option == q.correct_option,
+        ))
+    return AttemptAnswer.objects.bulk_create(rows)
+
+
+def submit_attempt(user, category, data):
+    """
+    Grade a submitted quiz (POST data) and save it in one transaction.
+
+    Returns the new attempt and the per-question results, or (None, [])
+    when the quiz expired or was already submitted.
+    """
+    tab_switches = int(data.get('tab_switches', '0'))
+    fullscreen_exits = int(data.get('fullscreen_exits', '0'))
+
+    with transaction.atomic():
+        # Grade only the questions this student was actually served
+        session = claim_session(user, category, data.get('session_id'))
+        if session is None:
+            return None, []
+
+        questions = answer_key(category.id, session.question_ids)
+        answers = {q.id: data.get(f'q{q.id}') for q in questions}
+        score, results = grade(questions, answers)
+
+        # Save quiz attempt with security tracking and update the user's rollup
+        attempt = defer_count(QuizAttempt(
+            user=user,
+            category=category,
+            score=score,
+            total=len(questions),
+            tab_switches=tab_switches,
+            fullscreen_exits=fullscreen_exits,
+            is_flagged=(tab_switches > 3 or fullscreen_exits > 2)
+        ))
+        attempt.save(force_insert=True)
+        record_answers(attempt, questions, answers)
+        record_attempt(attempt)
+        # Last, so the category row is locked only until the commit that
+        # follows, not while every submission for the category queues on it
+        adjust_counts(category.id, attempts=1)
+    return attempt, results
@@ -0,0 +1,111 @@
+"""
+Database health checks.
+
+Nothing here runs at import time. check_database() runs one trivial query
+on a Django connection, and get_health() reuses its result for
+HEALTH_CHECK_CACHE_SECONDS so frequent probes cost at most one query per
+interval per process. diagnose() walks through configuration, DNS, TCP and
+the query step by step for the check_database management command.
+"""
+
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+_lock = threading.Lock()
+_last_result = None
+_checked_at = 0.0
+
+
+def resolve(host, port):
+    """Addresses a host name resolves to; raises socket.gaierror when it does not"""
+    return sorted({info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)})
+
+
+def tcp_connect(host, port, timeout=2):
+    """Seconds taken to open (and close) a TCP connection to host:port"""
+    start = time.perf_counter()
+    with socket.create_connection((host, port), timeout=timeout):
+        return time.perf_counter() - start
+
+
+def check_database(alias='default'):
+    """Run SELECT 1 on a connection and report whether it worked and how long it took"""
+    connection = connections[alias]
+    start = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except DatabaseError as e:
+        return {'ok': False, 'vendor': connection.vendor, 'error': type(e).__name__}
+    return {
+        'ok': True,
+        'vendor': connection.vendor,
+        'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def get_health(force=False):
+    """check_database() for the default connection, cached for HEALTH_CHECK_CACHE_SECONDS"""
+    global _last_result, _checked_at
+    # Holding the lock while checking means concurrent probes share one query
+    with _lock:
+        age = time.monotonic() - _checked_at
+        if force or _last_result is None or age >= settings.HEALTH_CHECK_CACHE_SECONDS:
+            _last_result = check_database()
+            _checked_at = time.monotonic()
+        return dict(_last_result)
+
+
+def _server_version(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('SELECT sqlite_version()')
+            return f"SQLite {cursor.fetchone()[0]}"
+        cursor.execute('SELECT version()')
+        return cursor.fetchone()[0]
+
+
+def diagnose(alias='default', timeout=2):
+    """
+    Yield (step, ok, detail) tuples checking a connection from the ground up.
+
+    Network steps are skipped for databases without a host (SQLite); the
+    remaining steps are skipped once one fails.
+    """
+    connection = connections[alias]
+    db = connection.settings_dict
+    yield 'Configuration', True, (
+        f"{db['ENGINE']} name={db.get('NAME')} host={db.get('HOST') or '-'} "
+        f"port={db.get('PORT') or '-'} user={db.get('USER') or '-'} "
+        f"password={'set' if db.get('PASSWORD') else 'not set'}"
+    )
+
+    host = db.get('HOST')
+    if host:
+        port = int(db.get('PORT') or 5432)
+        try:
+            yield 'DNS resolution', True, ', '.join(resolve(host, port))
+        except socket.gaierror as e:
+            yield 'DNS resolution', False, str(e)
+            return
+        try:
+            yield 'TCP connect', True, f"{tcp_connect(host, port, timeout) * 1000:.0f} ms"
+        except OSError as e:
+            yield 'TCP connect', False, str(e)
+            return
+
+    try:
+        yield 'Query', True, _server_version(connection)
+        tables = connection.introspection.table_names()
+    except DatabaseError as e:
+        yield 'Query', False, str(e)
+        return
+    if tables:
+        yield 'Tables', True, f"{len(tables)} found"
+    else:
+        yield 'Tables', False, "none found, run 'python manage.py migrate'"
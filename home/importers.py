@@ -0,0 +1,239 @@
+"""
+Bulk import of question banks, and synthetic benchmark data.
+
+read_rows() streams question rows from CSV (header row), JSONL (one object
+per line) or JSON (a list of objects, which is parsed whole). Every row has
+the fields category, question_text, option_a..option_d and correct_option.
+
+QuestionImporter validates each row, skips questions its category already
+holds and writes the rest with bulk_create, one transaction per batch.
+Duplicates are found by hashing the normalised text (case and whitespace
+ignored) against a set loaded once per category, so the check costs no
+query per row. bulk_create sends no signals, so each batch bumps the
+category counters itself and the question and item-analysis caches of
+every category it touched are invalidated at the end.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .analytics import invalidate_item_analysis
+from .counters import adjust_counts
+from .models import Category, Question, QuizAttempt
+from .question_bank import invalidate_catalogue, invalidate_category
+
+FORMATS = ('csv', 'json', 'jsonl')
+OPTION_FIELDS = ('option_a', 'option_b', 'option_c', 'option_d')
+CORRECT_OPTIONS = 'ABCD'
+
+
+def detect_format(path):
+    """File format from the extension (.csv, .json, .jsonl/.ndjson)"""
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix == 'ndjson':
+        return 'jsonl'
+    if suffix not in FORMATS:
+        raise ValueError(f'Cannot tell the format of "{path}"; pass one of {", ".join(FORMATS)}')
+    return suffix
+
+
+def open_upload(upload):
+    """Read an UploadedFile as text, a chunk at a time, without loading it whole"""
+    upload.seek(0)
+    return io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+
+
+def read_rows(file, file_format):
+    """Yield (line or item number, row dict) from an open text file"""
+    if file_format == 'csv':
+        # Line numbers count the header as line 1
+        for number, row in enumerate(csv.DictReader(file), start=2):
+            yield number, row
+    elif file_format == 'jsonl':
+        for number, line in enumerate(file, start=1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, ValueError(f'invalid JSON: {e.msg}')
+    elif file_format == 'json':
+        items = json.load(file)
+        if not isinstance(items, list):
+            raise ValueError('A JSON question bank must be a list of objects')
+        yield from enumerate(items, start=1)
+    else:
+        raise ValueError(f'Unknown format "{file_format}"')
+
+
+def text_hash(text):
+    return hashlib.sha1(' '.join(text.split()).casefold().encode()).hexdigest()
+
+
+def _field_limits():
+    return {f.name: f.max_length for f in Question._meta.get_fields() if getattr(f, 'max_length', None)}
+
+
+class QuestionImporter:
+    """Validate, dedupe and bulk insert question rows; counts what happened"""
+
+    def __init__(self, batch_size=1000, dry_run=False, max_errors=100, default_category=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.default_category = default_category  # for rows without a category
+        self.limits = _field_limits()
+        self.category_limit = Category._meta.get_field('name').max_length
+        self.categories = {}  # name -> Category
+        self.known_hashes = {}  # category name -> hashes of its question texts
+        self.touched = set()
+        self.batch = []
+        self.created = self.duplicates = self.invalid = 0
+        self.errors = []
+
+    def clean(self, row):
+        """A validated field dict for a row; raises ValueError with the reason"""
+        if isinstance(row, Exception):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError('expected an object with the question fields')
+
+        values = {key: str(row.get(key) or '').strip() for key in ('category', 'question_text', *OPTION_FIELDS)}
+        values['category'] = values['category'] or self.default_category or ''
+        values['correct_option'] = str(row.get('correct_option') or '').strip().upper()
+
+        missing = [key for key, value in values.items() if not value]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        if values['correct_option'] not in CORRECT_OPTIONS:
+            raise ValueError(f"correct_option must be A, B, C or D, not \"{values['correct_option']}\"")
+        if len(values['category']) > self.category_limit:
+            raise ValueError(f'category is longer than {self.category_limit} characters')
+        for key, limit in self.limits.items():
+            if key in values and len(values[key]) > limit:
+                raise ValueError(f'{key} is longer than {limit} characters')
+        return values
+
+    def _category(self, name):
+        category = self.categories.get(name)
+        if category is None:
+            if self.dry_run:
+                category = Category.objects.filter(name=name).first() or Category(name=name)
+            else:
+                category, _ = Category.objects.get_or_create(name=name)
+            self.categories[name] = category
+
+            hashes = set()
+            if category.pk:
+                texts = Question.objects.filter(category=category).values_list('question_text', flat=True)
+                hashes = {text_hash(text) for text in texts.iterator()}
+            self.known_hashes[name] = hashes
+        return category
+
+    def add(self, number, row):
+        try:
+            values = self.clean(row)
+        except ValueError as e:
+            self.invalid += 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append(f'Row {number}: {e}')
+            return
+
+        name = values.pop('category')
+        category = self._category(name)
+        digest = text_hash(values['question_text'])
+        if digest in self.known_hashes[name]:
+            self.duplicates += 1
+            return
+        self.known_hashes[name].add(digest)
+        self.batch.append(Question(category=category, **values))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch and not self.dry_run:
+            with transaction.atomic():
+                Question.objects.bulk_create(self.batch)
+                for category_id, count in Counter(q.category_id for q in self.batch).items():
+                    adjust_counts(category_id, questions=count)
+            self.touched.update(q.category_id for q in self.batch)
+        self.created += len(self.batch)
+        self.batch = []
+
+    def run(self, rows):
+        """
+        Import (number, row) pairs; returns self for the counts.
+
+        Batches already written stay written if reading fails part way, so
+        the caches are invalidated whether or not the run completes.
+        """
+        try:
+            for number, row in rows:
+                self.add(number, row)
+            self.flush()
+        finally:
+            for category_id in self.touched:
+                invalidate_category(category_id)
+                invalidate_item_analysis(category_id)
+            if self.touched:
+                invalidate_catalogue()
+        return self
+
+
+def synthetic_questions(count, categories, seed=0):
+    """Rows for count made-up questions spread over the given category names"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield i + 1, {
+            'category': categories[i % len(categories)],
+            'question_text': f'Synthetic question {i + 1}',
+            **{field: f'Answer {letter} to question {i + 1}' for field, letter in zip(OPTION_FIELDS, CORRECT_OPTIONS)},
+            'correct_option': rng.choice(CORRECT_OPTIONS),
+        }
+
+
+def create_synthetic_users(count, batch_size=1000, password='password123'):
+    """Bulk-create students synthetic_user_1..count that do not exist yet; returns how many were new"""
+    usernames = [f'synthetic_user_{i}' for i in range(1, count + 1)]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    hashed = make_password(password)  # hashed once for every user
+    users = [
+        User(username=username, email=f'{username}@example.com', password=hashed)
+        for username in usernames if username not in existing
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+    return len(users)
+
+
+def create_synthetic_attempts(count, user_ids, category_ids, batch_size=1000, seed=0):
+    """Bulk-insert count random attempts, one transaction per batch; rollups are not updated"""
+    rng = random.Random(seed)
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(batch_size, count - created)):
+            total = 20
+            tab_switches = rng.choice([0, 0, 0, 1, 5])
+            batch.append(QuizAttempt(
+                user_id=rng.choice(user_ids),
+                category_id=rng.choice(category_ids),
+                score=rng.randint(0, total),
+                total=total,
+                tab_switches=tab_switches,
+                is_flagged=tab_switches > 3,
+            ))
+        with transaction.atomic():
+            QuizAttempt.objects.bulk_create(batch)
+            for category_id, attempts in Counter(a.category_id for a in batch).items():
+                adjust_counts(category_id, attempts=attempts)
+        created += len(batch)
+    return created
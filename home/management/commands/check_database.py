@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.health import diagnose
+
+
+class Command(BaseCommand):
+    help = "Check that the configured database resolves, accepts connections and answers queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to check")
+        parser.add_argument('--timeout', type=float, default=2, help="TCP connect timeout in seconds")
+
+    def handle(self, *args, **options):
+        failed = False
+        for step, ok, detail in diagnose(options['database'], options['timeout']):
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(f"{style('OK' if ok else 'FAIL'):>4}  {step}: {detail}")
+            failed = failed or not ok
+        if failed:
+            raise CommandError("Database check failed")
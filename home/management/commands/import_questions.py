@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from home.analytics import invalidate_item_analysis
+from home.importers import (
+    FORMATS, QuestionImporter, create_synthetic_attempts, create_synthetic_users,
+    detect_format, read_rows, synthetic_questions,
+)
+from home.models import Category
+from home.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a question bank from CSV, JSON or JSONL (fields: category, question_text, "
+        "option_a..option_d, correct_option), skipping questions that already exist. "
+        "With --synthetic, generate benchmark data instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='question bank file')
+        parser.add_argument('--format', choices=FORMATS, help='file format (default: from the extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='rows per INSERT and transaction')
+        parser.add_argument('--dry-run', action='store_true', help='validate and count without writing')
+        parser.add_argument('--synthetic', type=int, metavar='QUESTIONS',
+                            help='generate this many questions instead of reading a file')
+        parser.add_argument('--categories', type=int, default=10, help='synthetic categories (default: 10)')
+        parser.add_argument('--users', type=int, default=0, help='synthetic students to create')
+        parser.add_argument('--attempts', type=int, default=0, help='synthetic quiz attempts to create')
+        parser.add_argument('--seed', type=int, default=0, help='random seed for synthetic data')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        importer = QuestionImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        if options['synthetic'] is not None:
+            if options['dry_run']:
+                raise CommandError('--dry-run only applies to imported files')
+            if options['categories'] < 1:
+                raise CommandError('--categories must be at least 1')
+            for option in ('users', 'attempts'):
+                if options[option] < 0:
+                    raise CommandError(f'--{option} must not be negative')
+            self.synthetic(importer, options)
+            return
+
+        if not options['path']:
+            raise CommandError('Give a question bank file, or --synthetic QUESTIONS')
+        try:
+            file_format = options['format'] or detect_format(options['path'])
+            with open(options['path'], encoding='utf-8-sig', newline='') as file:
+                importer.run(read_rows(file, file_format))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        self.report(importer)
+
+    def report(self, importer):
+        for error in importer.errors:
+            self.stderr.write(error)
+        if importer.invalid > len(importer.errors):
+            self.stderr.write(f"... and {importer.invalid - len(importer.errors)} more invalid row(s)")
+        verb = 'Would import' if importer.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {importer.created} question(s); skipped {importer.duplicates} duplicate(s) "
+            f"and {importer.invalid} invalid row(s)"
+        ))
+
+    def synthetic(self, importer, options):
+        names = [f'Synthetic Category {i}' for i in range(1, options['categories'] + 1)]
+        importer.run(synthetic_questions(options['synthetic'], names, options['seed']))
+        self.report(importer)
+
+        if options['users']:
+            created = create_synthetic_users(options['users'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Created {created} synthetic user(s) (password123)"))
+
+        if options['attempts']:
+            user_ids = list(User.objects.filter(username__startswith='synthetic_user_').values_list('id', flat=True))
+            category_ids = list(Category.objects.filter(name__in=names).values_list('id', flat=True))
+            if not user_ids or not category_ids:
+                raise CommandError('--attempts needs synthetic users (--users) and categories')
+            created = create_synthetic_attempts(
+                options['attempts'], user_ids, category_ids, options['batch_size'], options['seed'],
+            )
+            # bulk_create skipped the signals that keep these up to date
+            rebuild_rollups()
+            for category_id in category_ids:
+                invalidate_item_analysis(category_id)
+            self.stdout.write(self.style.SUCCESS(f"Created {created} synthetic attempt(s) and rebuilt the rollups"))
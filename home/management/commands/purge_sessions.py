@@ -0,0 +1,31 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from home.models import AttemptSession
+
+
+class Command(BaseCommand):
+    help = "Delete expired login sessions and quizzes that were served but never submitted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--attempt-hours', type=int, default=24,
+            help='Delete served quizzes older than this many hours (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        try:
+            engine.SessionStore.clear_expired()
+        except NotImplementedError:
+            self.stdout.write(f"{settings.SESSION_ENGINE} cannot clear expired sessions, skipping")
+        else:
+            self.stdout.write(self.style.SUCCESS("Cleared expired login sessions"))
+
+        cutoff = timezone.now() - timedelta(hours=options['attempt_hours'])
+        deleted, _ = AttemptSession.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unsubmitted quiz session(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from home.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user/per-category score rollup table from raw quiz attempts"
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} score rollup row(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from home.counters import reconcile_counts
+
+
+class Command(BaseCommand):
+    help = "Recount the question and attempt counters of every category that has drifted"
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counts()
+        for name, ((old_questions, questions), (old_attempts, attempts)) in fixed.items():
+            self.stdout.write(
+                f"{name}: questions {old_questions} -> {questions}, attempts {old_attempts} -> {attempts}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(fixed)} category counter(s)"))
@@ -0,0 +1,106 @@
+"""
+Project middleware.
+
+Session expiry refresh without a write on every request:
+SESSION_SAVE_EVERY_REQUEST would UPDATE the session row on every page
+view just to push its expiry forward. SessionRefreshMiddleware instead
+marks the session modified only when it was last refreshed at least
+SESSION_REFRESH_SECONDS ago, so a session is renewed at most once per
+interval and ordinary page views write nothing. Sessions still expire
+SESSION_COOKIE_AGE after the last renewal, i.e. within one interval of
+the last activity.
+
+CacheVersionMiddleware scopes home.caching.request_versions to each
+request, so with CACHE_VERSION_STORE = 'database' a cache namespace's
+version costs at most one query per request however often it is read.
+
+QueryCountMiddleware, installed when QUERY_COUNT_HEADER is on, reports the
+number of SQL queries behind each response in an X-DB-Query-Count header
+so load tests can track it per endpoint without DEBUG.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+from .caching import request_versions
+
+REFRESHED_AT_KEY = '_refreshed_at'
+
+
+class SessionRefreshMiddleware:
+    """Renew the session expiry at most once per SESSION_REFRESH_SECONDS; must come after SessionMiddleware"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.refresh(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.refresh(request)
+        return response
+
+    def refresh(self, request):
+        session = getattr(request, 'session', None)
+        # Sessions the request never touched, and flushed ones, are left alone.
+        # An accessed session is already loaded, so nothing here hits the database.
+        if session is None or not session.accessed or session.is_empty():
+            return
+
+        now = int(time.time())
+        # A session saved anyway (e.g. at login) is stamped for free
+        if session.modified or now - session.get(REFRESHED_AT_KEY, 0) >= settings.SESSION_REFRESH_SECONDS:
+            session[REFRESHED_AT_KEY] = now
+
+
+class CacheVersionMiddleware:
+    """Remember the cache versions read from the database for the rest of the request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_versions():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_versions():
+            return await self.get_response(request)
+
+
+class QueryCountMiddleware:
+    """Count the default database's queries per request into X-DB-Query-Count"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        response['X-DB-Query-Count'] = str(count)
+        return response
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, F, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def backfill_stats(apps, schema_editor):
+    QuizAttempt = apps.get_model('home', 'QuizAttempt')
+    UserCategoryStats = apps.get_model('home', 'UserCategoryStats')
+
+    percentage = Coalesce(
+        Cast(F('score') * 100.0 / NullIf(F('total'), 0), FloatField()),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+    rows = (
+        QuizAttempt.objects.filter(user__isnull=False).order_by()
+        .values('user_id', 'category_id')
+        .annotate(
+            attempt_count=Count('id'),
+            percentage_sum=Sum(percentage),
+            best_percentage=Max(percentage),
+            flagged_count=Count('id', filter=Q(is_flagged=True)),
+            last_attempt_at=Max('timestamp'),
+        )
+    )
+    UserCategoryStats.objects.bulk_create(
+        [UserCategoryStats(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('home', '0008_alter_quizattempt_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('percentage_sum', models.FloatField(default=0)),
+                ('best_percentage', models.FloatField(default=0)),
+                ('flagged_count', models.PositiveIntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='home.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='usercategorystats',
+            constraint=models.UniqueConstraint(fields=('user', 'category'), name='unique_user_category_stats'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
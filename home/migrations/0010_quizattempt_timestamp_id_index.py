@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_usercategorystats'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='quizattempt',
+            options={'ordering': ['-timestamp', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['-timestamp', '-id'], name='quizattempt_timestamp_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0012_attemptsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttemptAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Option A'), (1, 'Option B'), (2, 'Option C'), (3, 'Option D')], help_text='Index of the chosen option (0 = A); empty when unanswered', null=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='home.quizattempt')),
+                ('question', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='home.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'selected', 'is_correct', 'attempt'], name='attemptanswer_analytics_idx')],
+            },
+        ),
+    ]
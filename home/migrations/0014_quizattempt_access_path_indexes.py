@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # The composite indexes lead with user/category, so they are built before
+    # the single-column foreign key indexes they replace are dropped
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('home', '0013_attemptanswer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='quizattempt_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['category', '-timestamp', '-id'], name='quizattempt_category_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('is_flagged', True)), fields=['-timestamp', '-id'], name='quizattempt_flagged_idx'),
+        ),
+        migrations.AlterField(
+            model_name='quizattempt',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='home.category'),
+        ),
+        migrations.AlterField(
+            model_name='quizattempt',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    Category = apps.get_model('home', 'Category')
+
+    def count(model_name):
+        model = apps.get_model('home', model_name)
+        rows = model.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(n=Count('id'))
+        return Coalesce(Subquery(rows.values('n')), Value(0))
+
+    Category.objects.update(question_count=count('Question'), attempt_count=count('QuizAttempt'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0014_quizattempt_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,9 @@ from django.contrib.auth.models import User
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # Maintained by home.signals (see home.counters), not edited directly
+    question_count = models.PositiveIntegerField(default=0, editable=False)
+    attempt_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -32,8 +35,9 @@ class Question(models.Model):
 
     
 class QuizAttempt(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)  # Add null=True temporarily
-    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    # Both foreign keys are covered by the composite indexes in Meta, which lead with them
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False)  # Add null=True temporarily
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, db_index=False)
     score = models.IntegerField()
     total = models.IntegerField()
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -57,7 +61,21 @@ class QuizAttempt(models.Model):
         super().save(*args, **kwargs)
     
     class Meta:
-        ordering = ['-timestamp']
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            # Keyset pagination walks this index newest first; it also serves
+            # timestamp range filters, so there is no separate timestamp index
+            models.Index(fields=['-timestamp', '-id'], name='quizattempt_timestamp_id_idx'),
+            # A user's or a category's attempts, newest first
+            models.Index(fields=['user', '-timestamp', '-id'], name='quizattempt_user_time_idx'),
+            models.Index(fields=['category', '-timestamp', '-id'], name='quizattempt_category_time_idx'),
+            # Flagged attempts are rare, so only they are indexed
+            models.Index(
+                fields=['-timestamp', '-id'],
+                condition=models.Q(is_flagged=True),
+                name='quizattempt_flagged_idx',
+            ),
+        ]
 
 
     class Profile_Type(models.Model):
@@ -68,4 +86,70 @@ class QuizAttempt(models.Model):
     ])
 
     def __str__(self):
-        return self.user.username
\ No newline at end of file
+        return self.user.username
+
+class UserCategoryStats(models.Model):
+    """Running per-user, per-category totals kept in step with QuizAttempt writes"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_stats')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='user_stats')
+    attempt_count = models.PositiveIntegerField(default=0)
+    percentage_sum = models.FloatField(default=0)
+    best_percentage = models.FloatField(default=0)
+    flagged_count = models.PositiveIntegerField(default=0)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category'], name='unique_user_category_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category.name}: {self.attempt_count} attempt(s)"
+
+    @property
+    def average_percentage(self):
+        return self.percentage_sum / self.attempt_count if self.attempt_count else 0
+
+
+class AttemptSession(models.Model):
+    """Questions served to a student for one quiz, in the order they were shown"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attempt_sessions')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='attempt_sessions')
+    question_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category.name}: {len(self.question_ids)} question(s)"
+
+
+class AttemptAnswer(models.Model):
+    """One graded answer of a quiz attempt, kept for item analysis"""
+    OPTION_LETTERS = 'ABCD'
+
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name='answers')
+    # Covered by the analytics index below, which leads with question
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='answers', db_index=False)
+    selected = models.PositiveSmallIntegerField(
+        null=True, blank=True,
+        choices=[(i, f'Option {letter}') for i, letter in enumerate(OPTION_LETTERS)],
+        help_text='Index of the chosen option (0 = A); empty when unanswered',
+    )
+    is_correct = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Per-question analytics read only these columns
+            models.Index(fields=['question', 'selected', 'is_correct', 'attempt'], name='attemptanswer_analytics_idx'),
+        ]
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id} - Question {self.question_id}: {'correct' if self.is_correct else 'incorrect'}"
+
+
+class CacheVersion(models.Model):
+    """Version of a cache namespace, shared by every worker (see home.caching)"""
+    namespace = models.CharField(max_length=200, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.namespace} v{self.version}"
@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination over quiz attempts ordered newest first.
+
+Pages are addressed by the (timestamp, id) of the row at their edge instead
+of an OFFSET, so the database walks the (timestamp, id) index straight to
+the page and page N costs the same as page 1.
+
+EstimatedCountPaginator is for the admin changelist, which still pages by
+number: on Postgres it takes large row counts from the planner instead of
+running COUNT(*) over the table.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Below this many (estimated) rows an exact COUNT(*) is cheap enough
+EXACT_COUNT_LIMIT = 10_000
+
+
+def encode_cursor(timestamp, pk):
+    """Opaque, URL-safe cursor for a row's (timestamp, id)"""
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Inverse of encode_cursor; returns None for missing or malformed cursors"""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        timestamp, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_page_size(value):
+    """Requested page size clamped to the configured maximum"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return settings.RESULTS_PAGE_SIZE
+    return max(1, min(size, settings.RESULTS_MAX_PAGE_SIZE))
+
+
+class KeysetPage:
+    """One page of rows plus the cursors that lead to its neighbours"""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def paginate_attempts(queryset, after=None, before=None, page_size=None):
+    """
+    Fetch one page of attempts, newest first.
+
+    ``after`` moves to older rows than the cursor, ``before`` to newer ones;
+    with neither, the first page is returned. Only page_size + 1 rows are
+    read to find out whether another page exists.
+    """
+    page_size = page_size or settings.RESULTS_PAGE_SIZE
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        timestamp, pk = before
+        rows = list(
+            queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk))
+            .order_by('timestamp', 'id')[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        items = list(reversed(rows[:page_size]))
+        has_next, has_previous = True, has_more
+    else:
+        if after:
+            timestamp, pk = after
+            queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+        rows = list(queryset.order_by('-timestamp', '-id')[:page_size + 1])
+        items = rows[:page_size]
+        has_next, has_previous = len(rows) > page_size, after is not None
+
+    next_cursor = previous_cursor = None
+    if items and has_next:
+        next_cursor = encode_cursor(items[-1].timestamp, items[-1].id)
+    if items and has_previous:
+        previous_cursor = encode_cursor(items[0].timestamp, items[0].id)
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def estimated_count(queryset):
+    """The planner's row estimate for a queryset (Postgres only)"""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner's estimate for big results.
+
+    Counting millions of rows exactly is a full scan on Postgres; the
+    estimate is free and close enough to size the page links. Small
+    results, and other databases, are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if getattr(queryset, 'db', None) and connections[queryset.db].vendor == 'postgresql':
+            estimate = estimated_count(queryset)
+            if estimate >= EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
@@ -0,0 +1,83 @@
+"""
+Per-category question cache for start_quiz.
+
+A category's questions are stored as a tuple of plain tuples
+(id, text, four options, correct option) under a key that includes the
+category's cache version. The signal handlers in home.signals bump that
+version whenever a question or category changes, so readers never see
+stale questions and no explicit delete is needed. Misses go through
+home.singleflight, so a popular category is loaded once, not once per
+concurrent request.
+
+The catalogue version covers what the category pickers show (category
+names and question counts); their template fragments are cached under it
+and any category or question change bumps it.
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+
+from .caching import CacheCounters, aversioned_key, bump_version, get_version, versioned_key
+from .models import Question
+from .singleflight import aget_or_compute, get_or_compute
+
+QuestionRecord = namedtuple(
+    'QuestionRecord',
+    ['id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option'],
+)
+
+CATALOGUE = 'catalogue'
+
+counters = CacheCounters()
+
+
+def _namespace(category_id):
+    return f'question_bank:{category_id}'
+
+
+def _question_rows(category_id):
+    return Question.objects.filter(category_id=category_id).order_by('id').values_list(*QuestionRecord._fields)
+
+
+def get_category_questions(category_id):
+    """All questions of a category as QuestionRecords, from the cache when possible"""
+    rows = get_or_compute(
+        versioned_key(_namespace(category_id)),
+        lambda: tuple(_question_rows(category_id)),
+        settings.QUESTION_CACHE_TIMEOUT,
+        counters=counters,
+    )
+    return [QuestionRecord._make(row) for row in rows]
+
+
+async def aget_category_questions(category_id):
+    """get_category_questions through the async cache API and ORM"""
+    async def compute():
+        return tuple([row async for row in _question_rows(category_id)])
+
+    rows = await aget_or_compute(
+        await aversioned_key(_namespace(category_id)),
+        compute,
+        settings.QUESTION_CACHE_TIMEOUT,
+        counters=counters,
+    )
+    return [QuestionRecord._make(row) for row in rows]
+
+
+def invalidate_category(category_id):
+    """Drop the cached question set for a category"""
+    bump_version(_namespace(category_id))
+
+
+def catalogue_version():
+    return get_version(CATALOGUE)
+
+
+def invalidate_catalogue():
+    """Re-render every cached category list"""
+    bump_version(CATALOGUE)
+
+
+def get_stats():
+    return counters.as_dict()
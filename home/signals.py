@@ -0,0 +1,137 @@
+import weakref
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .analytics import invalidate_item_analysis
+from .caching import on_commit_once
+from .counters import adjust_counts
+from .models import Category, Question, QuizAttempt
+from .question_bank import invalidate_catalogue, invalidate_category
+from .stats import invalidate_dashboard_on_commit
+
+COUNTER_ARGUMENT = {Question: 'questions', QuizAttempt: 'attempts'}
+
+# Rows a delete() in progress will remove, by its origin: {(category_id, argument): count}
+_deleted_counts = weakref.WeakKeyDictionary()
+
+
+def deleted_with_category(origin):
+    """True for rows removed by their category's cascade, which settles their caches and counters once"""
+    return isinstance(origin, Category) or getattr(origin, 'model', None) is Category
+
+
+@receiver(post_init, sender=Question)
+def remember_question_category(sender, instance, **kwargs):
+    # Kept so a question moved to another category invalidates both sets
+    instance._original_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_bank(sender, instance, origin=None, **kwargs):
+    if deleted_with_category(origin):
+        return
+    category_ids = {instance.category_id}
+    original = getattr(instance, '_original_category_id', None)
+    if original:
+        category_ids.add(original)
+    instance._original_category_id = instance.category_id
+    # After the commit: bumped inside the transaction, a concurrent reader
+    # could cache the old questions (and answer key) under the new version
+    for category_id in category_ids:
+        on_commit_once(invalidate_category, category_id)
+        on_commit_once(invalidate_item_analysis, category_id)
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_deleted_category(sender, instance, **kwargs):
+    on_commit_once(invalidate_category, instance.id)
+    on_commit_once(invalidate_item_analysis, instance.id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_category_lists(sender, instance, origin=None, **kwargs):
+    if sender is Question and deleted_with_category(origin):
+        return
+    # After the commit, once the question counters are updated as well
+    on_commit_once(invalidate_catalogue)
+
+
+@receiver(post_save, sender=QuizAttempt)
+@receiver(post_delete, sender=QuizAttempt)
+def invalidate_attempt_analysis(sender, instance, origin=None, **kwargs):
+    if deleted_with_category(origin):
+        return
+    # Wait for the commit: the attempt's answers are written after it in the
+    # same transaction, and a reader must not cache the analysis without them
+    on_commit_once(invalidate_item_analysis, instance.category_id)
+
+
+@receiver(post_init, sender=QuizAttempt)
+def remember_attempt_user(sender, instance, **kwargs):
+    instance._dashboard_user_id = instance.__dict__.get('user_id')
+
+
+@receiver(post_save, sender=QuizAttempt)
+@receiver(post_delete, sender=QuizAttempt)
+def invalidate_user_dashboard(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return  # removed with the user, who has no dashboard left
+    if instance.user_id:
+        invalidate_dashboard_on_commit(instance.user_id)
+    # An attempt moved to another user (admin edit) leaves the old one stale too
+    previous = getattr(instance, '_dashboard_user_id', None)
+    if previous and previous != instance.user_id:
+        invalidate_dashboard_on_commit(previous)
+    instance._dashboard_user_id = instance.user_id
+
+
+@receiver(post_init, sender=Question)
+@receiver(post_init, sender=QuizAttempt)
+def remember_counted_category(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred category_id is not fetched per row
+    instance._counted_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=QuizAttempt)
+def count_saved(sender, instance, created, **kwargs):
+    argument = COUNTER_ARGUMENT[sender]
+    previous = getattr(instance, '_counted_category_id', None)
+    if created and not getattr(instance, '_count_deferred', False):
+        adjust_counts(instance.category_id, **{argument: 1})
+    elif not created and previous and previous != instance.category_id:
+        adjust_counts(previous, **{argument: -1})
+        adjust_counts(instance.category_id, **{argument: 1})
+    instance._counted_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender=Question)
+@receiver(pre_delete, sender=QuizAttempt)
+def tally_deleted(sender, instance, origin=None, **kwargs):
+    # Rows removed along with their category have no counter left to update
+    if deleted_with_category(origin):
+        return
+    # A delete sends every pre_delete before its first post_delete, so the
+    # rows of one delete() (a user's attempts, an admin bulk delete) are
+    # tallied here and counted with one UPDATE per category
+    _deleted_counts.setdefault(origin, Counter())[instance.category_id, COUNTER_ARGUMENT[sender]] += 1
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=QuizAttempt)
+def count_deleted(sender, instance, origin=None, **kwargs):
+    tally = _deleted_counts.pop(origin, None)
+    if not tally:
+        return  # counted with the first row of this delete
+    changes = defaultdict(dict)
+    for (category_id, argument), count in tally.items():
+        changes[category_id][argument] = -count
+    for category_id, deltas in changes.items():
+        adjust_counts(category_id, **deltas)
@@ -0,0 +1,225 @@
+"""
+Single-flight loading for cached values.
+
+When a hot cache entry expires, every request that misses it would
+otherwise run the same query at once. get_or_compute (and its async twin,
+aget_or_compute) let exactly one caller recompute a key while the others
+wait for its result or are served the previous value:
+
+* Entries are stored with a soft expiry ``timeout`` seconds ahead and kept
+  by the backend ``stale`` seconds (CACHE_STALE_SECONDS) longer. Past the
+  soft expiry the value is stale: one caller recomputes it, everyone else
+  keeps getting the old value until the new one is stored
+  (stale-while-revalidate).
+* Before the soft expiry, a caller may refresh early with a probability
+  that grows as expiry nears and with how long the value took to compute
+  (the XFetch rule, scaled by ``beta``), so busy keys are usually renewed
+  before they ever go stale.
+* Threads of one process coordinate through a lock per key, coroutines of
+  one event loop through a shared future, and separate workers through a
+  short-lived lock key taken with cache.add(). A caller that finds the key
+  locked by another worker and has no stale value polls for the result for
+  up to WAIT_SECONDS, then computes it anyway, so a crashed worker
+  delays others at most that long.
+
+Invalidation by version (home.caching) moves readers to a new key, which
+has no stale value, so those misses wait for the one recompute instead.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_SECONDS = 30
+WAIT_SECONDS = 5
+POLL_SECONDS = 0.05
+
+Entry = namedtuple('Entry', ['value', 'expires', 'delta'])
+
+# Threads that miss the same key queue on its lock; a lock lives only while
+# some thread holds or waits for it, so unrelated keys never block each other
+# and a compute() may itself load other keys
+_locks = weakref.WeakValueDictionary()
+_locks_guard = threading.Lock()
+
+# Per event loop, the recompute in progress for each key
+_in_flight = weakref.WeakKeyDictionary()
+
+
+def _key_lock(key):
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.Lock()
+        return lock
+
+
+def _lock_key(key):
+    return f'singleflight:{key}'
+
+
+def _needs_refresh(entry, beta):
+    """True once an entry is stale, or by the XFetch rule shortly before"""
+    if entry is None:
+        return True
+    if entry.expires is None:
+        return False
+    # -log(random()) is exponentially distributed with mean 1
+    early = entry.delta * beta * -math.log(1.0 - random.random())
+    return time.time() + early >= entry.expires
+
+
+def _entry(value, timeout, started):
+    expires = time.time() + timeout if timeout is not None else None
+    return Entry(value, expires, time.monotonic() - started)
+
+
+def _backend_timeout(timeout, stale):
+    if timeout is None:
+        return None
+    return timeout + (settings.CACHE_STALE_SECONDS if stale is None else stale)
+
+
+def _disabled(timeout):
+    # A timeout of 0 means "do not cache", as it does for cache.set()
+    return timeout is not None and timeout <= 0
+
+
+def get_or_compute(key, compute, timeout, stale=None, beta=1.0, counters=None):
+    """
+    The cached value of key, calling compute() to fill it at most once at a time.
+
+    counters (a home.caching.CacheCounters) records a hit when the value
+    came from the cache, stale or fresh, and a miss when compute() ran.
+    """
+    if _disabled(timeout):
+        _record(counters, hit=False)
+        return compute()
+
+    entry = cache.get(key)
+    if not _needs_refresh(entry, beta):
+        _record(counters, hit=True)
+        return entry.value
+
+    lock = _key_lock(key)
+    if not lock.acquire(blocking=entry is None):
+        # Another thread is already refreshing it
+        _record(counters, hit=True)
+        return entry.value
+    try:
+        latest = cache.get(key)
+        if latest is not None and (entry is None or latest.expires != entry.expires):
+            # Refreshed while this thread waited for the lock
+            _record(counters, hit=True)
+            return latest.value
+
+        owner = cache.add(_lock_key(key), True, LOCK_SECONDS)
+        if not owner:
+            if entry is not None:
+                _record(counters, hit=True)
+                return entry.value
+            latest = _wait_for(key)
+            if latest is not None:
+                _record(counters, hit=True)
+                return latest.value
+        try:
+            started = time.monotonic()
+            value = compute()
+            cache.set(key, _entry(value, timeout, started), _backend_timeout(timeout, stale))
+        finally:
+            if owner:
+                cache.delete(_lock_key(key))
+        _record(counters, hit=False)
+        return value
+    finally:
+        lock.release()
+
+
+def _wait_for(key):
+    """Poll for a value another worker is computing; None if it does not arrive"""
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(_lock_key(key)) is None:
+            return None  # the other worker gave up
+    return None
+
+
+async def aget_or_compute(key, compute, timeout, stale=None, beta=1.0, counters=None):
+    """get_or_compute for async callers; compute is a coroutine function"""
+    if _disabled(timeout):
+        _record(counters, hit=False)
+        return await compute()
+
+    entry = await cache.aget(key)
+    if not _needs_refresh(entry, beta):
+        _record(counters, hit=True)
+        return entry.value
+
+    loop = asyncio.get_running_loop()
+    pending = _in_flight.setdefault(loop, {})
+    if key in pending:
+        _record(counters, hit=True)
+        if entry is not None:
+            return entry.value
+        return await asyncio.shield(pending[key])
+
+    future = pending[key] = loop.create_future()
+    try:
+        value, computed = await _arecompute(key, compute, timeout, stale, entry)
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # waiters get the error; nobody else needs to see it
+        raise
+    else:
+        future.set_result(value)
+    finally:
+        del pending[key]
+    _record(counters, hit=not computed)
+    return value
+
+
+async def _arecompute(key, compute, timeout, stale, entry):
+    """Compute key under the cross-worker lock; returns (value, computed here)"""
+    owner = await cache.aadd(_lock_key(key), True, LOCK_SECONDS)
+    if not owner:
+        if entry is not None:
+            return entry.value, False
+        latest = await _await_for(key)
+        if latest is not None:
+            return latest.value, False
+    try:
+        started = time.monotonic()
+        value = await compute()
+        await cache.aset(key, _entry(value, timeout, started), _backend_timeout(timeout, stale))
+    finally:
+        if owner:
+            await cache.adelete(_lock_key(key))
+    return value, True
+
+
+async def _await_for(key):
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_SECONDS)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return entry
+        if await cache.aget(_lock_key(key)) is None:
+            return None
+    return None
+
+
+def _record(counters, hit):
+    if counters is not None:
+        counters.hit() if hit else counters.miss()
@@ -0,0 +1,323 @@
+"""
+Aggregate statistics for quiz attempts.
+
+Raw figures are computed in the database with Avg/Max/Count over a
+score/total expression. Per-user figures are read from the
+UserCategoryStats rollup, which is updated in the same transaction as each
+QuizAttempt write, so reading them costs O(categories) instead of
+O(attempts).
+
+The dashboard payload is cached per user under a versioned key; any
+change to the user's attempts bumps the version once it commits (see
+home.signals), so a repeat visit costs no queries beyond authentication.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+
+from .caching import aversioned_key, bump_version, on_commit_once, versioned_key
+from .models import QuizAttempt, UserCategoryStats
+from .singleflight import aget_or_compute, get_or_compute
+
+RECENT_ATTEMPTS = 4
+TREND_WINDOW = 5
+FLAGGED_NOTIFICATIONS = 10
+
+
+def percentage_expression(prefix=''):
+    """SQL expression for an attempt's score as a percentage (0 when total is 0)"""
+    return Coalesce(
+        Cast(F(f'{prefix}score') * 100.0 / NullIf(F(f'{prefix}total'), 0), FloatField()),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def attempt_percentage(score, total):
+    """Python counterpart of percentage_expression for a single attempt"""
+    return (score / total * 100) if total > 0 else 0
+
+
+def attempt_totals(attempts):
+    """Total, flagged and average percentage for a queryset of attempts in one query"""
+    totals = attempts.order_by().aggregate(
+        total_attempts=Count('id'),
+        flagged_count=Count('id', filter=Q(is_flagged=True)),
+        average=Avg(percentage_expression()),
+    )
+    return {
+        'total_attempts': totals['total_attempts'],
+        'average_score': round(totals['average'] or 0, 1),
+        'flagged_count': totals['flagged_count'],
+    }
+
+
+def summarize_rollups(rollups):
+    """Total, average, best score/category and flagged count from fetched rollup rows"""
+    total_attempts = sum(r.attempt_count for r in rollups)
+    percentage_sum = sum(r.percentage_sum for r in rollups)
+    best = max(rollups, key=lambda r: r.best_percentage, default=None)
+
+    return {
+        'total_attempts': total_attempts,
+        'average_score': round(percentage_sum / total_attempts, 1) if total_attempts else 0,
+        'highest_score': round(best.best_percentage, 1) if best else 0,
+        'best_category': best.category.name if best else None,
+        'flagged_count': sum(r.flagged_count for r in rollups),
+    }
+
+
+def rollup_totals(user_id=None, category_id=None):
+    """Same figures as attempt_totals, summed over rollup rows in one query"""
+    rollups = UserCategoryStats.objects.all()
+    if user_id:
+        rollups = rollups.filter(user_id=user_id)
+    if category_id:
+        rollups = rollups.filter(category_id=category_id)
+
+    totals = rollups.aggregate(
+        total_attempts=Sum('attempt_count'),
+        percentage_sum=Sum('percentage_sum'),
+        flagged_count=Sum('flagged_count'),
+    )
+    total_attempts = totals['total_attempts'] or 0
+    return {
+        'total_attempts': total_attempts,
+        'average_score': round(totals['percentage_sum'] / total_attempts, 1) if total_attempts else 0,
+        'flagged_count': totals['flagged_count'] or 0,
+    }
+
+
+def _user_rollups(user):
+    return (
+        UserCategoryStats.objects.filter(user=user, attempt_count__gt=0)
+        .select_related('category')
+        .order_by('category_id')
+    )
+
+
+def get_user_rollups(user):
+    """A user's rollup rows with their categories, in category order"""
+    return list(_user_rollups(user))
+
+
+def _rollup_values(attempts):
+    """Group attempts into rollup field values per (user, category)"""
+    return (
+        attempts.order_by()
+        .values('user_id', 'category_id')
+        .annotate(
+            attempt_count=Count('id'),
+            percentage_sum=Sum(percentage_expression()),
+            best_percentage=Max(percentage_expression()),
+            flagged_count=Count('id', filter=Q(is_flagged=True)),
+            last_attempt_at=Max('timestamp'),
+        )
+    )
+
+
+def record_attempt(attempt):
+    """Fold a newly created attempt into its rollup; call inside the attempt's transaction"""
+    if attempt.user_id is None:
+        return
+
+    percentage = attempt_percentage(attempt.score, attempt.total)
+    stats, _ = UserCategoryStats.objects.get_or_create(
+        user_id=attempt.user_id, category_id=attempt.category_id
+    )
+    UserCategoryStats.objects.filter(pk=stats.pk).update(
+        attempt_count=F('attempt_count') + 1,
+        percentage_sum=F('percentage_sum') + percentage,
+        best_percentage=Greatest('best_percentage', Value(percentage)),
+        flagged_count=F('flagged_count') + int(attempt.is_flagged),
+        last_attempt_at=attempt.timestamp,
+    )
+
+
+def refresh_rollup(user_id, category_id):
+    """Recompute one user/category rollup from its attempts after deletes or flag changes"""
+    if user_id is None:
+        return
+
+    values = next(iter(_rollup_values(
+        QuizAttempt.objects.filter(user_id=user_id, category_id=category_id)
+    )), None)
+
+    if values is None:
+        UserCategoryStats.objects.filter(user_id=user_id, category_id=category_id).delete()
+        return
+
+    UserCategoryStats.objects.update_or_create(
+        user_id=user_id,
+        category_id=category_id,
+        defaults={
+            field: values[field]
+            for field in ('attempt_count', 'percentage_sum', 'best_percentage',
+                          'flagged_count', 'last_attempt_at')
+        },
+    )
+
+
+def rollup_pairs(attempts):
+    """(user_id, category_id) of every rollup a queryset of attempts belongs to"""
+    return set(attempts.filter(user__isnull=False).order_by().values_list('user_id', 'category_id'))
+
+
+def refresh_rollups_for(pairs):
+    """
+    Refresh the rollups of the given rollup_pairs.
+
+    Take the pairs before changing the attempts: a filtered queryset (say,
+    unflagged attempts) no longer matches them once they are updated.
+    """
+    for user_id, category_id in pairs:
+        refresh_rollup(user_id, category_id)
+    # Called after QuerySet.update(), which sends no signals
+    for user_id in {user_id for user_id, _ in pairs}:
+        invalidate_dashboard_on_commit(user_id)
+
+
+def rebuild_rollups():
+    """Drop and recreate every rollup from raw attempts; returns the number of rows"""
+    with transaction.atomic():
+        UserCategoryStats.objects.all().delete()
+        rows = _rollup_values(QuizAttempt.objects.filter(user__isnull=False))
+        created = UserCategoryStats.objects.bulk_create(
+            [UserCategoryStats(**row) for row in rows.iterator()], batch_size=1000
+        )
+        for user_id in {row.user_id for row in created}:
+            invalidate_dashboard_on_commit(user_id)
+    return len(created)
+
+
+def improvement_trend(percentages):
+    """Compare the latest attempts against the ones before them (newest first)"""
+    if len(percentages) < TREND_WINDOW * 2:
+        return "stable"
+
+    recent_avg = sum(percentages[:TREND_WINDOW]) / TREND_WINDOW
+    previous_avg = sum(percentages[TREND_WINDOW:TREND_WINDOW * 2]) / TREND_WINDOW
+
+    if recent_avg > previous_avg + 5:
+        return "improving"
+    elif recent_avg < previous_avg - 5:
+        return "declining"
+    return "stable"
+
+
+def _latest_attempts(user):
+    # One query feeds both the recent list and the improvement trend
+    return (
+        QuizAttempt.objects.filter(user=user)
+        .annotate(percentage=percentage_expression())
+        .select_related('category')
+        .order_by('-timestamp')[:TREND_WINDOW * 2]
+    )
+
+
+def _flagged_attempts(user):
+    # Last flagged attempts for security notifications
+    return (
+        QuizAttempt.objects.filter(user=user, is_flagged=True)
+        .annotate(percentage=percentage_expression())
+        .select_related('category')
+        .order_by('-timestamp')[:FLAGGED_NOTIFICATIONS]
+    )
+
+
+def get_dashboard_stats(user):
+    """Everything the student dashboard shows, in a fixed number of queries"""
+    rollups = get_user_rollups(user)
+    latest = list(_latest_attempts(user))
+    flagged = list(_flagged_attempts(user)) if any(r.flagged_count for r in rollups) else []
+    return _dashboard_stats(rollups, latest, flagged)
+
+
+async def aget_dashboard_stats(user):
+    """get_dashboard_stats through the async ORM, for the ASGI views"""
+    rollups = [r async for r in _user_rollups(user)]
+    latest = [a async for a in _latest_attempts(user)]
+    flagged = [a async for a in _flagged_attempts(user)] if any(r.flagged_count for r in rollups) else []
+    return _dashboard_stats(rollups, latest, flagged)
+
+
+def _dashboard_namespace(user_id):
+    return f'dashboard:{user_id}'
+
+
+def invalidate_dashboard(user_id):
+    """Drop a user's cached dashboard"""
+    bump_version(_dashboard_namespace(user_id))
+
+
+def invalidate_dashboard_on_commit(user_id):
+    # A reader between the write and the commit would cache the old figures;
+    # a bulk change still bumps each user's version once
+    on_commit_once(invalidate_dashboard, user_id)
+
+
+def get_cached_dashboard_stats(user):
+    """get_dashboard_stats, from the cache until the user's attempts change"""
+    return get_or_compute(
+        versioned_key(_dashboard_namespace(user.pk)),
+        lambda: get_dashboard_stats(user),
+        settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+
+
+async def aget_cached_dashboard_stats(user):
+    """get_cached_dashboard_stats through the async cache API and ORM"""
+    return await aget_or_compute(
+        await aversioned_key(_dashboard_namespace(user.pk)),
+        lambda: aget_dashboard_stats(user),
+        settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+
+
+def _dashboard_stats(rollups, latest, flagged_attempts):
+    summary = summarize_rollups(rollups)
+
+    recent_attempts = []
+    for attempt in latest[:RECENT_ATTEMPTS]:
+        recent_attempts.append({
+            'title': f"{attempt.category.name} Quiz",
+            'score': round(attempt.percentage, 1),
+            'date': attempt.timestamp.strftime('%b %d, %Y'),
+            'raw_score': f"{attempt.score}/{attempt.total}",
+            'is_flagged': attempt.is_flagged,
+            'tab_switches': attempt.tab_switches,
+            'fullscreen_exits': attempt.fullscreen_exits
+        })
+
+    security_notifications = []
+    for attempt in flagged_attempts:
+        security_notifications.append({
+            'category_name': attempt.category.name,
+            'timestamp': attempt.timestamp,
+            'tab_switches': attempt.tab_switches,
+            'fullscreen_exits': attempt.fullscreen_exits,
+            'score': attempt.score,
+            'total': attempt.total,
+            'percentage': round(attempt.percentage, 1)
+        })
+
+    return {
+        'total_attempts': summary['total_attempts'],
+        'average_score': summary['average_score'],
+        'highest_score': summary['highest_score'],
+        'best_category': summary['best_category'],
+        'recent_attempts': recent_attempts,
+        'subject_performance': [
+            {
+                'subject': r.category.name,
+                'score': round(r.average_percentage, 1),
+                'attempts': r.attempt_count,
+            }
+            for r in rollups
+        ],
+        'improvement_trend': improvement_trend([a.percentage for a in latest]),
+        'security_notifications': security_notifications,
+        'has_flagged_attempts': summary['flagged_count'] > 0,
+    }
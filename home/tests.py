@@ -0,0 +1,1465 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.http import Http404
+from django.shortcuts import render
+from django.test import AsyncRequestFactory, Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import async_views, health, question_bank, singleflight
+from .analytics import get_item_analysis
+from .caching import bump_version, get_version, request_versions
+from .counters import reconcile_counts
+from .filters import ResultsFilter
+from .grading import serve_quiz, submit_attempt
+from .importers import QuestionImporter
+from .models import AttemptAnswer, AttemptSession, CacheVersion, Category, Question, QuizAttempt, UserCategoryStats
+from .singleflight import aget_or_compute, get_or_compute
+from .stats import aget_dashboard_stats, get_dashboard_stats, record_attempt
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='password123')
+        self.math = Category.objects.create(name='Mathematics')
+        self.science = Category.objects.create(name='Science')
+
+    def make_attempts(self, category, scores, total=10, **extra):
+        for score in scores:
+            attempt = QuizAttempt.objects.create(
+                user=self.user, category=category, score=score, total=total, **extra
+            )
+            record_attempt(attempt)
+
+    def test_empty_history(self):
+        stats = get_dashboard_stats(self.user)
+        self.assertEqual(stats['total_attempts'], 0)
+        self.assertEqual(stats['average_score'], 0)
+        self.assertEqual(stats['highest_score'], 0)
+        self.assertIsNone(stats['best_category'])
+        self.assertEqual(stats['subject_performance'], [])
+        self.assertEqual(stats['improvement_trend'], 'stable')
+        self.assertFalse(stats['has_flagged_attempts'])
+
+    def test_aggregates(self):
+        self.make_attempts(self.math, [5, 7])
+        self.make_attempts(self.science, [9])
+        self.make_attempts(self.science, [2], tab_switches=4)
+
+        stats = get_dashboard_stats(self.user)
+        self.assertEqual(stats['total_attempts'], 4)
+        self.assertEqual(stats['average_score'], 57.5)
+        self.assertEqual(stats['highest_score'], 90.0)
+        self.assertEqual(stats['best_category'], 'Science')
+        self.assertEqual(stats['subject_performance'], [
+            {'subject': 'Mathematics', 'score': 60.0, 'attempts': 2},
+            {'subject': 'Science', 'score': 55.0, 'attempts': 2},
+        ])
+        self.assertEqual(len(stats['recent_attempts']), 4)
+        self.assertEqual(stats['recent_attempts'][0]['raw_score'], '2/10')
+        self.assertTrue(stats['has_flagged_attempts'])
+        self.assertEqual(len(stats['security_notifications']), 1)
+        self.assertEqual(stats['security_notifications'][0]['percentage'], 20.0)
+
+    def test_zero_total_counts_as_zero_percent(self):
+        self.make_attempts(self.math, [0], total=0)
+        self.make_attempts(self.math, [8])
+        self.assertEqual(get_dashboard_stats(self.user)['average_score'], 40.0)
+
+    def test_improvement_trend(self):
+        self.make_attempts(self.math, [3] * 5 + [9] * 5)
+        self.assertEqual(get_dashboard_stats(self.user)['improvement_trend'], 'improving')
+
+    def test_query_count_is_constant(self):
+        self.client.force_login(self.user)
+        self.make_attempts(self.math, [5, 6])
+        self.client.get(reverse('dashboard'), secure=True)  # stamps the session refresh time
+
+        # Both requests compute the dashboard rather than read the cached one
+        cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('dashboard'), secure=True)
+
+        for i in range(20):
+            category = Category.objects.create(name=f'Subject {i}')
+            self.make_attempts(category, [4, 8], tab_switches=4)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('dashboard'), secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        # Only the flagged-notifications query is added once the user has flags
+        self.assertEqual(len(large), len(small) + 1)
+
+
+class ScoreRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='password123')
+        self.teacher = User.objects.create_user(
+            username='teacher', password='password123', is_staff=True, is_superuser=True
+        )
+        self.category = Category.objects.create(name='Mathematics')
+
+    def rollup_fields(self):
+        return list(
+            UserCategoryStats.objects.order_by('user_id', 'category_id').values_list(
+                'user_id', 'category_id', 'attempt_count', 'percentage_sum',
+                'best_percentage', 'flagged_count', 'last_attempt_at',
+            )
+        )
+
+    def test_start_quiz_updates_rollup(self):
+        question = Question.objects.create(category=self.category, correct_option='B')
+        self.client.force_login(self.user)
+        url = reverse('start_quiz', args=[self.category.id])
+
+        for answer, switches in (('B', '0'), ('A', '5')):
+            session_id = self.client.get(url, secure=True).context['session_id']
+            self.client.post(
+                url, {'session_id': session_id, f'q{question.id}': answer, 'tab_switches': switches}, secure=True
+            )
+
+        stats = UserCategoryStats.objects.get(user=self.user, category=self.category)
+        self.assertEqual(stats.attempt_count, 2)
+        self.assertEqual(stats.percentage_sum, 100.0)
+        self.assertEqual(stats.best_percentage, 100.0)
+        self.assertEqual(stats.flagged_count, 1)
+        self.assertEqual(stats.last_attempt_at, QuizAttempt.objects.latest('timestamp').timestamp)
+
+    def test_delete_result_refreshes_rollup(self):
+        attempts = []
+        for score in (9, 4):
+            attempt = QuizAttempt.objects.create(user=self.user, category=self.category, score=score, total=10)
+            record_attempt(attempt)
+            attempts.append(attempt)
+
+        self.client.force_login(self.teacher)
+        self.client.post(reverse('delete_result', args=[attempts[0].id]), secure=True)
+
+        stats = UserCategoryStats.objects.get(user=self.user, category=self.category)
+        self.assertEqual(stats.attempt_count, 1)
+        self.assertEqual(stats.best_percentage, 40.0)
+
+        self.client.post(reverse('delete_result', args=[attempts[1].id]), secure=True)
+        self.assertFalse(UserCategoryStats.objects.exists())
+
+    def test_admin_flag_action_on_a_filtered_list_refreshes_rollup(self):
+        attempt = QuizAttempt.objects.create(user=self.user, category=self.category, score=5, total=10)
+        record_attempt(attempt)
+        self.client.force_login(self.teacher)
+        # The action's queryset keeps the changelist filter, which the update makes stale
+        self.client.post(reverse('admin:home_quizattempt_changelist') + '?is_flagged__exact=0', {
+            'action': 'flag_attempts', '_selected_action': [attempt.id],
+        }, secure=True)
+
+        self.assertTrue(QuizAttempt.objects.get(pk=attempt.pk).is_flagged)
+        self.assertEqual(UserCategoryStats.objects.get(user=self.user).flagged_count, 1)
+
+    def test_category_delete_cascades(self):
+        record_attempt(QuizAttempt.objects.create(user=self.user, category=self.category, score=1, total=2))
+        self.category.delete()
+        self.assertFalse(UserCategoryStats.objects.exists())
+
+    def test_rebuild_matches_incremental(self):
+        science = Category.objects.create(name='Science')
+        for category, score, switches in [(self.category, 3, 0), (self.category, 7, 4), (science, 0, 0)]:
+            attempt = QuizAttempt.objects.create(
+                user=self.user, category=category, score=score, total=8, tab_switches=switches
+            )
+            record_attempt(attempt)
+
+        incremental = self.rollup_fields()
+        call_command('rebuild_score_rollups', stdout=StringIO())
+        self.assertEqual(self.rollup_fields(), incremental)
+
+
+class ResultsPaginationTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='teacher', password='password123', is_staff=True, is_superuser=True
+        )
+        student = User.objects.create_user(username='student', password='password123')
+        category = Category.objects.create(name='Mathematics')
+        for score in range(12):
+            record_attempt(QuizAttempt.objects.create(
+                user=student, category=category, score=score, total=20, tab_switches=4 * (score % 3 == 0)
+            ))
+        # Identical timestamps must still page deterministically by id
+        QuizAttempt.objects.filter(score__lt=6).update(timestamp=QuizAttempt.objects.get(score=0).timestamp)
+        self.expected = list(QuizAttempt.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        self.client.force_login(self.teacher)
+
+    def get(self, **params):
+        return self.client.get(reverse('view_all_results'), params, secure=True)
+
+    def test_walks_all_pages_forward_and_back(self):
+        seen, cursors, response = [], [], self.get(page_size=5)
+        while True:
+            seen.extend(r['id'] for r in response.context['results'])
+            page = response.context['page']
+            if not page.has_next:
+                break
+            cursors.append(page.next_cursor)
+            response = self.get(page_size=5, after=page.next_cursor)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(cursors), 2)
+
+        back = self.get(page_size=5, before=response.context['page'].previous_cursor)
+        self.assertEqual([r['id'] for r in back.context['results']], self.expected[5:10])
+
+    def test_summary_covers_all_matches(self):
+        response = self.get(page_size=5, flagged='yes')
+        self.assertEqual(response.context['total_attempts'], 4)
+        self.assertEqual(response.context['flagged_attempts'], 4)
+        self.assertEqual(response.context['avg_percentage'], 22.5)
+
+    def test_attempts_without_a_user_are_left_out_of_list_and_summary(self):
+        category = Category.objects.get()
+        QuizAttempt.objects.create(user=None, category=category, score=20, total=20)
+        for params in ({}, {'category': category.id}):
+            response = self.get(page_size=50, **params)
+            self.assertEqual([r['id'] for r in response.context['results']], self.expected)
+            self.assertEqual(response.context['total_attempts'], len(self.expected))
+            self.assertEqual(response.context['avg_percentage'], 27.5)
+
+    def test_later_pages_cost_the_same(self):
+        first = self.get(page_size=5)
+        with CaptureQueriesContext(connection) as page_one:
+            self.get(page_size=5, flagged='no')
+        with CaptureQueriesContext(connection) as page_two:
+            self.get(page_size=5, flagged='no', after=first.context['page'].next_cursor)
+        self.assertEqual(len(page_one), len(page_two))
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        response = self.get(page_size=5, after='not-a-cursor')
+        self.assertEqual([r['id'] for r in response.context['results']], self.expected[:5])
+
+
+class ResultsExportTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='teacher', password='password123', is_staff=True, is_superuser=True
+        )
+        student = User.objects.create_user(
+            username='student', password='password123', first_name='Ada', last_name='Lovelace'
+        )
+        math = Category.objects.create(name='Mathematics')
+        science = Category.objects.create(name='Science')
+        QuizAttempt.objects.create(user=student, category=math, score=3, total=4)
+        QuizAttempt.objects.create(user=student, category=science, score=1, total=4, tab_switches=5)
+        self.client.force_login(self.teacher)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_results_csv'), params, secure=True)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_streams_all_columns(self):
+        response, body = self.export()
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = body.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('Attempt ID,Username,Full Name'))
+        self.assertIn('student,Ada Lovelace,,Science,1,4,25.0%', lines[1])
+        self.assertTrue(lines[1].endswith('Yes,5,0,FLAGGED'))
+
+    def test_ndjson_with_column_subset_and_filters(self):
+        response, body = self.export(format='ndjson', columns='category,percentage,flagged', flagged='no')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(records, [{'category': 'Mathematics', 'percentage': 75.0, 'flagged': False}])
+
+    def test_rejects_unknown_columns_and_formats(self):
+        self.assertEqual(self.client.get(reverse('export_results_csv'), {'columns': 'password'}, secure=True).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_results_csv'), {'format': 'xlsx'}, secure=True).status_code, 400)
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_keyset_chunks_without_server_side_cursors(self):
+        settings_dict = connection.settings_dict
+        settings_dict['DISABLE_SERVER_SIDE_CURSORS'] = True
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                _, body = self.export(columns='id')
+        finally:
+            settings_dict.pop('DISABLE_SERVER_SIDE_CURSORS')
+        self.assertEqual(body.splitlines()[1:], [str(a.id) for a in QuizAttempt.objects.all()])
+        self.assertEqual(len([q for q in queries if 'home_quizattempt' in q['sql']]), 3)
+
+
+class ResultsFilterTests(TestCase):
+    def setUp(self):
+        self.ada = User.objects.create_user(
+            username='ada', first_name='Ada', last_name='Lovelace', email='ada@example.com'
+        )
+        self.alan = User.objects.create_user(username='alan', first_name='Alan', last_name='Turing')
+        self.category = Category.objects.create(name='Mathematics')
+        self.ada_attempt = QuizAttempt.objects.create(user=self.ada, category=self.category, score=1, total=2)
+        self.alan_attempt = QuizAttempt.objects.create(user=self.alan, category=self.category, score=2, total=2)
+
+    def filtered(self, **params):
+        return set(ResultsFilter(params).apply(QuizAttempt.objects.all()))
+
+    def test_search_matches_any_name_field(self):
+        self.assertEqual(self.filtered(search='LOVE'), {self.ada_attempt})
+        self.assertEqual(self.filtered(search='example.com'), {self.ada_attempt})
+        self.assertEqual(self.filtered(search='ur'), {self.alan_attempt})
+        self.assertEqual(self.filtered(search='al'), {self.alan_attempt})
+
+    def test_search_uses_user_subquery(self):
+        sql = str(ResultsFilter({'search': 'ada'}).apply(QuizAttempt.objects.all()).query)
+        self.assertIn('"user_id" IN (SELECT', sql)
+
+    def test_date_range_is_inclusive(self):
+        today = timezone.localdate().isoformat()
+        self.assertEqual(len(self.filtered(date_from=today, date_to=today)), 2)
+        self.assertEqual(self.filtered(date_to='2000-01-01'), set())
+
+    def test_invalid_values_are_reported_and_ignored(self):
+        results_filter = ResultsFilter({'category': 'abc', 'date_to': '31/12/2024', 'flagged': 'maybe'})
+        self.assertEqual(len(results_filter.errors), 3)
+        self.assertEqual(results_filter.as_dict()['category'], '')
+        self.assertEqual(len(results_filter.apply(QuizAttempt.objects.all())), 2)
+
+    def test_export_rejects_invalid_filters(self):
+        teacher = User.objects.create_user(username='teacher', is_staff=True, is_superuser=True)
+        self.client.force_login(teacher)
+        response = self.client.get(reverse('export_results_csv'), {'date_from': 'yesterday'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+
+
+class QuestionBankCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        question_bank.counters.reset()
+        # Fixture writes queue invalidations; run them so each test's capture sees its own
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name='Mathematics')
+            self.question = Question.objects.create(category=self.category, question_text='1 + 1?', correct_option='B')
+
+    def test_second_read_is_served_from_cache(self):
+        first = question_bank.get_category_questions(self.category.id)
+        with self.assertNumQueries(1):  # only the category's version, from CacheVersion
+            second = question_bank.get_category_questions(self.category.id)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0].question_text, '1 + 1?')
+        self.assertEqual(question_bank.get_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_question_changes_invalidate(self):
+        question_bank.get_category_questions(self.category.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(category=self.category, question_text='2 + 2?')
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 2)
+
+        self.question.question_text = 'One plus one?'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()
+        texts = [q.question_text for q in question_bank.get_category_questions(self.category.id)]
+        self.assertIn('One plus one?', texts)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 1)
+
+    def test_moving_a_question_invalidates_both_categories(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Category.objects.create(name='Science')
+        question_bank.get_category_questions(self.category.id)
+        question_bank.get_category_questions(other.id)
+
+        question = Question.objects.get(pk=self.question.pk)
+        question.category = other
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+
+        self.assertEqual(question_bank.get_category_questions(self.category.id), [])
+        self.assertEqual(len(question_bank.get_category_questions(other.id)), 1)
+
+    def test_category_delete_invalidates(self):
+        question_bank.get_category_questions(self.category.id)
+        category_id = self.category.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        self.assertEqual(question_bank.get_category_questions(category_id), [])
+
+    def test_rolled_back_write_does_not_swallow_the_next_invalidation(self):
+        question_bank.get_category_questions(self.category.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.question.save()
+                raise RuntimeError
+            Question.objects.create(category=self.category, question_text='2 + 2?')
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 2)
+
+    def test_invalidation_waits_for_the_commit(self):
+        stale = question_bank.get_category_questions(self.category.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.correct_option = 'C'
+            self.question.save()
+            # A reader before the commit would cache the old answer key under a new version
+            self.assertEqual(question_bank.get_category_questions(self.category.id), stale)
+        self.assertEqual(question_bank.get_category_questions(self.category.id)[0].correct_option, 'C')
+
+
+class AttemptSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='password123')
+        self.category = Category.objects.create(name='Mathematics')
+        self.questions = [
+            Question.objects.create(category=self.category, question_text=f'Q{i}', correct_option='A')
+            for i in range(3)
+        ]
+        self.url = reverse('start_quiz', args=[self.category.id])
+        self.client.force_login(self.user)
+
+    def serve(self):
+        response = self.client.get(self.url, secure=True)
+        return response.context['session_id'], response.context['questions']
+
+    def submit(self, session_id, answers):
+        data = {'session_id': session_id}
+        data.update({f'q{qid}': option for qid, option in answers.items()})
+        return self.client.post(self.url, data, secure=True)
+
+    def test_grades_only_served_questions(self):
+        session_id, served = self.serve()
+        self.assertEqual(
+            AttemptSession.objects.get(id=session_id).question_ids, [q.id for q in served]
+        )
+        # A question added after the quiz was served is neither graded nor counted
+        late = Question.objects.create(category=self.category, question_text='Late', correct_option='A')
+
+        response = self.submit(session_id, {served[0].id: 'A', served[1].id: 'B', late.id: 'A'})
+        self.assertEqual(response.context['score'], 1)
+        self.assertEqual(response.context['total'], 3)
+        self.assertEqual([r['question'] for r in response.context['results']], [q.question_text for q in served])
+
+    def test_answer_key_costs_no_question_queries_when_cached(self):
+        session_id, served = self.serve()
+        with CaptureQueriesContext(connection) as queries:
+            self.submit(session_id, {q.id: 'A' for q in served})
+        self.assertFalse([q for q in queries if 'home_question' in q['sql']])
+        self.assertEqual(QuizAttempt.objects.get().score, 3)
+
+    def test_session_can_only_be_submitted_once(self):
+        session_id, served = self.serve()
+        self.submit(session_id, {served[0].id: 'A'})
+        response = self.submit(session_id, {q.id: 'A' for q in served})
+        self.assertRedirects(response, reverse('select_category'), fetch_redirect_response=False)
+        self.assertEqual(QuizAttempt.objects.count(), 1)
+
+    def test_missing_or_foreign_session_is_rejected(self):
+        other = User.objects.create_user(username='other')
+        foreign = AttemptSession.objects.create(
+            user=other, category=self.category, question_ids=[q.id for q in self.questions]
+        )
+        self.submit(foreign.id, {q.id: 'A' for q in self.questions})
+        self.submit('', {q.id: 'A' for q in self.questions})
+        self.assertFalse(QuizAttempt.objects.exists())
+
+    def test_submit_quiz_grades_with_one_query(self):
+        data = {f'question_{q.id}': 'A' for q in self.questions}
+        data['question_999999'] = 'A'
+        data['question_x'] = 'A'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('submit_quiz'), data, secure=True)
+        self.assertEqual(len([q for q in queries if 'home_question' in q['sql']]), 1)
+        self.assertEqual((response.context['score'], response.context['total']), (3, 3))
+
+
+class AttemptAnswerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='password123')
+        self.category = Category.objects.create(name='History')
+        Question.objects.bulk_create([
+            Question(category=self.category, question_text=f'Q{i}', correct_option='ABCD'[i % 4])
+            for i in range(200)
+        ])
+        question_bank.invalidate_category(self.category.id)
+        self.url = reverse('start_quiz', args=[self.category.id])
+        self.client.force_login(self.user)
+
+    def test_answers_are_stored_with_one_insert(self):
+        response = self.client.get(self.url, secure=True)
+        served = response.context['questions']
+        data = {'session_id': response.context['session_id']}
+        # Answer every question with A, leaving the last one blank
+        data.update({f'q{q.id}': 'A' for q in served[:-1]})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, data, secure=True)
+
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "home_attemptanswer"')]
+        self.assertEqual(len(inserts), 1)
+
+        attempt = QuizAttempt.objects.get()
+        answers = AttemptAnswer.objects.filter(attempt=attempt)
+        self.assertEqual(answers.count(), 200)
+        self.assertEqual(answers.filter(is_correct=True).count(), attempt.score)
+        unanswered = answers.get(question_id=served[-1].id)
+        self.assertIsNone(unanswered.selected)
+        self.assertFalse(unanswered.is_correct)
+        self.assertEqual(set(answers.exclude(selected=None).values_list('selected', flat=True)), {0})
+
+    def test_answers_are_deleted_with_their_attempt(self):
+        response = self.client.get(self.url, secure=True)
+        self.client.post(self.url, {'session_id': response.context['session_id']}, secure=True)
+        QuizAttempt.objects.all().delete()
+        self.assertFalse(AttemptAnswer.objects.exists())
+
+
+class ItemAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(username='teacher', password='password123', is_staff=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name='Chemistry')
+            self.q1 = Question.objects.create(category=self.category, question_text='Q1', correct_option='A')
+            self.q2 = Question.objects.create(category=self.category, question_text='Q2', correct_option='A')
+
+    def add_attempt(self, score, choices):
+        """Attempt scoring score/2 with the given option index (or None) per question"""
+        attempt = QuizAttempt.objects.create(user=self.staff, category=self.category, score=score, total=2)
+        AttemptAnswer.objects.bulk_create([
+            AttemptAnswer(attempt=attempt, question=question, selected=selected,
+                          is_correct=selected == 0)
+            for question, selected in zip((self.q1, self.q2), choices)
+        ])
+        return attempt
+
+    def test_difficulty_discrimination_and_distribution(self):
+        # Strong students get Q1 right and Q2 wrong; weak students the opposite
+        self.add_attempt(2, (0, 1))
+        self.add_attempt(2, (0, 1))
+        self.add_attempt(0, (1, 0))
+        self.add_attempt(0, (None, 0))
+
+        q1, q2 = get_item_analysis(self.category.id)
+        self.assertEqual(q1['responses'], 4)
+        self.assertEqual(q1['p_value'], 0.5)
+        self.assertEqual(q1['discrimination'], 1.0)
+        self.assertEqual(q1['blank'], 1)
+        self.assertEqual([o['count'] for o in q1['options']], [2, 1, 0, 0])
+        self.assertEqual([o['share'] for o in q1['options']], [50.0, 25.0, 0, 0])
+        self.assertTrue(q1['options'][0]['is_key'])
+        self.assertEqual(q2['discrimination'], -1.0)
+
+    def test_questions_without_answers_are_listed(self):
+        q1, q2 = get_item_analysis(self.category.id)
+        self.assertEqual(q1['responses'], 0)
+        self.assertIsNone(q1['p_value'])
+        self.assertIsNone(q1['discrimination'])
+        self.assertEqual(q1['flags'], [])
+
+    def test_mis_keyed_question_is_flagged(self):
+        for i in range(10):
+            strong = i < 5
+            self.add_attempt(2 if strong else 0, (0 if strong else 1, 1 if strong else 0))
+        q1, q2 = get_item_analysis(self.category.id)
+        self.assertEqual(q1['flags'], [])
+        self.assertIn('Negative discrimination - check the answer key', q2['flags'])
+
+    def test_cached_until_a_new_attempt_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_attempt(2, (0, 0))
+        self.assertEqual(get_item_analysis(self.category.id)[0]['responses'], 1)
+        with self.assertNumQueries(1):  # only the version
+            get_item_analysis(self.category.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_attempt(0, (1, 1))
+        self.assertEqual(get_item_analysis(self.category.id)[0]['responses'], 2)
+
+    def test_deleting_many_attempts_invalidates_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for score in (0, 1, 2):
+                self.add_attempt(score, (0, 0))
+        with mock.patch('home.signals.invalidate_item_analysis') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                QuizAttempt.objects.all().delete()
+        invalidate.assert_called_once_with(self.category.id)
+
+    def test_question_edit_invalidates(self):
+        get_item_analysis(self.category.id)
+        self.q1.question_text = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.q1.save()
+        self.assertEqual(get_item_analysis(self.category.id)[0]['question_text'], 'Renamed')
+
+    def test_view_is_staff_only(self):
+        url = reverse('item_analysis', args=[self.category.id])
+        student = User.objects.create_user(username='student', password='password123')
+        self.client.force_login(student)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['items']), 2)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN every attempt query a view runs and check it reads through the expected index"""
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would make a sequential scan the cheapest plan,
+            # and would let any join order look as cheap as reading attempts first
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+                cursor.execute('SET join_collapse_limit = 1')
+        self.staff = User.objects.create_user(username='teacher', password='password123', is_staff=True)
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.category = Category.objects.create(name='Physics')
+        for score in range(6):
+            attempt = QuizAttempt.objects.create(
+                user=self.student, category=self.category, score=score, total=5,
+                is_flagged=score == 0,
+            )
+            record_attempt(attempt)
+
+    def plan_lines(self, sql):
+        """Lines of the query plan that read home_quizattempt"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                return [row[-1] for row in cursor.fetchall() if ' home_quizattempt' in row[-1]]
+            cursor.execute('EXPLAIN ' + sql)
+            # A Bitmap Heap Scan names no index; the Bitmap Index Scan under it does
+            return [row[0] for row in cursor.fetchall()
+                    if 'Scan' in row[0] and 'Bitmap Heap Scan' not in row[0]
+                    and ('home_quizattempt' in row[0] or 'quizattempt_' in row[0])]
+
+    def assert_reads_through(self, sql, index, partial=False):
+        """Every read of home_quizattempt in sql's plan goes through index"""
+        lines = self.plan_lines(sql)
+        self.assertTrue(lines, sql)
+        if connection.vendor == 'sqlite':
+            # A partial index holds only the rows its condition selects, so
+            # reading all of it in order is as narrow as a search
+            access = '(SEARCH|SCAN)' if partial else 'SEARCH'
+            pattern = rf'^{access} home_quizattempt USING (COVERING )?INDEX {index}\b'
+        else:
+            pattern = rf'(Index Scan|Index Only Scan) using {index}\b|Bitmap Index Scan on {index}\b'
+        for line in lines:
+            self.assertRegex(line, pattern, sql)
+
+    def assert_attempt_queries_use_index(self, user, url, index, partial=False, **params):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+
+        attempt_queries = [q['sql'] for q in queries
+                           if q['sql'].startswith('SELECT') and '"home_quizattempt"' in q['sql']]
+        self.assertTrue(attempt_queries, f'{url} ran no attempt queries')
+        for sql in attempt_queries:
+            self.assert_reads_through(sql, index, partial)
+
+    def test_dashboard(self):
+        self.assert_attempt_queries_use_index(self.student, reverse('dashboard'), 'quizattempt_user_time_idx')
+
+    def test_result_page(self):
+        self.assert_attempt_queries_use_index(self.student, reverse('result_page'), 'quizattempt_user_time_idx')
+
+    def test_user_detail(self):
+        self.assert_attempt_queries_use_index(
+            self.staff, reverse('view_user_detail', args=[self.student.id]), 'quizattempt_user_time_idx'
+        )
+
+    def test_results_by_category(self):
+        self.assert_attempt_queries_use_index(
+            self.staff, reverse('view_all_results'), 'quizattempt_category_time_idx',
+            category=self.category.id,
+        )
+
+    def test_results_flagged(self):
+        self.assert_attempt_queries_use_index(
+            self.staff, reverse('view_all_results'), 'quizattempt_flagged_idx', partial=True,
+            flagged='yes',
+        )
+
+    def test_results_date_range(self):
+        today = timezone.now().date().isoformat()
+        self.assert_attempt_queries_use_index(
+            self.staff, reverse('view_all_results'), 'quizattempt_timestamp_id_idx',
+            date_from=today, date_to=today,
+        )
+
+
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        health._last_result = None
+
+    def test_endpoint_reports_database(self):
+        response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['ok'])
+        self.assertEqual(response.json()['vendor'], connection.vendor)
+
+    @override_settings(HEALTH_CHECK_CACHE_SECONDS=60)
+    def test_result_is_reused_within_the_interval(self):
+        health.get_health()
+        with self.assertNumQueries(0):
+            self.client.get(reverse('health_check'))
+        with self.assertNumQueries(1):
+            health.get_health(force=True)
+
+    def test_unreachable_database_returns_503(self):
+        failure = {'ok': False, 'vendor': 'postgresql', 'error': 'OperationalError'}
+        with mock.patch.object(health, 'check_database', return_value=failure):
+            response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], 'OperationalError')
+
+    def test_check_database_command(self):
+        out = StringIO()
+        call_command('check_database', stdout=out)
+        self.assertRegex(out.getvalue(), r'OK\s+Query: ')
+        self.assertRegex(out.getvalue(), r'OK\s+Tables: \d+ found')
+
+    def test_check_database_command_fails_on_unresolvable_host(self):
+        db = dict(connection.settings_dict, HOST='db.example.invalid', PORT='5432')
+        with mock.patch.dict(connection.settings_dict, db), self.assertRaises(CommandError):
+            call_command('check_database', stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the connection pool is Postgres-only')
+class ConnectionPoolTests(TestCase):
+    def setUp(self):
+        from quiz_app.db_pool.base import ConnectionPool
+        self.pool = ConnectionPool(0, 1, 0.1, **connection.get_connection_params())
+        self.addCleanup(self.pool.closeall)
+
+    def test_returned_connection_is_reused(self):
+        first = self.pool.getconn()
+        self.pool.putconn(first)
+        second = self.pool.getconn()
+        self.assertIs(second, first)
+        self.pool.putconn(second)
+
+    def test_waits_then_fails_when_every_connection_is_in_use(self):
+        from psycopg2 import OperationalError
+        held = self.pool.getconn()
+        with self.assertRaisesMessage(OperationalError, 'No pooled database connection'):
+            self.pool.getconn()
+        self.pool.putconn(held)
+        self.pool.putconn(self.pool.getconn())
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class SessionWriteTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.client.force_login(self.student)
+        self.client.get(reverse('dashboard'), secure=True)  # first visit stamps the refresh time
+
+    def session_writes(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'), secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')]
+
+    def test_page_views_do_not_write_the_session(self):
+        self.assertEqual(self.session_writes(), [])
+
+    @override_settings(SESSION_REFRESH_SECONDS=0)
+    def test_session_is_renewed_once_the_interval_has_passed(self):
+        self.assertEqual(len(self.session_writes()), 1)
+
+    def test_purge_sessions_command(self):
+        other = User.objects.create_user(username='other', password='password123')
+        category = Category.objects.create(name='Physics')
+        stale = AttemptSession.objects.create(user=self.student, category=category, question_ids=[1])
+        AttemptSession.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=2))
+        fresh = AttemptSession.objects.create(user=other, category=category, question_ids=[1])
+        Session.objects.create(session_key='expired', session_data='', expire_date=timezone.now() - timedelta(seconds=1))
+
+        call_command('purge_sessions', stdout=StringIO())
+
+        self.assertQuerySetEqual(AttemptSession.objects.all(), [fresh])
+        self.assertFalse(Session.objects.filter(session_key='expired').exists())
+        self.assertTrue(Session.objects.filter(session_key=self.client.session.session_key).exists())
+
+
+class AsyncViewTests(TestCase):
+    """home.async_views, called directly since home.urls picks them only when ASYNC_VIEWS is on"""
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(username='student', password='password123', first_name='Ada')
+        self.category = Category.objects.create(name='Physics')
+        Question.objects.bulk_create([
+            Question(category=self.category, question_text=f'Q{i}', correct_option='ABCD'[i % 4])
+            for i in range(4)
+        ])
+        question_bank.invalidate_category(self.category.id)
+        self.attempt = QuizAttempt.objects.create(
+            user=self.student, category=self.category, score=3, total=4, is_flagged=True,
+        )
+        record_attempt(self.attempt)
+        self.url = reverse('start_quiz', args=[self.category.id])
+
+    def request(self, method, path, data=None, user=None):
+        request = getattr(AsyncRequestFactory(), method)(path, data or {}, secure=True)
+        request.user = user or self.student
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        return request
+
+    async def test_dashboard_matches_the_sync_view(self):
+        response = await async_views.dashboard(self.request('get', reverse('dashboard')))
+        self.assertContains(response, 'Ada')
+        self.assertEqual(
+            await aget_dashboard_stats(self.student),
+            await sync_to_async(get_dashboard_stats)(self.student),
+        )
+
+    async def test_start_quiz_serves_then_grades_once(self):
+        response = await async_views.start_quiz(self.request('get', self.url), self.category.id)
+        self.assertEqual(response.status_code, 200)
+        session = await AttemptSession.objects.aget(user=self.student)
+
+        data = {'session_id': session.id, **{f'q{qid}': 'A' for qid in session.question_ids}}
+        response = await async_views.start_quiz(self.request('post', self.url, data), self.category.id)
+        self.assertEqual(response.status_code, 200)
+        attempt = await QuizAttempt.objects.exclude(pk=self.attempt.pk).aget(user=self.student)
+        self.assertEqual((attempt.score, attempt.total), (1, 4))
+        self.assertEqual(await AttemptAnswer.objects.filter(attempt=attempt).acount(), 4)
+
+        response = await async_views.start_quiz(self.request('post', self.url, data), self.category.id)
+        self.assertRedirects(response, reverse('select_category'), fetch_redirect_response=False)
+
+    async def test_anonymous_users_are_sent_to_login(self):
+        request = self.request('get', reverse('dashboard'), user=AnonymousUser())
+        response = await async_views.dashboard(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('login')))
+
+    async def test_other_users_results_are_not_found(self):
+        other = await User.objects.acreate(username='other')
+        with self.assertRaises(Http404):
+            await async_views.quiz_result(self.request('get', '/', user=other), self.attempt.id)
+
+
+class LoadTestSupportTests(TestCase):
+    def test_query_count_header(self):
+        self.client.force_login(User.objects.create_user(username='student', password='password123'))
+        middleware = ['home.middleware.QueryCountMiddleware', *settings.MIDDLEWARE]
+        with override_settings(MIDDLEWARE=middleware), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'), secure=True)
+        self.assertEqual(response['X-DB-Query-Count'], str(len(queries)))
+
+    def test_seed_cohort_only_tops_up(self):
+        from seed_data import COHORT_PREFIX, seed_cohort
+
+        with mock.patch('builtins.print'):
+            seed_cohort(5, 3)
+            usernames, category = seed_cohort(8, 4)
+        self.assertEqual(User.objects.filter(username__startswith=COHORT_PREFIX).count(), 8)
+        self.assertEqual(len(usernames), 8)
+        self.assertEqual(category.questions.count(), 4)
+        self.assertTrue(self.client.login(username=usernames[-1], password='password123'))
+
+
+class ImportQuestionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Physics')
+        Question.objects.create(category=self.category, question_text='What is  the unit of force?')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def import_file(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_questions', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_skips_duplicates_and_invalid_rows(self):
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 1)
+        path = self.write('bank.csv', (
+            'category,question_text,option_a,option_b,option_c,option_d,correct_option\n'
+            'Physics,what is the unit of FORCE?,N,J,W,Pa,a\n'
+            'Physics,What is the unit of energy?,N,J,W,Pa,b\n'
+            'Physics,What is the unit of energy?,N,J,W,Pa,b\n'
+            'Chemistry,What is H2O?,Water,Salt,Gold,Air,E\n'
+            'Chemistry,What is NaCl?,Water,Salt,Gold,Air,B\n'
+        ))
+
+        out, err = self.import_file(path, '--batch-size', '1')
+
+        self.assertIn('Imported 2 question(s); skipped 2 duplicate(s) and 1 invalid row(s)', out)
+        self.assertIn('Row 5: correct_option must be A, B, C or D', err)
+        self.assertEqual(Question.objects.filter(category=self.category).count(), 2)
+        self.assertTrue(Question.objects.filter(category__name='Chemistry', correct_option='B').exists())
+        # bulk_create sends no signals, so the importer invalidates the cache itself
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 2)
+
+    def test_jsonl_dry_run_writes_nothing(self):
+        row = {'category': 'Physics', 'question_text': 'Q', 'option_a': '1', 'option_b': '2',
+               'option_c': '3', 'option_d': '4', 'correct_option': 'C'}
+        path = self.write('bank.jsonl', json.dumps(row) + '\n{not json\n')
+
+        out, err = self.import_file(path, '--dry-run')
+
+        self.assertIn('Would import 1 question(s)', out)
+        self.assertIn('Row 2: invalid JSON', err)
+        self.assertEqual(Question.objects.count(), 1)
+
+    def test_unknown_extension_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, 'Cannot tell the format'):
+            self.import_file(self.write('bank.txt', ''))
+
+    def test_synthetic_data(self):
+        out, _ = self.import_file('--synthetic', '30', '--categories', '3', '--users', '4', '--attempts', '25')
+
+        self.assertIn('Imported 30 question(s)', out)
+        self.assertEqual(Category.objects.filter(name__startswith='Synthetic Category').count(), 3)
+        self.assertEqual(User.objects.filter(username__startswith='synthetic_user_').count(), 4)
+        self.assertEqual(QuizAttempt.objects.count(), 25)
+        self.assertEqual(sum(UserCategoryStats.objects.values_list('attempt_count', flat=True)), 25)
+
+    def test_synthetic_counts_are_checked(self):
+        with self.assertRaisesMessage(CommandError, '--categories must be at least 1'):
+            self.import_file('--synthetic', '30', '--categories', '0')
+        with self.assertRaisesMessage(CommandError, '--users must not be negative'):
+            self.import_file('--synthetic', '30', '--users', '-1')
+        with self.assertRaisesMessage(CommandError, '--attempts must not be negative'):
+            self.import_file('--synthetic', '30', '--attempts', '-5')
+        self.assertEqual(Question.objects.count(), 1)
+
+
+class QuestionUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Physics')
+        Question.objects.create(category=self.category, question_text='What is the unit of force?')
+        self.teacher = User.objects.create_user(username='teacher', password='password123', is_staff=True)
+        self.client.force_login(self.teacher)
+
+    def upload(self, name, content, category_id=None):
+        url = reverse('upload_questions', args=[category_id] if category_id else [])
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, secure=True)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_csv_upload_to_category(self):
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 1)
+        content = (
+            '\ufeffquestion_text,option_a,option_b,option_c,option_d,correct_option\n'
+            'What is the unit of force?,N,J,W,Pa,A\n'
+            'What is the unit of energy?,N,J,W,Pa,B\n'
+            'What is the unit of power?,N,J,W,Pa,\n'
+        ).encode()
+
+        response = self.upload('bank.csv', content, self.category.id)
+
+        importer = response.context['importer']
+        self.assertEqual((importer.created, importer.duplicates, importer.invalid), (1, 1, 1))
+        self.assertContains(response, 'Row 4: missing correct_option')
+        self.assertEqual(len(question_bank.get_category_questions(self.category.id)), 2)
+
+    def test_rows_name_their_category(self):
+        row = {'category': 'Chemistry', 'question_text': 'What is H2O?', 'option_a': 'Water',
+               'option_b': 'Salt', 'option_c': 'Gold', 'option_d': 'Air', 'correct_option': 'a'}
+        response = self.upload('bank.jsonl', (json.dumps(row) + '\n').encode())
+
+        self.assertEqual(response.context['importer'].created, 1)
+        self.assertTrue(Question.objects.filter(category__name='Chemistry', correct_option='A').exists())
+
+    def test_unreadable_file(self):
+        response = self.upload('bank.csv', 'question_text\nCaf\xe9\n'.encode('latin-1'), self.category.id)
+        self.assertContains(response, 'Could not read bank.csv')
+
+        response = self.upload('bank.txt', b'', self.category.id)
+        self.assertContains(response, 'Upload a csv, json, jsonl file')
+        self.assertEqual(Question.objects.count(), 1)
+
+    def test_staff_only(self):
+        student = User.objects.create_user(username='student', password='password123')
+        self.client.force_login(student)
+        response = self.upload('bank.csv', b'', self.category.id)
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class QuizAttemptAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(username='admin', password='password123')
+        self.math = Category.objects.create(name='Mathematics')
+        self.science = Category.objects.create(name='Science')
+        self.ada = User.objects.create_user(username='ada', password='password123', email='ada@example.com')
+        self.bob = User.objects.create_user(username='bob', password='password123')
+        QuizAttempt.objects.create(user=self.ada, category=self.math, score=9, total=10)
+        QuizAttempt.objects.create(user=self.bob, category=self.science, score=2, total=10, tab_switches=5)
+        QuizAttempt.objects.create(user=self.bob, category=self.math, score=0, total=0)
+        self.client.force_login(self.admin_user)
+        self.url = reverse('admin:home_quizattempt_changelist')
+
+    def attempts(self, **params):
+        response = self.client.get(self.url, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response, list(response.context['cl'].result_list)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.attempts()
+        with CaptureQueriesContext(connection) as few:
+            self.attempts()
+        for i in range(10):
+            QuizAttempt.objects.create(user=self.ada, category=self.science, score=i, total=10)
+        with CaptureQueriesContext(connection) as many:
+            self.attempts()
+        self.assertEqual(len(many), len(few))
+
+    def test_percentage_is_sorted_in_sql(self):
+        response, attempts = self.attempts(o='4')  # the Score % column
+        self.assertEqual([a.score_percentage for a in attempts], [0.0, 20.0, 90.0])
+        self.assertContains(response, '90.0%')
+
+    def test_search_matches_users_and_categories(self):
+        _, attempts = self.attempts(q='ada@example')
+        self.assertEqual([a.user for a in attempts], [self.ada])
+
+        _, attempts = self.attempts(q='science')
+        self.assertEqual([a.category for a in attempts], [self.science])
+
+    def test_small_results_are_counted_exactly(self):
+        response, _ = self.attempts()
+        self.assertEqual(response.context['cl'].paginator.count, 3)
+
+
+class CategoryCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.math = Category.objects.create(name='Mathematics')
+            self.science = Category.objects.create(name='Science')
+        self.student = User.objects.create_user(username='student', password='password123')
+
+    def counts(self, category):
+        category.refresh_from_db()
+        return category.question_count, category.attempt_count
+
+    def test_counters_follow_creates_moves_and_deletes(self):
+        question = Question.objects.create(category=self.math, question_text='1 + 1?')
+        Question.objects.create(category=self.math, question_text='2 + 2?')
+        attempt = QuizAttempt.objects.create(user=self.student, category=self.math, score=1, total=2)
+        self.assertEqual(self.counts(self.math), (2, 1))
+
+        question.category = self.science
+        question.save()
+        attempt.category = self.science
+        attempt.save()
+        self.assertEqual(self.counts(self.math), (1, 0))
+        self.assertEqual(self.counts(self.science), (1, 1))
+
+        Question.objects.filter(category=self.science).delete()
+        self.student.delete()  # cascades to the attempt
+        self.assertEqual(self.counts(self.science), (0, 0))
+
+    def test_deleting_a_category_does_not_update_it_per_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                Question.objects.create(category=self.math, question_text=f'Q{i}')
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            self.math.delete()
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE')])
+        # Question set, item analysis and category lists, each invalidated once
+        self.assertEqual(len(callbacks), 3)
+
+    def test_deleting_a_user_updates_each_category_once(self):
+        for i in range(10):
+            QuizAttempt.objects.create(user=self.student, category=(self.math, self.science)[i % 2], score=1, total=2)
+        self.assertEqual(self.counts(self.math), (0, 5))
+        with CaptureQueriesContext(connection) as queries:
+            self.student.delete()
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "home_category"')]), 2)
+        self.assertEqual(self.counts(self.math), (0, 0))
+        self.assertEqual(self.counts(self.science), (0, 0))
+
+    def test_submission_counts_the_attempt_last(self):
+        question = Question.objects.create(category=self.math, correct_option='A')
+        session, _ = serve_quiz(self.student, self.math)
+        with CaptureQueriesContext(connection) as queries:
+            submit_attempt(self.student, self.math, {'session_id': str(session.id), f'q{question.id}': 'A'})
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertTrue(writes[-1].startswith('UPDATE "home_category"'))
+        self.assertEqual(len([sql for sql in writes if 'home_category' in sql]), 1)
+        self.assertEqual(self.counts(self.math), (1, 1))
+
+    def test_bulk_import_counts_questions(self):
+        rows = [(1, {'category': 'Mathematics', 'question_text': f'Q{i}', 'option_a': '1', 'option_b': '2',
+                     'option_c': '3', 'option_d': '4', 'correct_option': 'A'}) for i in range(3)]
+        QuestionImporter(batch_size=2).run(rows)
+        self.assertEqual(self.counts(self.math), (3, 0))
+
+    def test_reconcile_fixes_drift(self):
+        Question.objects.create(category=self.math, question_text='1 + 1?')
+        Category.objects.filter(pk=self.math.pk).update(question_count=7, attempt_count=3)
+        out = StringIO()
+
+        call_command('reconcile_category_counts', stdout=out)
+
+        self.assertIn('Mathematics: questions 7 -> 1, attempts 3 -> 0', out.getvalue())
+        self.assertIn('Reconciled 1 category counter(s)', out.getvalue())
+        self.assertEqual(self.counts(self.math), (1, 0))
+        self.assertEqual(reconcile_counts(), {})
+
+    def test_manage_categories_reads_the_counters(self):
+        teacher = User.objects.create_user(username='teacher', password='password123', is_staff=True)
+        self.client.force_login(teacher)
+        for i in range(3):
+            QuizAttempt.objects.create(user=self.student, category=self.math, score=i, total=3)
+        Question.objects.create(category=self.math, question_text='1 + 1?')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('manage_categories'), secure=True)
+
+        categories = list(response.context['categories'])
+        self.assertEqual([(c.question_count, c.attempt_count) for c in categories], [(1, 3), (0, 0)])
+        category_queries = [q['sql'] for q in queries if 'home_category' in q['sql']]
+        self.assertTrue(category_queries)
+        for sql in category_queries:
+            self.assertNotIn('JOIN', sql)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.math = Category.objects.create(name='Mathematics')
+        self.student = User.objects.create_user(username='student', password='password123')
+
+    def test_category_cards_are_cached_until_the_catalogue_changes(self):
+        self.client.force_login(self.student)
+        url = reverse('select_category')
+        self.assertContains(self.client.get(url, secure=True), '0 questions')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get(url, secure=True), 'Mathematics')
+        self.assertFalse([q for q in queries if 'home_category' in q['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(category=self.math, question_text='1 + 1?')
+        self.assertContains(self.client.get(url, secure=True), '1 question<')
+
+    def test_manage_table_follows_attempt_counts(self):
+        teacher = User.objects.create_user(username='teacher', password='password123', is_staff=True)
+        self.client.force_login(teacher)
+        url = reverse('manage_categories')
+        self.client.get(url, secure=True)
+
+        QuizAttempt.objects.create(user=self.student, category=self.math, score=1, total=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, secure=True)
+        self.assertEqual(response.context['attempt_counts'], {str(self.math.id): 1})
+        self.assertContains(response, f'{{"{self.math.id}": 1}}')
+        # A submission does not re-render the cached table, which would list whole categories
+        self.assertEqual(len([q for q in queries if 'home_category' in q['sql']]), 1)
+
+    def test_landing_page_is_cached_for_anonymous_visitors(self):
+        with mock.patch('accounts.views.render', wraps=render) as rendered:
+            first = self.client.get(reverse('landing_page'), secure=True)
+            self.client.get(reverse('landing_page'), secure=True)
+            self.assertEqual(rendered.call_count, 1)
+            self.assertIn('Cookie', first['Vary'])
+
+            self.client.force_login(self.student)
+            self.client.get(reverse('landing_page'), secure=True)
+            self.assertEqual(rendered.call_count, 2)
+
+    def test_login_page_is_not_cached(self):
+        client = Client(enforce_csrf_checks=True)
+        with mock.patch('accounts.views.render', wraps=render) as rendered:
+            client.get(reverse('login'), secure=True)  # sets the CSRF cookie
+            page = client.get(reverse('login'), secure=True)
+            self.client.get(reverse('login'), secure=True)
+            self.assertEqual(rendered.call_count, 3)
+
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page.content.decode()).group(1)
+        response = client.post(reverse('login'), {
+            'csrfmiddlewaretoken': token, 'username': 'student', 'password': 'password123',
+        }, secure=True, HTTP_REFERER='https://testserver/login/')
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='password123')
+        self.teacher = User.objects.create_superuser(username='teacher', password='password123')
+        self.math = Category.objects.create(name='Mathematics')
+        self.client.force_login(self.user)
+        self.client.get(reverse('dashboard'), secure=True)  # stamps the session refresh time
+
+    def attempt(self, score):
+        with self.captureOnCommitCallbacks(execute=True):
+            attempt = QuizAttempt.objects.create(user=self.user, category=self.math, score=score, total=10)
+            record_attempt(attempt)
+        return attempt
+
+    def dashboard(self):
+        response = self.client.get(reverse('dashboard'), secure=True)
+        return response.context['total_attempts'], response.context['average_score']
+
+    def test_repeat_view_runs_no_stats_queries(self):
+        self.attempt(6)
+        self.dashboard()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.dashboard(), (1, 60.0))
+        tables = {'home_quizattempt', 'home_usercategorystats'}
+        self.assertFalse([q for q in queries if any(table in q['sql'] for table in tables)])
+
+    def test_attempt_changes_refresh_the_dashboard(self):
+        first = self.attempt(6)
+        self.assertEqual(self.dashboard(), (1, 60.0))
+        second = self.attempt(8)
+        self.assertEqual(self.dashboard(), (2, 70.0))
+
+        self.client.force_login(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('delete_result', args=[first.id]), secure=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:home_quizattempt_changelist'), {
+                'action': 'flag_attempts', '_selected_action': [second.id],
+            }, secure=True)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'), secure=True)
+        self.assertEqual(response.context['total_attempts'], 1)
+        self.assertTrue(response.context['has_flagged_attempts'])
+
+    def test_bulk_deletes_invalidate_each_dashboard_once(self):
+        science = Category.objects.create(name='Science')
+        with self.captureOnCommitCallbacks(execute=True):
+            for category in (self.math, science, science):
+                QuizAttempt.objects.create(user=self.user, category=category, score=1, total=2)
+
+        with mock.patch('home.stats.invalidate_dashboard') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                science.delete()
+            invalidate.assert_called_once_with(self.user.id)
+
+            invalidate.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.delete()
+            invalidate.assert_not_called()
+
+    def test_async_view_shares_the_cache(self):
+        self.attempt(6)
+        self.dashboard()
+        request = AsyncRequestFactory().get('/subjects/dashboard/')
+        request.user = self.user
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(async_views.dashboard)(request)
+        self.assertContains(response, '60.0')
+        self.assertFalse([q for q in queries if 'home_quizattempt' in q['sql']])
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def slow_compute(self, value='fresh', seconds=0.2):
+        def compute():
+            self.calls += 1
+            time.sleep(seconds)
+            return value
+        return compute
+
+    def test_concurrent_misses_compute_once(self):
+        barrier = threading.Barrier(8)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(get_or_compute('hot', self.slow_compute(), 60))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['fresh'] * 8)
+
+    def test_concurrent_async_misses_compute_once(self):
+        async def compute():
+            self.calls += 1
+            await asyncio.sleep(0.1)
+            return 'fresh'
+
+        async def read_all():
+            return await asyncio.gather(*[aget_or_compute('hot', compute, 60) for _ in range(8)])
+
+        self.assertEqual(async_to_sync(read_all)(), ['fresh'] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_other_keys_are_not_blocked_by_a_slow_compute(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return 'slow'
+
+        worker = threading.Thread(target=get_or_compute, args=('slow', slow, 60))
+        worker.start()
+        started.wait(5)
+        try:
+            # Loads another key while computing, as nested loaders do
+            nested = get_or_compute('outer', lambda: get_or_compute('inner', lambda: 1, 60) + 1, 60)
+            self.assertEqual(nested, 2)
+            self.assertFalse(release.is_set())
+        finally:
+            release.set()
+            worker.join()
+
+    def test_stale_value_is_served_while_one_caller_refreshes(self):
+        cache.set('hot', singleflight.Entry('stale', time.time() - 1, 0), 60)
+        refresher = threading.Thread(target=get_or_compute, args=('hot', self.slow_compute(seconds=0.5), 60))
+        refresher.start()
+        time.sleep(0.1)
+        self.assertEqual(get_or_compute('hot', self.slow_compute(), 60), 'stale')
+        refresher.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(get_or_compute('hot', self.slow_compute(), 60), 'fresh')
+
+    def test_waits_for_another_workers_result(self):
+        cache.add('singleflight:hot', True)  # another worker is computing
+
+        def finish():
+            time.sleep(0.2)
+            cache.set('hot', singleflight.Entry('theirs', time.time() + 60, 0), 120)
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        self.assertEqual(get_or_compute('hot', self.slow_compute(), 60), 'theirs')
+        worker.join()
+        self.assertEqual(self.calls, 0)
+
+    def test_refreshes_early_as_expiry_nears(self):
+        # Took 10s to compute and expires in 1s: refresh before it goes stale
+        cache.set('hot', singleflight.Entry('old', time.time() + 1, 10), 60)
+        with mock.patch('home.singleflight.random.random', return_value=0.5):
+            self.assertEqual(get_or_compute('hot', self.slow_compute(seconds=0), 60), 'fresh')
+        cache.set('hot', singleflight.Entry('old', time.time() + 600, 10), 60)
+        self.assertEqual(get_or_compute('hot', self.slow_compute(seconds=0), 60), 'old')
+
+    def test_failed_compute_releases_the_key(self):
+        def fail():
+            raise RuntimeError('database went away')
+
+        with self.assertRaises(RuntimeError):
+            get_or_compute('hot', fail, 60)
+        self.assertIsNone(cache.get('singleflight:hot'))
+        self.assertEqual(get_or_compute('hot', self.slow_compute(seconds=0), 60), 'fresh')
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_request_reads_each_version_once(self):
+        first = get_version('catalogue')
+        with request_versions():
+            with self.assertNumQueries(1):
+                self.assertEqual(get_version('catalogue'), first)
+                self.assertEqual(get_version('catalogue'), first)
+            bump_version('catalogue')
+            self.assertEqual(get_version('catalogue'), first + 1)
+        self.assertEqual(CacheVersion.objects.get(namespace='catalogue').version, first + 1)
+
+    def test_bump_rolls_back_with_the_write(self):
+        version = get_version('question_bank:1')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            bump_version('question_bank:1')
+            raise RuntimeError
+        self.assertEqual(get_version('question_bank:1'), version)
+
+    @override_settings(CACHE_VERSION_STORE='cache')
+    def test_cache_store_needs_no_table(self):
+        version = get_version('catalogue')
+        bump_version('catalogue')
+        self.assertEqual(get_version('catalogue'), version + 1)
+        self.assertFalse(CacheVersion.objects.exists())
+
+
+def read_questions_in_worker(pipe):
+    """Forked worker: answer category ids with the questions it serves from its own local cache"""
+    question_bank.counters.reset()
+    try:
+        while (category_id := pipe.recv()) is not None:
+            with request_versions():
+                texts = [q.question_text for q in question_bank.get_category_questions(category_id)]
+            pipe.send((texts, question_bank.get_stats()['misses']))
+    finally:
+        connections.close_all()
+
+
+class CrossProcessInvalidationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Mathematics')
+        Question.objects.create(category=self.category, question_text='Q1')
+
+    def read_before_and_after_a_write(self):
+        """Questions a second process serves before and after this one adds a question"""
+        connections.close_all()  # the worker opens its own connection
+        pipe, worker_end = multiprocessing.get_context('fork').Pipe()
+        worker = multiprocessing.get_context('fork').Process(target=read_questions_in_worker, args=(worker_end,))
+        worker.start()
+        try:
+            pipe.send(self.category.id)
+            before = pipe.recv()
+            pipe.send(self.category.id)
+            self.assertEqual(pipe.recv(), before)  # from the worker's cache: no new miss
+            Question.objects.create(category=self.category, question_text='Q2')
+            pipe.send(self.category.id)
+            after = pipe.recv()
+        finally:
+            pipe.send(None)
+            worker.join(10)
+        self.assertEqual(worker.exitcode, 0)
+        return before, after
+
+    def test_a_write_in_one_process_invalidates_another(self):
+        before, after = self.read_before_and_after_a_write()
+        self.assertEqual(before, (['Q1'], 1))
+        self.assertEqual(after, (['Q1', 'Q2'], 2))
+
+    @override_settings(CACHE_VERSION_STORE='cache')
+    def test_process_local_cache_versions_go_stale(self):
+        _, after = self.read_before_and_after_a_write()
+        self.assertEqual(after, (['Q1'], 1))
@@ -1,15 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.models import User
-from django.db import IntegrityError
-from django.db.models import Avg, Max, Count, Q
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from .analytics import MIN_RESPONSES, get_item_analysis
+from .exports import EXPORT_FORMATS, parse_columns, stream_attempts
+from .filters import ResultsFilter
+from .grading import serve_quiz, submit_attempt
+from .health import get_health
+from .importers import FORMATS, QuestionImporter, detect_format, open_upload, read_rows
 from .models import Category, Question, QuizAttempt
-import random
+from .pagination import get_page_size, paginate_attempts
+from .question_bank import catalogue_version
+from .stats import (
+    attempt_totals, get_cached_dashboard_stats, get_user_rollups,
+    refresh_rollup, rollup_totals, summarize_rollups,
+)
 import csv
-from datetime import datetime, timedelta
+from datetime import datetime
 from django.contrib.auth.decorators import login_required, user_passes_test
 
 # Check if user is staff/admin
@@ -24,13 +35,16 @@ def is_staff_user(user):
 @user_passes_test(is_staff_user)
 def manage_categories(request):
     """View and manage all categories (Admin only)"""
-    categories = Category.objects.all().annotate(
-        question_count=Count('questions'),
-        attempt_count=Count('quizattempt')
-    ).order_by('name')
+    # Counts come from the counter columns, not joins over questions and attempts
+    categories = Category.objects.order_by('name')
     
     context = {
         'categories': categories,
+        # The cached table is re-rendered only when the catalogue changes; attempt
+        # counts move with every submission, so the page fills them in from here
+        'catalogue_version': catalogue_version(),
+        'attempt_counts': {str(pk): count for pk, count in categories.values_list('pk', 'attempt_count')},
+        'catalogue_cache_timeout': settings.CATALOGUE_CACHE_TIMEOUT,
     }
     return render(request, 'home/manage_categories.html', context)
 
@@ -100,8 +114,8 @@ def delete_category(request, category_id):
         return redirect('manage_categories')
     
     # Get related data for confirmation
-    question_count = Question.objects.filter(category=category).count()
-    attempt_count = QuizAttempt.objects.filter(category=category).count()
+    question_count = category.question_count
+    attempt_count = category.attempt_count
     
     context = {
         'category': category,
@@ -155,68 +169,76 @@ def add_question(request, category_id):
     
     return render(request, 'home/add_question.html', {'category': category})
 
+@user_passes_test(is_staff_user)
+def upload_questions(request, category_id=None):
+    """Bulk upload questions from a CSV, JSON or JSONL file (Admin only)"""
+    category = get_object_or_404(Category, id=category_id) if category_id else None
+    context = {'category': category, 'formats': FORMATS}
+
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, 'Choose a file to upload')
+            return render(request, 'home/upload_questions.html', context)
+        try:
+            file_format = detect_format(upload.name)
+        except ValueError:
+            messages.error(request, f'Upload a {", ".join(FORMATS)} file')
+            return render(request, 'home/upload_questions.html', context)
+
+        # Rows are read from the uploaded file as they are imported; valid
+        # rows are saved in batches, so an error part way keeps earlier batches
+        importer = QuestionImporter(default_category=category.name if category else None)
+        try:
+            importer.run(read_rows(open_upload(upload), file_format))
+        except (ValueError, csv.Error) as e:
+            messages.error(request, f'Could not read {upload.name}: {e}')
+
+        context.update({
+            'importer': importer,
+            'more_errors': importer.invalid - len(importer.errors),
+        })
+        if importer.created:
+            messages.success(request, f'{importer.created} question(s) added')
+
+    return render(request, 'home/upload_questions.html', context)
+
 # ==================== RESULTS MANAGEMENT (ADMIN/TEACHER) ====================
 
 @user_passes_test(is_staff_user)
 def view_all_results(request):
     """View all quiz results with filtering and search (Admin/Teacher only)"""
     
-    # Get all quiz attempts with related data
-    attempts = QuizAttempt.objects.select_related('user', 'category').order_by('-timestamp')
-    
-    # Get filter parameters
-    category_filter = request.GET.get('category', '')
-    user_filter = request.GET.get('user', '')
-    flagged_filter = request.GET.get('flagged', '')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    search_query = request.GET.get('search', '')
-    
-    # Apply filters
-    if category_filter:
-        attempts = attempts.filter(category_id=category_filter)
-    
-    if user_filter:
-        attempts = attempts.filter(user_id=user_filter)
-    
-    if flagged_filter == 'yes':
-        attempts = attempts.filter(is_flagged=True)
-    elif flagged_filter == 'no':
-        attempts = attempts.filter(is_flagged=False)
-    
-    if date_from:
-        attempts = attempts.filter(timestamp__gte=date_from)
-    
-    if date_to:
-        # Add one day to include the entire end date
-        date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
-        date_to_end = date_to_obj + timedelta(days=1)
-        attempts = attempts.filter(timestamp__lt=date_to_end)
-    
-    if search_query:
-        attempts = attempts.filter(
-            Q(user__username__icontains=search_query) |
-            Q(user__first_name__icontains=search_query) |
-            Q(user__last_name__icontains=search_query) |
-            Q(user__email__icontains=search_query)
-        )
-    
-    # Calculate statistics
-    total_attempts = attempts.count()
-    flagged_attempts = attempts.filter(is_flagged=True).count()
+    # Get all quiz attempts with related data, filtered by the GET parameters
+    results_filter = ResultsFilter.from_request(request)
+    for error in results_filter.errors:
+        messages.error(request, error)
+    # Attempts without a user have no row to show and no rollup, so the list and
+    # its summary both leave them out. exclude() words this as NOT (user_id IS NULL),
+    # which SQLite does not turn into a walk of the user index the way it does
+    # IS NOT NULL, so each filter keeps its own index
+    attempts = results_filter.apply(
+        QuizAttempt.objects.exclude(user=None).select_related('user', 'category').order_by('-timestamp')
+    )
     
-    if total_attempts > 0:
-        avg_score = attempts.aggregate(
-            avg=Avg('score')
-        )['avg']
-        avg_percentage = round(avg_score / attempts.first().total * 100 if attempts.first() else 0, 1)
+    # Calculate statistics in one aggregate query; the rollup table answers category/user-only filters
+    if results_filter.only_category_or_user:
+        summary = rollup_totals(user_id=results_filter.user_id, category_id=results_filter.category_id)
     else:
-        avg_score = 0
-        avg_percentage = 0
+        summary = attempt_totals(attempts)
+    
+    # Fetch only the requested page, keyed on (timestamp, id)
+    page_size = get_page_size(request.GET.get('page_size'))
+    page = paginate_attempts(
+        attempts,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        page_size=page_size,
+    )
     
     # Prepare results data
     results_data = []
-    for attempt in attempts:
+    for attempt in page.items:
         percentage = round((attempt.score / attempt.total * 100) if attempt.total > 0 else 0, 1)
         results_data.append({
             'id': attempt.id,
@@ -234,27 +256,28 @@ def view_all_results(request):
             'fullscreen_exits': attempt.fullscreen_exits,
         })
     
+    # Query string that keeps the filters when moving between pages
+    page_query = request.GET.copy()
+    page_query.pop('after', None)
+    page_query.pop('before', None)
+    
     # Get all categories and users for filter dropdowns
     categories = Category.objects.all().order_by('name')
     users = User.objects.filter(
-        quizattempt__isnull=False
+        category_stats__isnull=False
     ).distinct().order_by('username')
     
     context = {
         'results': results_data,
-        'total_attempts': total_attempts,
-        'flagged_attempts': flagged_attempts,
-        'avg_percentage': avg_percentage,
+        'page': page,
+        'page_size': page_size,
+        'page_query': page_query.urlencode(),
+        'total_attempts': summary['total_attempts'],
+        'flagged_attempts': summary['flagged_count'],
+        'avg_percentage': summary['average_score'],
         'categories': categories,
         'users': users,
-        'filters': {
-            'category': category_filter,
-            'user': user_filter,
-            'flagged': flagged_filter,
-            'date_from': date_from,
-            'date_to': date_to,
-            'search': search_query,
-        }
+        'filters': results_filter.as_dict(),
     }
     
     return render(request, 'home/view_all_results.html', context)
@@ -262,99 +285,30 @@ def view_all_results(request):
 
 @user_passes_test(is_staff_user)
 def export_results_csv(request):
-    """Export filtered results to CSV (Admin/Teacher only)"""
-    
-    # Get all quiz attempts with related data
-    attempts = QuizAttempt.objects.select_related('user', 'category').order_by('-timestamp')
+    """Stream filtered results as CSV or NDJSON (Admin/Teacher only)"""
     
     # Apply same filters as view_all_results
-    category_filter = request.GET.get('category', '')
-    user_filter = request.GET.get('user', '')
-    flagged_filter = request.GET.get('flagged', '')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    search_query = request.GET.get('search', '')
-    
-    if category_filter:
-        attempts = attempts.filter(category_id=category_filter)
-    
-    if user_filter:
-        attempts = attempts.filter(user_id=user_filter)
-    
-    if flagged_filter == 'yes':
-        attempts = attempts.filter(is_flagged=True)
-    elif flagged_filter == 'no':
-        attempts = attempts.filter(is_flagged=False)
-    
-    if date_from:
-        attempts = attempts.filter(timestamp__gte=date_from)
-    
-    if date_to:
-        date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
-        date_to_end = date_to_obj + timedelta(days=1)
-        attempts = attempts.filter(timestamp__lt=date_to_end)
-    
-    if search_query:
-        attempts = attempts.filter(
-            Q(user__username__icontains=search_query) |
-            Q(user__first_name__icontains=search_query) |
-            Q(user__last_name__icontains=search_query) |
-            Q(user__email__icontains=search_query)
-        )
-    
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
+    results_filter = ResultsFilter.from_request(request)
+    if not results_filter.is_valid:
+        return HttpResponseBadRequest('; '.join(results_filter.errors))
+    attempts = results_filter.apply(QuizAttempt.objects.all())
+    
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f'Unsupported export format "{export_format}"')
+    
+    try:
+        columns = parse_columns(request.GET.get('columns', ''))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        stream_attempts(attempts, columns, export_format),
+        content_type=content_type,
+    )
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    response['Content-Disposition'] = f'attachment; filename="quiz_results_{timestamp}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # Write header
-    writer.writerow([
-        'Attempt ID',
-        'Username',
-        'Full Name',
-        'Email',
-        'Category',
-        'Score',
-        'Total Questions',
-        'Percentage',
-        'Date & Time',
-        'Flagged',
-        'Tab Switches',
-        'Fullscreen Exits',
-        'Status'
-    ])
-    
-    # Write data rows
-    for attempt in attempts:
-        percentage = round((attempt.score / attempt.total * 100) if attempt.total > 0 else 0, 1)
-        full_name = f"{attempt.user.first_name} {attempt.user.last_name}".strip() or attempt.user.username
-        
-        # Determine status
-        if attempt.is_flagged:
-            status = 'FLAGGED'
-        elif attempt.tab_switches > 0 or attempt.fullscreen_exits > 0:
-            status = 'WARNING'
-        else:
-            status = 'CLEAN'
-        
-        writer.writerow([
-            attempt.id,
-            attempt.user.username,
-            full_name,
-            attempt.user.email,
-            attempt.category.name,
-            attempt.score,
-            attempt.total,
-            f"{percentage}%",
-            attempt.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'Yes' if attempt.is_flagged else 'No',
-            attempt.tab_switches,
-            attempt.fullscreen_exits,
-            status
-        ])
-    
+    response['Content-Disposition'] = f'attachment; filename="quiz_results_{timestamp}.{extension}"'
     return response
 
 
@@ -365,7 +319,9 @@ def delete_result(request, attempt_id):
         attempt = get_object_or_404(QuizAttempt, id=attempt_id)
         user_name = attempt.user.username
         category_name = attempt.category.name
-        attempt.delete()
+        with transaction.atomic():
+            attempt.delete()
+            refresh_rollup(attempt.user_id, attempt.category_id)
         messages.success(request, f'Deleted quiz attempt for {user_name} in {category_name}')
     
     return redirect('view_all_results')
@@ -378,23 +334,7 @@ def view_user_detail(request, user_id):
     attempts = QuizAttempt.objects.filter(user=user_obj).select_related('category').order_by('-timestamp')
     
     # Calculate user statistics
-    total_attempts = attempts.count()
-    
-    if total_attempts > 0:
-        total_percentage = sum((attempt.score / attempt.total * 100) if attempt.total > 0 else 0 
-                               for attempt in attempts)
-        average_score = round(total_percentage / total_attempts, 1)
-        
-        # Get best score
-        best_attempt = max(attempts, key=lambda x: (x.score / x.total * 100) if x.total > 0 else 0)
-        best_score = round((best_attempt.score / best_attempt.total * 100) if best_attempt.total > 0 else 0, 1)
-        best_category = best_attempt.category.name
-    else:
-        average_score = 0
-        best_score = 0
-        best_category = None
-    
-    flagged_count = attempts.filter(is_flagged=True).count()
+    summary = summarize_rollups(get_user_rollups(user_obj))
     
     # Prepare attempts data
     attempts_data = []
@@ -416,15 +356,29 @@ def view_user_detail(request, user_id):
         'student': user_obj,
         'full_name': f"{user_obj.first_name} {user_obj.last_name}".strip() or user_obj.username,
         'attempts': attempts_data,
-        'total_attempts': total_attempts,
-        'average_score': average_score,
-        'best_score': best_score,
-        'best_category': best_category,
-        'flagged_count': flagged_count,
+        'total_attempts': summary['total_attempts'],
+        'average_score': summary['average_score'],
+        'best_score': summary['highest_score'],
+        'best_category': summary['best_category'],
+        'flagged_count': summary['flagged_count'],
     }
     
     return render(request, 'home/user_detail.html', context)
 
+@user_passes_test(is_staff_user)
+def item_analysis(request, category_id):
+    """Per-question difficulty, discrimination and option choices for a category (Admin only)"""
+    category = get_object_or_404(Category, id=category_id)
+    items = get_item_analysis(category.id)
+
+    context = {
+        'category': category,
+        'items': items,
+        'flagged_items': sum(1 for item in items if item['flags']),
+        'min_responses': MIN_RESPONSES,
+    }
+    return render(request, 'home/item_analysis.html', context)
+
 # ==================== DASHBOARD & QUIZ VIEWS ====================
 
 @login_required(login_url='login')
@@ -432,194 +386,67 @@ def dashboard(request):
     """Display personalized user dashboard with quiz statistics and security notifications"""
     user = request.user
     
-    # Get user's quiz attempts ordered by most recent
-    attempts = QuizAttempt.objects.filter(user=user).select_related('category').order_by('-timestamp')
-    
-    # Get flagged attempts for notifications (last 10 flagged attempts)
-    flagged_attempts = attempts.filter(is_flagged=True)[:10]
-    
-    # Prepare security notifications
-    security_notifications = []
-    for attempt in flagged_attempts:
-        notification = {
-            'category_name': attempt.category.name,
-            'timestamp': attempt.timestamp,
-            'tab_switches': attempt.tab_switches,
-            'fullscreen_exits': attempt.fullscreen_exits,
-            'score': attempt.score,
-            'total': attempt.total,
-            'percentage': round((attempt.score / attempt.total * 100) if attempt.total > 0 else 0, 1)
-        }
-        security_notifications.append(notification)
-    
-    # Calculate statistics
-    total_attempts = attempts.count()
-    
-    # Calculate average percentage
-    if total_attempts > 0:
-        total_percentage = sum((attempt.score / attempt.total * 100) if attempt.total > 0 else 0 
-                               for attempt in attempts)
-        average_score = round(total_percentage / total_attempts, 1)
-    else:
-        average_score = 0
-    
-    # Get recent attempts for display (last 4)
-    recent_attempts = []
-    for attempt in attempts[:4]:
-        percentage = round((attempt.score / attempt.total * 100) if attempt.total > 0 else 0, 1)
-        recent_attempts.append({
-            'title': f"{attempt.category.name} Quiz",
-            'score': percentage,
-            'date': attempt.timestamp.strftime('%b %d, %Y'),
-            'raw_score': f"{attempt.score}/{attempt.total}",
-            'is_flagged': attempt.is_flagged,
-            'tab_switches': attempt.tab_switches,
-            'fullscreen_exits': attempt.fullscreen_exits
-        })
-    
-    # Calculate subject-wise performance
-    subject_performance = []
-    categories = Category.objects.all()
-    for category in categories:
-        cat_attempts = attempts.filter(category=category)
-        if cat_attempts.exists():
-            cat_total = sum((a.score / a.total * 100) if a.total > 0 else 0 for a in cat_attempts)
-            avg_score = round(cat_total / cat_attempts.count(), 1)
-            subject_performance.append({
-                'subject': category.name,
-                'score': avg_score,
-                'attempts': cat_attempts.count()
-            })
-    
-    # Get highest score
-    highest_score = 0
-    best_category = None
-    if total_attempts > 0:
-        for attempt in attempts:
-            percentage = (attempt.score / attempt.total * 100) if attempt.total > 0 else 0
-            if percentage > highest_score:
-                highest_score = round(percentage, 1)
-                best_category = attempt.category.name
-    
     # Get user's display name (first name if available, otherwise username)
     display_name = user.first_name if user.first_name else user.username
-    
-    # Calculate improvement trend (last 5 attempts vs previous 5)
-    improvement_trend = "stable"
-    if total_attempts >= 10:
-        recent_5 = attempts[:5]
-        previous_5 = attempts[5:10]
-        
-        recent_avg = sum((a.score / a.total * 100) for a in recent_5) / 5
-        previous_avg = sum((a.score / a.total * 100) for a in previous_5) / 5
-        
-        if recent_avg > previous_avg + 5:
-            improvement_trend = "improving"
-        elif recent_avg < previous_avg - 5:
-            improvement_trend = "declining"
 
     context = {
         'user': user,
         'display_name': display_name,
-        'recent_attempts': recent_attempts,
-        'total_attempts': total_attempts,
-        'average_score': average_score,
-        'highest_score': highest_score,
-        'best_category': best_category,
-        'subject_performance': subject_performance,
-        'improvement_trend': improvement_trend,
-        'security_notifications': security_notifications,
-        'has_flagged_attempts': flagged_attempts.exists(),
     }
+    context.update(get_cached_dashboard_stats(user))
     return render(request, 'home/dashboard.html', context)
 
 @login_required(login_url='login')
 def select_category(request):
     """Display available quiz categories"""
-    categories = Category.objects.all().annotate(
-        question_count=Count('questions')
-    )
-    return render(request, 'home/select_category.html', {'categories': categories})
+    # Evaluated only when the cached category cards are re-rendered
+    categories = Category.objects.all()
+    return render(request, 'home/select_category.html', {
+        'categories': categories,
+        'catalogue_version': catalogue_version(),
+        'catalogue_cache_timeout': settings.CATALOGUE_CACHE_TIMEOUT,
+    })
+
+def evaluation_context(category, attempt, results):
+    """Template context for home/evaluation.html after a submission"""
+    return {
+        'category': category,
+        'score': attempt.score,
+        'total': attempt.total,
+        'percentage': round((attempt.score / attempt.total) * 100, 1) if attempt.total > 0 else 0,
+        'results': results,
+        'is_flagged': attempt.is_flagged,
+        'tab_switches': attempt.tab_switches,
+        'fullscreen_exits': attempt.fullscreen_exits,
+    }
 
 @login_required(login_url='login')
 def start_quiz(request, category_id):
     """Start a quiz for selected category with anti-cheating measures"""
     category = get_object_or_404(Category, id=category_id)
-    questions = list(Question.objects.filter(category=category))
-    
-    # Check if category has questions
-    if not questions:
-        messages.error(request, f'No questions available for {category.name} yet.')
-        return redirect('select_category')
-    
-    # Shuffle questions for randomness
-    random.shuffle(questions)
 
     if request.method == 'POST':
-        # Get security tracking data
-        tab_switches = int(request.POST.get('tab_switches', '0'))
-        fullscreen_exits = int(request.POST.get('fullscreen_exits', '0'))
-        
-        # REMOVED: Don't use messages.warning here - it persists to other pages
-        # Instead, we'll pass the flag status directly to the template
-        is_flagged = (tab_switches > 3 or fullscreen_exits > 2)
-        
-        score = 0
-        total = len(questions)
-        results = []
+        attempt, results = submit_attempt(request.user, category, request.POST)
+        if attempt is None:
+            messages.error(request, 'This quiz has expired or was already submitted. Please start it again.')
+            return redirect('select_category')
 
-        # Calculate score and prepare results
-        for q in questions:
-            selected_option = request.POST.get(f'q{q.id}')
-            is_correct = selected_option == q.correct_option
-            
-            if is_correct:
-                score += 1
-            
-            # Get the text of the selected and correct options
-            option_map = {
-                'A': q.option_a,
-                'B': q.option_b,
-                'C': q.option_c,
-                'D': q.option_d
-            }
-            
-            results.append({
-                'question': q.question_text,
-                'selected': option_map.get(selected_option, 'Not answered'),
-                'correct': option_map.get(q.correct_option, 'N/A'),
-                'is_correct': is_correct
-            })
-
-        # Save quiz attempt with security tracking
-        attempt = QuizAttempt.objects.create(
-            user=request.user,
-            category=category,
-            score=score,
-            total=total,
-            tab_switches=tab_switches,
-            fullscreen_exits=fullscreen_exits,
-            is_flagged=is_flagged
-        )
+        # Pass security info to the evaluation template instead of using messages
+        return render(request, 'home/evaluation.html', evaluation_context(category, attempt, results))
 
-        percentage = round((score / total) * 100, 1) if total > 0 else 0
+    # Shuffle questions for randomness and remember what was served
+    session, questions = serve_quiz(request.user, category)
 
-        # Pass security info to the evaluation template instead of using messages
-        return render(request, 'home/evaluation.html', {
-            'category': category,
-            'score': score,
-            'total': total,
-            'percentage': percentage,
-            'results': results,
-            'is_flagged': is_flagged,
-            'tab_switches': tab_switches,
-            'fullscreen_exits': fullscreen_exits,
-        })
+    # Check if category has questions
+    if not questions:
+        messages.error(request, f'No questions available for {category.name} yet.')
+        return redirect('select_category')
 
     # Use secure quiz template
     return render(request, 'home/start_quiz_secure.html', {
         'category': category,
         'questions': questions,
+        'session_id': session.id,
     })
 
 @login_required(login_url='login')
@@ -637,20 +464,17 @@ def quiz_result(request, attempt_id):
 def submit_quiz(request):
     """Submit quiz answers and calculate score"""
     if request.method == 'POST':
-        score = 0
-        total = 0
-        
+        answers = {}
         for key, value in request.POST.items():
             if key.startswith('question_'):
                 question_id = key.split('_')[1]
-                selected_option = value
-                try:
-                    question = Question.objects.get(id=question_id)
-                    total += 1
-                    if question.correct_option == selected_option:
-                        score += 1
-                except Question.DoesNotExist:
-                    pass
+                if question_id.isdigit():
+                    answers[int(question_id)] = value
+
+        # One query for every answered question instead of one per answer
+        questions = Question.objects.in_bulk(list(answers))
+        total = len(questions)
+        score = sum(1 for qid, question in questions.items() if question.correct_option == answers[qid])
 
         percentage = round((score / total) * 100, 1) if total > 0 else 0
         
@@ -672,4 +496,11 @@ def result_page(request):
             'attempt': latest_attempt,
             'percentage': percentage
         })
-    return redirect('dashboard')
\ No newline at end of file
+    return redirect('dashboard')
+
+# ==================== HEALTH ====================
+
+def health_check(request):
+    """Database reachability for load balancers and uptime monitors (cached briefly)"""
+    health = get_health()
+    return JsonResponse(health, status=200 if health['ok'] else 503)
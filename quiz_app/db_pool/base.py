@@ -0,0 +1,136 @@
+"""
+PostgreSQL backend that borrows connections from an in-process pool.
+
+Meant for threaded workers on our own hosts (DEPLOYMENT_MODE=server with
+DB_POOL_MAX_SIZE set). Django still opens and closes "its" connection per
+request (CONN_MAX_AGE stays 0), but opening takes an idle connection from
+a psycopg2 ThreadedConnectionPool shared by every thread of the process,
+and closing puts it back, so the TLS handshake is paid once per pooled
+connection instead of once per request.
+
+Pool settings come from DATABASES[alias]['POOL']: min_size (connections
+opened up front), max_size and timeout (seconds to wait for a free
+connection before failing).
+"""
+
+import os
+import threading
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import Error, OperationalError, extras, pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class _IdlePool(pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that keeps up to maxconn idle connections open"""
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # putconn() closes returned connections beyond minconn, which would
+        # make most requests reconnect
+        self.minconn = maxconn
+
+
+class ConnectionPool:
+    """ThreadedConnectionPool that waits for a free connection instead of raising"""
+
+    def __init__(self, min_size, max_size, timeout, **conn_params):
+        self.pid = os.getpid()
+        self.timeout = timeout
+        self._pool = _IdlePool(min_size, max_size, **conn_params)
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(f"No pooled database connection became free within {self.timeout}s")
+        try:
+            return self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection):
+        # psycopg2 rolls back an open transaction and drops broken connections
+        try:
+            self._pool.putconn(connection, close=bool(connection.closed))
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """The process-wide pool for an alias and its connection parameters, created on first use"""
+    # Keyed on the parameters too, so switching NAME (as the test runner does)
+    # never hands out connections to the old database
+    key = (alias, tuple(sorted((k, str(v)) for k, v in conn_params.items())))
+    with _pools_lock:
+        connection_pool = _pools.get(key)
+        # A forked worker must not share the parent's sockets
+        if connection_pool is None or connection_pool.pid != os.getpid():
+            options = settings_dict.get('POOL', {})
+            connection_pool = _pools[key] = ConnectionPool(
+                options.get('min_size', 1),
+                options.get('max_size', 10),
+                options.get('timeout', 10),
+                **conn_params,
+            )
+        return connection_pool
+
+
+def close_pools(alias):
+    """Close every idle pooled connection of an alias, e.g. before dropping its database"""
+    with _pools_lock:
+        for key in [key for key in _pools if key[0] == alias]:
+            _pools.pop(key).closeall()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    connection_pool = None
+
+    def get_new_connection(self, conn_params):
+        connection_pool = get_pool(self.alias, self.settings_dict, conn_params)
+        while True:
+            connection = connection_pool.getconn()
+            if not self.settings_dict['CONN_HEALTH_CHECKS'] or self._is_alive(connection):
+                break
+            connection_pool.putconn(connection)  # closed by now, so the pool drops it
+
+        # Same per-connection setup as the stock backend
+        self.isolation_level = base.IsolationLevel.READ_COMMITTED
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        if isolation_level is not None:
+            self.isolation_level = base.IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        self.connection_pool = connection_pool
+        return connection
+
+    @staticmethod
+    def _is_alive(connection):
+        """Whether a pooled connection still answers; closes it when it does not"""
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+            return True
+        except Error:
+            connection.close()
+            return False
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.putconn(self.connection)
@@ -4,6 +4,7 @@ Django settings for quiz_app project - Production Ready
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import dj_database_url
 # Load environment variables
@@ -51,7 +52,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files
+    'home.middleware.CacheVersionMiddleware',  # Reads each cache version at most once per request
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'home.middleware.SessionRefreshMiddleware',  # Renews the session expiry at most once per interval
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -59,6 +62,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Load tests (benchmarks/exam_window.py) read per-request query counts from a response header
+QUERY_COUNT_HEADER = os.getenv('QUERY_COUNT_HEADER', 'False') == 'True'
+if QUERY_COUNT_HEADER:
+    MIDDLEWARE.insert(1, 'home.middleware.QueryCountMiddleware')
+
 ROOT_URLCONF = 'quiz_app.urls'
 
 TEMPLATES = [
@@ -79,10 +87,6 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'quiz_app.wsgi.application'
 
-import dj_database_url
-import os
-import socket
-
 # Get database URL from environment
 database_url = os.getenv('DATABASE_URL')
 
@@ -97,30 +101,23 @@ if not database_url:
     if all([db_user, db_password, db_host, db_name]) and db_password != '[YOUR-PASSWORD]':
         database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
-# Function to check database connectivity
-def is_db_reachable(url_string):
-    if not url_string:
-        return False
-    try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url_string)
-        host = parsed.hostname
-        port = parsed.port or 5432
-        
-        addresses = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
-        if not addresses:
-            return False
-        family, socktype, proto, canonname, sockaddr = addresses[0]
-        s = socket.socket(family, socktype, proto)
-        s.settimeout(2)
-        s.connect(sockaddr)
-        s.close()
-        return True
-    except Exception:
-        return False
-
-# Use PostgreSQL if configured and reachable; always use it on Vercel
-if database_url and (os.getenv('VERCEL') == '1' or is_db_reachable(database_url)):
+# The backend is chosen from the environment alone; nothing here touches the
+# network. Use `python manage.py check_database` or /health/ to find out
+# whether the configured database is reachable, and USE_SQLITE=True to work
+# locally against SQLite while Postgres credentials are in .env.
+USE_SQLITE = os.getenv('USE_SQLITE', 'False') == 'True'
+
+# How the app is run:
+# - 'serverless' (Vercel): every request opens and closes its own connection,
+#   which the Supabase pooler (PgBouncer/Supavisor) multiplexes.
+# - 'server' (long-lived gunicorn/uwsgi workers): connections persist between
+#   requests and are checked before reuse. With DB_POOL_MAX_SIZE set, threads
+#   share an in-process pool instead of holding one connection each.
+DEPLOYMENT_MODE = os.getenv('DEPLOYMENT_MODE', 'serverless')
+if DEPLOYMENT_MODE not in ('serverless', 'server'):
+    raise ImproperlyConfigured(f"DEPLOYMENT_MODE must be 'serverless' or 'server', not {DEPLOYMENT_MODE!r}")
+
+if database_url and not USE_SQLITE:
     DATABASES = {
         'default': dj_database_url.config(
             default=database_url,
@@ -129,22 +126,85 @@ if database_url and (os.getenv('VERCEL') == '1' or is_db_reachable(database_url)
     }
     # Inject the required pooler properties into the default database options
     DATABASES['default']['OPTIONS'] = {
-        'sslmode': 'require',
+        'sslmode': os.getenv('DB_SSLMODE', 'require'),
         'connect_timeout': 30,
     }
     DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True  # Required for Supabase PgBouncer/Supavisor
+
+    if DEPLOYMENT_MODE == 'server':
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+        db_pool_max_size = int(os.getenv('DB_POOL_MAX_SIZE', '0'))
+        if db_pool_max_size:
+            # Django "closes" the connection after each request, which hands it back to the pool
+            DATABASES['default']['ENGINE'] = 'quiz_app.db_pool'
+            DATABASES['default']['POOL'] = {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+                'max_size': db_pool_max_size,
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            }
+        else:
+            DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
 else:
-    # Fallback to local SQLite database
+    # Local SQLite database
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file rather than memory, so tests can share it with forked worker processes
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+# Serve dashboard/start_quiz/quiz_result from async views (home.async_views).
+# Turn on only when running quiz_app.asgi (e.g. under uvicorn); under WSGI each
+# async view would pay for an event loop of its own.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
+# Seconds a health check result is reused before the database is probed again
+HEALTH_CHECK_CACHE_SECONDS = int(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '10'))
+
+
+# Cache: process-local memory by default. Point CACHE_BACKEND/CACHE_LOCATION at
+# Redis or Memcached to share cached data between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'quiz-app'),
+    }
+}
 
+# Where cache versions (home.caching) are kept: 'cache' alongside the cached
+# values, which is enough when CACHE_BACKEND is shared by every worker, or
+# 'database' (the CacheVersion table), so that process-local caches are
+# invalidated in every worker. Defaults to 'database' unless CACHE_BACKEND is set.
+CACHE_VERSION_STORES = ('cache', 'database')
+CACHE_VERSION_STORE = os.getenv('CACHE_VERSION_STORE', 'cache' if os.getenv('CACHE_BACKEND') else 'database')
+if CACHE_VERSION_STORE not in CACHE_VERSION_STORES:
+    raise ImproperlyConfigured(
+        f"CACHE_VERSION_STORE must be one of {', '.join(CACHE_VERSION_STORES)}, not {CACHE_VERSION_STORE!r}"
+    )
 
+# Seconds a category's question set stays cached (changes invalidate it immediately)
+QUESTION_CACHE_TIMEOUT = int(os.getenv('QUESTION_CACHE_TIMEOUT', '3600'))
+
+# Seconds a category's item analysis stays cached (new attempts invalidate it)
+ITEM_ANALYSIS_CACHE_TIMEOUT = int(os.getenv('ITEM_ANALYSIS_CACHE_TIMEOUT', '86400'))
+
+# Seconds a student's dashboard figures stay cached (their new or changed
+# attempts invalidate them immediately)
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '3600'))
+
+# Seconds the rendered category lists stay cached (category and question
+# changes re-render them immediately)
+CATALOGUE_CACHE_TIMEOUT = int(os.getenv('CATALOGUE_CACHE_TIMEOUT', '3600'))
+
+# Seconds an expired question set, item analysis or dashboard may still be
+# served while one request recomputes it (see home.singleflight)
+CACHE_STALE_SECONDS = int(os.getenv('CACHE_STALE_SECONDS', '60'))
+
+# Seconds anonymous visitors are served the landing page from the cache;
+# 0 turns page caching off
+ANONYMOUS_PAGE_CACHE_SECONDS = int(os.getenv('ANONYMOUS_PAGE_CACHE_SECONDS', '300'))
 
 
 # Password validation
@@ -189,15 +249,38 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Results browser page size (?page_size= is clamped to the maximum)
+RESULTS_PAGE_SIZE = int(os.getenv('RESULTS_PAGE_SIZE', '50'))
+RESULTS_MAX_PAGE_SIZE = int(os.getenv('RESULTS_MAX_PAGE_SIZE', '200'))
+
+# Rows fetched per database round trip when streaming result exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# - 'db': every request reads its session row.
+# - 'cached_db': reads come from the cache, writes go to both. Only safe with a
+#   shared cache (logging out on one worker must evict the session everywhere),
+#   so it is the default only when CACHE_BACKEND is set.
+# - 'signed_cookies': no server-side storage at all; a logout cannot revoke a
+#   copied cookie before it expires.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = os.getenv('SESSION_MODE', 'cached_db' if os.getenv('CACHE_BACKEND') else 'db')
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f"SESSION_MODE must be one of {', '.join(SESSION_ENGINES)}, not {SESSION_MODE!r}")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
+# Expiry is renewed by home.middleware.SessionRefreshMiddleware instead
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_SECONDS = int(os.getenv('SESSION_REFRESH_SECONDS', '3600'))
 SESSION_COOKIE_SECURE = not DEBUG  # Use secure cookies in production
 SESSION_COOKIE_HTTPONLY = True
 
@@ -208,6 +291,7 @@ CSRF_COOKIE_HTTPONLY = True
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
+    SECURE_REDIRECT_EXEMPT = [r'^health/$']  # Load balancer probes may use plain HTTP
     SECURE_HSTS_SECONDS = 31536000  # 1 year
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from home.views import health_check
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('health/', health_check, name='health_check'),
     path('', include('accounts.urls')),  # root landing page
     path('subjects/', include('home.urls')),  # category/subject selection page
 ]
@@ -1,8 +1,13 @@
 """
 Seed script to populate the database with default test users and quiz data.
-Usage: python seed_data.py
+Usage: python seed_data.py [--cohort N] [--questions M]
+
+--cohort also creates N students (cohort_student_1..N, password123) and a
+"Load Test Exam" category with M questions, as used by
+benchmarks/exam_window.py. Running it again only tops up what is missing.
 """
 
+import argparse
 import os
 import sys
 import django
@@ -14,8 +19,31 @@ sys.path.append(str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_app.settings')
 django.setup()
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from home.models import Category, Question
+from home.importers import QuestionImporter
+from home.models import Category
+
+COHORT_PREFIX = "cohort_student_"
+COHORT_PASSWORD = "password123"
+COHORT_CATEGORY = "Load Test Exam"
+
+def import_sample(category, questions):
+    """Insert the sample questions a category does not have yet, in one batch"""
+    importer = QuestionImporter().run(
+        (number, {
+            "category": category.name,
+            "question_text": q["text"],
+            "option_a": q["a"],
+            "option_b": q["b"],
+            "option_c": q["c"],
+            "option_d": q["d"],
+            "correct_option": q["correct"],
+        })
+        for number, q in enumerate(questions, start=1)
+    )
+    print(f"✅ Seeded questions for {category.name} ({importer.created} new)")
+
 
 def seed():
     print("Seeding database...")
@@ -103,19 +131,7 @@ def seed():
         }
     ]
     
-    for q in python_questions:
-        Question.objects.get_or_create(
-            category=python_cat,
-            question_text=q["text"],
-            defaults={
-                "option_a": q["a"],
-                "option_b": q["b"],
-                "option_c": q["c"],
-                "option_d": q["d"],
-                "correct_option": q["correct"]
-            }
-        )
-    print("✅ Seeded questions for Python Basics")
+    import_sample(python_cat, python_questions)
 
     # Category: Web Development
     web_cat, created = Category.objects.get_or_create(name="Web Development")
@@ -165,20 +181,40 @@ def seed():
         }
     ]
     
-    for q in web_questions:
-        Question.objects.get_or_create(
-            category=web_cat,
-            question_text=q["text"],
-            defaults={
-                "option_a": q["a"],
-                "option_b": q["b"],
-                "option_c": q["c"],
-                "option_d": q["d"],
-                "correct_option": q["correct"]
-            }
-        )
-    print("✅ Seeded questions for Web Development")
+    import_sample(web_cat, web_questions)
     print("🎉 Database seeding complete!")
 
+def seed_cohort(students, questions, category_name=COHORT_CATEGORY):
+    """Create the load-test students and exam in bulk; returns the usernames and the category"""
+    usernames = [f"{COHORT_PREFIX}{i}" for i in range(1, students + 1)]
+    existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+    # Hashing once keeps seeding thousands of students fast
+    password = make_password(COHORT_PASSWORD)
+    User.objects.bulk_create([
+        User(username=username, email=f"{username}@example.com", password=password, first_name=username)
+        for username in usernames if username not in existing
+    ], batch_size=1000)
+    print(f"✅ Cohort: {students} students ({students - len(existing)} new) / {COHORT_PASSWORD}")
+
+    category, _ = Category.objects.get_or_create(name=category_name)
+    importer = QuestionImporter().run(
+        (i, {
+            "category": category_name,
+            "question_text": f"Load test question {i}",
+            "option_a": "Option A", "option_b": "Option B", "option_c": "Option C", "option_d": "Option D",
+            "correct_option": "ABCD"[(i - 1) % 4],
+        })
+        for i in range(1, questions + 1)
+    )
+    print(f"✅ {category_name}: {questions} questions ({importer.created} new)")
+    return usernames, category
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed test users and quiz data")
+    parser.add_argument("--cohort", type=int, default=0, help="also create this many load-test students")
+    parser.add_argument("--questions", type=int, default=20, help="questions in the load-test exam")
+    args = parser.parse_args()
     seed()
+    if args.cohort:
+        seed_cohort(args.cohort, args.questions)